@@ -7,6 +7,8 @@ from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import random
 
+from streaming_indicators import StreamingIndicators
+
 
 class BacktestEngine:
     """Backtest trading strategies with historical data"""
@@ -42,14 +44,16 @@ class BacktestEngine:
         position = 0
         trades = []
         equity_curve = [initial_balance]
+        indicators = StreamingIndicators()
         
         # Run simulation
         for i in range(len(prices) - 1):
             current_price = prices[i]
             next_price = prices[i + 1]
+            indicators.update(current_price)
             
             # Generate signal based on strategy
-            signal = self._generate_signal(prices[:i+1], strategy)
+            signal = self._generate_signal(prices[max(0, i - 19):i + 1], strategy, indicators)
             
             # Execute trade
             if signal == "BUY" and position == 0:
@@ -179,19 +183,28 @@ class BacktestEngine:
         
         return prices
     
-    def _generate_signal(self, prices: List[float], strategy: str) -> str:
-        """Generate trading signal based on strategy"""
+    def _generate_signal(
+        self,
+        prices: List[float],
+        strategy: str,
+        indicators: Optional[StreamingIndicators] = None
+    ) -> str:
+        """Generate trading signal based on strategy
+        
+        `prices` needs only the last 20 prices when `indicators` has been fed
+        the full series; otherwise the indicators are rebuilt from `prices`.
+        """
+        if indicators is None:
+            indicators = StreamingIndicators.from_prices(prices)
         
-        if len(prices) < 20:
+        if indicators.count < 20:
             return "HOLD"
         
-        prices_arr = np.array(prices)
-        
         if strategy == "ai_multi_indicator":
             # Multi-indicator strategy
-            rsi = self._calculate_rsi(prices_arr)
-            ma_short = np.mean(prices_arr[-5:])
-            ma_long = np.mean(prices_arr[-20:])
+            rsi = indicators.rsi
+            ma_short = indicators.short.mean
+            ma_long = indicators.long.mean
             
             if rsi < 30 and ma_short > ma_long:
                 return "BUY"
@@ -200,7 +213,7 @@ class BacktestEngine:
                 
         elif strategy == "momentum":
             # Momentum strategy
-            momentum = (prices_arr[-1] - prices_arr[-10]) / prices_arr[-10]
+            momentum = (prices[-1] - prices[-10]) / prices[-10]
             if momentum > 0.02:
                 return "BUY"
             elif momentum < -0.02:
@@ -208,32 +221,19 @@ class BacktestEngine:
                 
         elif strategy == "mean_reversion":
             # Mean reversion strategy
-            ma = np.mean(prices_arr[-20:])
-            std = np.std(prices_arr[-20:])
+            ma = indicators.long.mean
+            std = indicators.long.std
             
-            if prices_arr[-1] < ma - 2 * std:
+            if prices[-1] < ma - 2 * std:
                 return "BUY"
-            elif prices_arr[-1] > ma + 2 * std:
+            elif prices[-1] > ma + 2 * std:
                 return "SELL"
         
         return "HOLD"
     
     def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
-        """Calculate RSI indicator"""
-        deltas = np.diff(prices[-period-1:])
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains) if len(gains) > 0 else 0
-        avg_loss = np.mean(losses) if len(losses) > 0 else 0
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        """Calculate Wilder RSI indicator"""
+        return StreamingIndicators.from_prices(prices, rsi_period=period).rsi
     
     def _calculate_metrics(
         self,
@@ -3,27 +3,36 @@ Binance API Integration for Real-time Crypto Data
 Provides fast, reliable price data for all trading pairs
 """
 
-import requests
 import time
 import os
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import urllib3
 
+from bounded_cache import BoundedCache
+from circuit_breaker import CircuitOpenError, get_breaker
+from http_client import http_transport
+
 # Disable SSL warnings for development (macOS SSL certificate issues)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class BinanceAPI:
     def __init__(self):
         self.base_url = os.getenv("BINANCE_API_BASE_URL", "https://api.binance.com/api/v3")
-        self.cache = {}
         self.cache_duration = 10  # Cache for 10 seconds (real-time feel)
-        self.api_available = True  # Track if API is available
-        self.last_check_time = 0
-        self.check_interval = 60  # Check availability every 60 seconds
-        self.blocked_until = 0
-        self.block_reason = None
+        self.cache = BoundedCache.from_env("binance_api", "BINANCE_CACHE", default_ttl=self.cache_duration)
+        self.breaker = get_breaker("binance")
         self.verify_ssl = os.getenv("VERIFY_SSL", "false").lower() == "true"  # Disable SSL verification by default for dev
+        self.session = http_transport.sync_session()
+        self.max_klines_per_request = 1000
+        self.interval_ms = {
+            '1m': 60_000,
+            '5m': 300_000,
+            '15m': 900_000,
+            '1h': 3_600_000,
+            '4h': 14_400_000,
+            '1d': 86_400_000,
+        }
         
         # Map WEEX pairs to Binance symbols
         self.pair_mapping = {
@@ -37,143 +46,177 @@ class BinanceAPI:
             'AVAX/USDT': 'AVAXUSDT'
         }
     
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """Check if cached data is still valid"""
-        if cache_key not in self.cache:
-            return False
-        
-        cached_time = self.cache[cache_key].get('timestamp', 0)
-        return (time.time() - cached_time) < self.cache_duration
-
-    def _is_temporarily_blocked(self, current_time: float) -> bool:
-        return current_time < self.blocked_until
-
-    def _mark_unavailable(self, current_time: float) -> None:
-        self.api_available = False
-        self.last_check_time = current_time
-
-    def _mark_geo_blocked(self, current_time: float, status_code: int) -> None:
-        self.blocked_until = max(self.blocked_until, current_time + 3600)
-        self.block_reason = f"HTTP {status_code}"
-        self._mark_unavailable(current_time)
+    def _mark_geo_blocked(self, status_code: int) -> None:
+        self.breaker.trip(3600, f"HTTP {status_code}")
         print(
             f"[Binance API] Region blocked ({status_code}); skipping Binance requests for 60 minutes"
         )
 
-    def _mark_available(self) -> None:
-        self.api_available = True
-        self.blocked_until = 0
-        self.block_reason = None
+    def _record_status(self, status_code: int) -> None:
+        """Feed an HTTP status into the circuit breaker"""
+        if status_code == 451:
+            self._mark_geo_blocked(status_code)
+        elif status_code >= 500 or status_code in (418, 429):
+            self.breaker.record_failure(f"HTTP {status_code}")
+        else:
+            self.breaker.record_success()
+
+    def _to_binance_symbol(self, symbol: str) -> str:
+        return self.pair_mapping.get(symbol, symbol.replace('/', ''))
+
+    def _fetch(self, path: str, params: Dict, timeout: float) -> Tuple[int, Any]:
+        """Blocking GET on the shared connection pool; returns (status_code, json or None)"""
+        self.breaker.check()
+        try:
+            response = self.session.get(f"{self.base_url}/{path}", params=params, timeout=timeout, verify=self.verify_ssl)
+        except Exception as e:
+            self.breaker.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        self._record_status(response.status_code)
+        return response.status_code, response.json() if response.status_code == 200 else None
+
+    async def _fetch_async(self, path: str, params: Dict, timeout: float) -> Tuple[int, Any]:
+        """Non-blocking GET on the shared async pool; returns (status_code, json or None)"""
+        self.breaker.check()
+        try:
+            response = await http_transport.get(
+                f"{self.base_url}/{path}", params=params, timeout=timeout, verify=self.verify_ssl
+            )
+        except Exception as e:
+            self.breaker.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        self._record_status(response.status_code)
+        return response.status_code, response.json() if response.status_code == 200 else None
+
+    @staticmethod
+    def _parse_stats(data: Dict) -> Dict:
+        return {
+            'price': float(data['lastPrice']),
+            'change_24h': float(data['priceChangePercent']),
+            'high_24h': float(data['highPrice']),
+            'low_24h': float(data['lowPrice']),
+            'volume_24h': float(data['volume']),
+            'volume_usd': float(data['quoteVolume'])
+        }
+
+    @staticmethod
+    def _parse_klines(data: List) -> List[Dict]:
+        return [
+            {
+                'timestamp': k[0],
+                'open': float(k[1]),
+                'high': float(k[2]),
+                'low': float(k[3]),
+                'close': float(k[4]),
+                'volume': float(k[5])
+            }
+            for k in data
+        ]
+
+    @staticmethod
+    def _kline_params(binance_symbol: str, interval: str, limit: int,
+                      start_time: Optional[int] = None, end_time: Optional[int] = None) -> Dict:
+        params = {
+            'symbol': binance_symbol,
+            'interval': interval,
+            'limit': limit
+        }
+        if start_time is not None:
+            params['startTime'] = int(start_time)
+        if end_time is not None:
+            params['endTime'] = int(end_time)
+        return params
     
     def get_price(self, symbol: str) -> Optional[float]:
         """Get current price for a symbol"""
+        cache_key = f"price_{self._to_binance_symbol(symbol)}"
+        cached_price = self.cache.get(cache_key)
+        if cached_price is not None:
+            return cached_price
+
         try:
-            # Skip if API is known to be unavailable
-            current_time = time.time()
-            if self._is_temporarily_blocked(current_time):
-                return None
-            if not self.api_available and (current_time - self.last_check_time) < self.check_interval:
-                return None
-            
-            binance_symbol = self.pair_mapping.get(symbol, symbol.replace('/', ''))
-            cache_key = f"price_{binance_symbol}"
-            
-            # Return cached data if valid
-            if self._is_cache_valid(cache_key):
-                return self.cache[cache_key]['price']
-            
-            # Fetch from Binance with short timeout
-            url = f"{self.base_url}/ticker/price"
-            params = {'symbol': binance_symbol}
-            
-            try:
-                response = requests.get(url, params=params, timeout=0.5, verify=self.verify_ssl)  # Very short timeout
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    price = float(data['price'])
-                    
-                    # Cache the result
-                    self.cache[cache_key] = {
-                        'price': price,
-                        'timestamp': time.time()
-                    }
-                    
-                    self._mark_available()
-                    return price
-                if response.status_code == 451:
-                    self._mark_geo_blocked(current_time, response.status_code)
-            except:
-                # Mark API as unavailable
-                self._mark_unavailable(current_time)
-            
+            # Very short timeout; the stream and stats endpoints cover slow periods
+            status_code, data = self._fetch("ticker/price", {'symbol': self._to_binance_symbol(symbol)}, 0.5)
+        except Exception:
             return None
-            
-        except Exception as e:
+
+        return self._store_price(cache_key, status_code, data)
+
+    async def get_price_async(self, symbol: str) -> Optional[float]:
+        """Async variant of get_price on the shared connection pool"""
+        cache_key = f"price_{self._to_binance_symbol(symbol)}"
+        cached_price = self.cache.get(cache_key)
+        if cached_price is not None:
+            return cached_price
+
+        try:
+            status_code, data = await self._fetch_async("ticker/price", {'symbol': self._to_binance_symbol(symbol)}, 0.5)
+        except Exception:
             return None
+
+        return self._store_price(cache_key, status_code, data)
+
+    def _store_price(self, cache_key: str, status_code: int, data: Any) -> Optional[float]:
+        if status_code != 200:
+            return None
+
+        try:
+            price = float(data['price'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        return self.cache.set(cache_key, price)
     
     def get_24h_stats(self, symbol: str) -> Optional[Dict]:
         """Get 24h statistics for a symbol"""
+        binance_symbol = self._to_binance_symbol(symbol)
+        cache_key = f"stats_{binance_symbol}"
+        cached_stats = self.cache.get(cache_key)
+        if cached_stats is not None:
+            return cached_stats
+
         try:
-            # Skip if API is known to be unavailable
-            current_time = time.time()
-            if self._is_temporarily_blocked(current_time):
-                print(f"[Binance API] Skipping {symbol} - API blocked ({self.block_reason})")
-                return None
-            if not self.api_available and (current_time - self.last_check_time) < self.check_interval:
-                print(f"[Binance API] Skipping {symbol} - API marked unavailable")
-                return None
-            
-            binance_symbol = self.pair_mapping.get(symbol, symbol.replace('/', ''))
-            cache_key = f"stats_{binance_symbol}"
-            
-            # Return cached data if valid
-            if self._is_cache_valid(cache_key):
-                return self.cache[cache_key]['stats']
-            
-            # Fetch from Binance with longer timeout
-            url = f"{self.base_url}/ticker/24hr"
-            params = {'symbol': binance_symbol}
-            
-            try:
-                print(f"[Binance API] Fetching {binance_symbol} from {url}")
-                response = requests.get(url, params=params, timeout=3.0, verify=self.verify_ssl)  # Increased timeout
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    stats = {
-                        'price': float(data['lastPrice']),
-                        'change_24h': float(data['priceChangePercent']),
-                        'high_24h': float(data['highPrice']),
-                        'low_24h': float(data['lowPrice']),
-                        'volume_24h': float(data['volume']),
-                        'volume_usd': float(data['quoteVolume'])
-                    }
-                    
-                    # Cache the result
-                    self.cache[cache_key] = {
-                        'stats': stats,
-                        'timestamp': time.time()
-                    }
-                    
-                    self._mark_available()
-                    print(f"[Binance API] ✅ {binance_symbol}: ${stats['price']:.2f} ({stats['change_24h']:+.2f}%)")
-                    return stats
-                else:
-                    print(f"[Binance API] ❌ {binance_symbol}: HTTP {response.status_code}")
-                    if response.status_code == 451:
-                        self._mark_geo_blocked(current_time, response.status_code)
-            except Exception as e:
-                # Mark API as unavailable
-                self._mark_unavailable(current_time)
-                print(f"[Binance API] ❌ {binance_symbol}: {type(e).__name__}: {str(e)}")
-            
+            print(f"[Binance API] Fetching {binance_symbol} from {self.base_url}/ticker/24hr")
+            status_code, data = self._fetch("ticker/24hr", {'symbol': binance_symbol}, 3.0)
+        except CircuitOpenError:
             return None
-            
         except Exception as e:
-            print(f"[Binance API] ❌ Outer exception for {symbol}: {type(e).__name__}: {str(e)}")
+            print(f"[Binance API] ❌ {binance_symbol}: {type(e).__name__}: {str(e)}")
             return None
+
+        return self._store_stats(binance_symbol, cache_key, status_code, data)
+
+    async def get_24h_stats_async(self, symbol: str) -> Optional[Dict]:
+        """Async variant of get_24h_stats on the shared connection pool"""
+        binance_symbol = self._to_binance_symbol(symbol)
+        cache_key = f"stats_{binance_symbol}"
+        cached_stats = self.cache.get(cache_key)
+        if cached_stats is not None:
+            return cached_stats
+
+        try:
+            status_code, data = await self._fetch_async("ticker/24hr", {'symbol': binance_symbol}, 3.0)
+        except CircuitOpenError:
+            return None
+        except Exception as e:
+            print(f"[Binance API] ❌ {binance_symbol}: {type(e).__name__}: {str(e)}")
+            return None
+
+        return self._store_stats(binance_symbol, cache_key, status_code, data)
+
+    def _store_stats(self, binance_symbol: str, cache_key: str, status_code: int, data: Any) -> Optional[Dict]:
+        if status_code != 200:
+            print(f"[Binance API] ❌ {binance_symbol}: HTTP {status_code}")
+            return None
+
+        try:
+            stats = self._parse_stats(data)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[Binance API] ❌ {binance_symbol}: unexpected payload ({e})")
+            return None
+
+        print(f"[Binance API] ✅ {binance_symbol}: ${stats['price']:.2f} ({stats['change_24h']:+.2f}%)")
+        return self.cache.set(cache_key, stats)
     
     def get_all_prices(self) -> Dict[str, float]:
         """Get prices for all supported pairs"""
@@ -197,60 +240,143 @@ class BinanceAPI:
         
         return stats
     
-    def get_klines(self, symbol: str, interval: str = '1h', limit: int = 24) -> List[Dict]:
-        """Get historical kline/candlestick data"""
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str = '1h',
+        limit: int = 24,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[Dict]:
+        """Get historical kline/candlestick data, optionally bounded by open time in ms"""
         try:
             current_time = time.time()
-            if self._is_temporarily_blocked(current_time):
-                print(f"[Binance API] Skipping klines for {symbol} - API blocked ({self.block_reason})")
-                return []
+            cache_key, cached, request = self._plan_klines(symbol, interval, limit, start_time, end_time, current_time)
+            if cached is not None:
+                return cached
 
-            binance_symbol = self.pair_mapping.get(symbol, symbol.replace('/', ''))
-            cache_key = f"klines_{binance_symbol}_{interval}_{limit}"
-            
-            # Return cached data if valid
-            if self._is_cache_valid(cache_key):
-                return self.cache[cache_key]['klines']
-            
-            # Fetch from Binance
-            url = f"{self.base_url}/klines"
-            params = {
-                'symbol': binance_symbol,
-                'interval': interval,
-                'limit': limit
-            }
-            response = requests.get(url, params=params, timeout=5, verify=self.verify_ssl)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                klines = []
-                for k in data:
-                    klines.append({
-                        'timestamp': k[0],
-                        'open': float(k[1]),
-                        'high': float(k[2]),
-                        'low': float(k[3]),
-                        'close': float(k[4]),
-                        'volume': float(k[5])
-                    })
-                
-                # Cache the result
-                self.cache[cache_key] = {
-                    'klines': klines,
-                    'timestamp': time.time()
-                }
-                self._mark_available()
-                
-                return klines
-            if response.status_code == 451:
-                self._mark_geo_blocked(current_time, response.status_code)
-            
+            status_code, data = self._fetch("klines", request['params'], 5)
+            return self._store_klines(cache_key, request, status_code, data)
+
+        except CircuitOpenError:
+            return []
+        except Exception as e:
+            print(f"Error fetching klines for {symbol}: {e}")
+            return []
+
+    async def get_klines_async(
+        self,
+        symbol: str,
+        interval: str = '1h',
+        limit: int = 24,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[Dict]:
+        """Async variant of get_klines on the shared connection pool"""
+        try:
+            current_time = time.time()
+            cache_key, cached, request = self._plan_klines(symbol, interval, limit, start_time, end_time, current_time)
+            if cached is not None:
+                return cached
+
+            status_code, data = await self._fetch_async("klines", request['params'], 5)
+            return self._store_klines(cache_key, request, status_code, data)
+
+        except CircuitOpenError:
             return []
-            
         except Exception as e:
             print(f"Error fetching klines for {symbol}: {e}")
             return []
+
+    async def get_depth_async(self, symbol: str, limit: int = 1000) -> Optional[Dict]:
+        """Full order book snapshot (bids, asks, lastUpdateId); never cached"""
+        try:
+            status_code, data = await self._fetch_async(
+                "depth", {'symbol': self._to_binance_symbol(symbol), 'limit': limit}, 5
+            )
+        except CircuitOpenError:
+            return None
+        except Exception as e:
+            print(f"Error fetching depth for {symbol}: {e}")
+            return None
+
+        if status_code != 200 or not isinstance(data, dict) or 'lastUpdateId' not in data:
+            return None
+        return data
+
+    def _plan_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: Optional[int],
+        end_time: Optional[int],
+        current_time: float,
+    ) -> Tuple[str, Optional[List[Dict]], Optional[Dict]]:
+        """Resolve a kline request to (cache_key, cached result, upstream request).
+
+        Plain `limit` requests share the widest window cached for the
+        symbol/interval: smaller limits are slices of it and, once it expires,
+        only the bars from its last open time onward are requested. Requests
+        bounded by start/end time are cached under their exact key.
+        """
+        binance_symbol = self._to_binance_symbol(symbol)
+
+        if start_time is not None or end_time is not None or interval not in self.interval_ms:
+            cache_key = f"klines_{binance_symbol}_{interval}_{limit}_{start_time}_{end_time}"
+            cached = self.cache.get(cache_key)
+            request = {
+                'params': self._kline_params(binance_symbol, interval, limit, start_time, end_time),
+                'limit': None,
+            }
+            return cache_key, cached, request
+
+        limit = max(1, min(int(limit), self.max_klines_per_request))
+        cache_key = f"klines_{binance_symbol}_{interval}"
+        fresh_window = self.cache.get(cache_key)
+        if fresh_window is not None and len(fresh_window) >= limit:
+            return cache_key, fresh_window[-limit:], None
+
+        # An expired window is still a valid prefix; only its tail needs refreshing
+        window = fresh_window if fresh_window is not None else self.cache.peek(cache_key, [])
+
+        if window and len(window) >= limit:
+            last_open_time = window[-1]['timestamp']
+            missing_bars = int((current_time * 1000 - last_open_time) // self.interval_ms[interval]) + 1
+            if missing_bars <= self.max_klines_per_request:
+                request = {
+                    'params': self._kline_params(binance_symbol, interval, missing_bars, start_time=last_open_time),
+                    'limit': limit,
+                    'window': window,
+                }
+                return cache_key, None, request
+
+        request = {
+            'params': self._kline_params(binance_symbol, interval, max(limit, len(window))),
+            'limit': limit,
+        }
+        return cache_key, None, request
+
+    def _store_klines(self, cache_key: str, request: Dict, status_code: int, data: Any) -> List[Dict]:
+        if status_code != 200:
+            return []
+
+        klines = self._parse_klines(data)
+
+        limit = request['limit']
+        if limit is None:
+            return self.cache.set(cache_key, klines)
+
+        window = request.get('window')
+        if window is not None and klines:
+            # The last cached bar was still open; the fetched tail replaces it
+            first_new = klines[0]['timestamp']
+            klines = ([k for k in window if k['timestamp'] < first_new] + klines)[-len(window):]
+        elif window is not None:
+            klines = window
+
+        self.cache.set(cache_key, klines)
+        return klines[-limit:]
     
     def get_market_summary(self) -> Dict:
         """Get summary of all markets"""
@@ -0,0 +1,307 @@
+"""
+Binance WebSocket market-data ingestion.
+
+Subscribes to the combined miniTicker + 1m kline streams for the tracked
+symbols (plus depth diffs when a depth listener is registered) and keeps a
+live per-symbol snapshot in memory. REST endpoints in
+binance_api.py remain the fallback whenever the stream is disconnected or a
+symbol's snapshot goes stale.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    websockets = None
+    WEBSOCKETS_AVAILABLE = False
+    logger.warning("websockets not installed. Binance stream ingestion disabled.")
+
+
+KlineListener = Callable[[str, Dict[str, Any], bool], None]
+DepthListener = Callable[[str, Dict[str, Any]], None]
+TickerListener = Callable[[str, Dict[str, Any]], None]
+DisconnectListener = Callable[[], None]
+
+
+class BinanceMarketStream:
+    """Background consumer of Binance combined market-data streams."""
+
+    def __init__(self) -> None:
+        self.stream_url = os.getenv(
+            "BINANCE_STREAM_URL", "wss://stream.binance.com:9443/stream"
+        ).rstrip("/")
+        self.max_snapshot_age = float(os.getenv("BINANCE_STREAM_MAX_AGE_SECONDS", "15"))
+        self.max_reconnect_delay = float(os.getenv("BINANCE_STREAM_MAX_RECONNECT_SECONDS", "300"))
+        self.kline_interval = "1m"
+        self.depth_enabled = os.getenv("BINANCE_DEPTH_STREAM", "true").strip().lower() in {"1", "true", "yes", "on"}
+        self.depth_speed = os.getenv("BINANCE_DEPTH_STREAM_SPEED", "100ms")
+        self.symbols: List[str] = []
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+        self.klines: Dict[str, Dict[str, Any]] = {}
+        self.connected = False
+        # Set while tick_replay feeds recorded events through the same handlers
+        self.replaying = False
+        self.connected_at: Optional[float] = None
+        self.last_message_at = 0.0
+        self.messages_received = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self._kline_listeners: List[KlineListener] = []
+        self._depth_listeners: List[DepthListener] = []
+        self._ticker_listeners: List[TickerListener] = []
+        self._disconnect_listeners: List[DisconnectListener] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def to_stream_symbol(symbol: str) -> str:
+        return f"{symbol.upper()}USDT"
+
+    def add_kline_listener(self, listener: KlineListener) -> None:
+        """Register a callback invoked as (symbol, kline, is_closed) for every kline update."""
+        self._kline_listeners.append(listener)
+
+    def add_depth_listener(self, listener: DepthListener) -> None:
+        """Register a callback invoked as (symbol, depthUpdate event) for every order book diff."""
+        self._depth_listeners.append(listener)
+
+    def add_ticker_listener(self, listener: TickerListener) -> None:
+        """Register a callback invoked as (symbol, snapshot) for every mini-ticker update."""
+        self._ticker_listeners.append(listener)
+
+    def add_disconnect_listener(self, listener: DisconnectListener) -> None:
+        """Register a callback invoked whenever the stream connection is lost or stopped."""
+        self._disconnect_listeners.append(listener)
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, symbols: List[str]) -> bool:
+        """Start the ingestion task on the running event loop."""
+        if not WEBSOCKETS_AVAILABLE:
+            return False
+
+        if self.is_running():
+            return True
+
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._set_disconnected()
+
+    def build_stream_url(self) -> str:
+        streams = []
+        for symbol in self.symbols:
+            stream_symbol = self.to_stream_symbol(symbol).lower()
+            streams.append(f"{stream_symbol}@miniTicker")
+            streams.append(f"{stream_symbol}@kline_{self.kline_interval}")
+            if self.depth_enabled and self._depth_listeners:
+                streams.append(f"{stream_symbol}@depth@{self.depth_speed}")
+        return f"{self.stream_url}?streams={'/'.join(streams)}"
+
+    def is_live(self, symbol: Optional[str] = None) -> bool:
+        """Return True when the stream is connected and the snapshot is fresh."""
+        if not self.connected and not self.replaying:
+            return False
+
+        if symbol is None:
+            return (time.time() - self.last_message_at) < self.max_snapshot_age
+
+        snapshot = self.snapshots.get(symbol.upper())
+        if not snapshot:
+            return False
+        return (time.time() - snapshot["received_at"]) < self.max_snapshot_age
+
+    def get_snapshot(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return the latest ticker snapshot for a symbol, or None when stale."""
+        if not self.is_live(symbol):
+            return None
+        return self.snapshots.get(symbol.upper())
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        snapshot = self.get_snapshot(symbol)
+        return snapshot["price"] if snapshot else None
+
+    def get_live_snapshots(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        snapshots = {}
+        for symbol in symbols:
+            snapshot = self.get_snapshot(symbol)
+            if snapshot:
+                snapshots[symbol.upper()] = snapshot
+        return snapshots
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "available": WEBSOCKETS_AVAILABLE,
+            "running": self.is_running(),
+            "connected": self.connected,
+            "replaying": self.replaying,
+            "live_symbols": sorted(
+                symbol for symbol in self.snapshots if self.is_live(symbol)
+            ),
+            "last_message_age_seconds": (
+                round(now - self.last_message_at, 3) if self.last_message_at else None
+            ),
+            "messages_received": self.messages_received,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+
+    async def _run(self) -> None:
+        reconnect_delay = 1.0
+
+        while True:
+            try:
+                url = self.build_stream_url()
+                async with websockets.connect(url, ping_interval=20, ping_timeout=20, close_timeout=5) as connection:
+                    self.connected = True
+                    self.connected_at = time.time()
+                    self.last_error = None
+                    reconnect_delay = 1.0
+                    logger.info("✓ Binance market stream connected (%d symbols)", len(self.symbols))
+
+                    async for raw_message in connection:
+                        self._handle_message(raw_message)
+            except asyncio.CancelledError:
+                self._set_disconnected()
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.warning("Binance market stream disconnected: %s", self.last_error)
+
+            self._set_disconnected()
+            self.reconnects += 1
+            await asyncio.sleep(reconnect_delay)
+            reconnect_delay = min(reconnect_delay * 2, self.max_reconnect_delay)
+
+    def _set_disconnected(self) -> None:
+        self.connected = False
+        for listener in self._disconnect_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.warning("Binance disconnect listener failed: %s", e)
+
+    def _handle_message(self, raw_message: Any) -> None:
+        try:
+            payload = json.loads(raw_message)
+        except (TypeError, ValueError):
+            return
+
+        data = payload.get("data") if isinstance(payload, dict) else None
+        if not isinstance(data, dict):
+            return
+
+        self.ingest(data)
+
+    def ingest(self, data: Dict[str, Any]) -> None:
+        """Dispatch one decoded stream event (miniTicker, kline or depthUpdate)."""
+        self.last_message_at = time.time()
+        self.messages_received += 1
+
+        event_type = data.get("e")
+        if event_type == "24hrMiniTicker":
+            self._handle_mini_ticker(data)
+        elif event_type == "kline":
+            self._handle_kline(data)
+        elif event_type == "depthUpdate":
+            self._handle_depth(data)
+
+    def _symbol_from_event(self, data: Dict[str, Any]) -> Optional[str]:
+        stream_symbol = str(data.get("s") or "").upper()
+        if not stream_symbol.endswith("USDT"):
+            return None
+        return stream_symbol[: -len("USDT")]
+
+    def _handle_mini_ticker(self, data: Dict[str, Any]) -> None:
+        symbol = self._symbol_from_event(data)
+        if not symbol:
+            return
+
+        try:
+            price = float(data["c"])
+            open_price = float(data["o"])
+            snapshot = {
+                "price": price,
+                "change_24h": ((price - open_price) / open_price) * 100 if open_price else 0.0,
+                "high_24h": float(data["h"]),
+                "low_24h": float(data["l"]),
+                "volume_24h": float(data["v"]),
+                "volume_usd": float(data["q"]),
+                "event_time": int(data.get("E") or 0),
+                "received_at": time.time(),
+            }
+        except (KeyError, TypeError, ValueError):
+            return
+
+        self.snapshots[symbol] = snapshot
+
+        for listener in self._ticker_listeners:
+            try:
+                listener(symbol, snapshot)
+            except Exception as e:
+                logger.warning("Binance ticker listener failed for %s: %s", symbol, e)
+
+    def _handle_kline(self, data: Dict[str, Any]) -> None:
+        symbol = self._symbol_from_event(data)
+        raw_kline = data.get("k")
+        if not symbol or not isinstance(raw_kline, dict):
+            return
+
+        try:
+            kline = {
+                "timestamp": int(raw_kline["t"]),
+                "open": float(raw_kline["o"]),
+                "high": float(raw_kline["h"]),
+                "low": float(raw_kline["l"]),
+                "close": float(raw_kline["c"]),
+                "volume": float(raw_kline["v"]),
+            }
+        except (KeyError, TypeError, ValueError):
+            return
+
+        is_closed = bool(raw_kline.get("x"))
+        self.klines[symbol] = kline
+
+        for listener in self._kline_listeners:
+            try:
+                listener(symbol, kline, is_closed)
+            except Exception as e:
+                logger.warning("Binance kline listener failed for %s: %s", symbol, e)
+
+    def _handle_depth(self, data: Dict[str, Any]) -> None:
+        symbol = self._symbol_from_event(data)
+        if not symbol or "U" not in data or "u" not in data:
+            return
+
+        for listener in self._depth_listeners:
+            try:
+                listener(symbol, data)
+            except Exception as e:
+                logger.warning("Binance depth listener failed for %s: %s", symbol, e)
+
+
+# Global instance
+binance_stream = BinanceMarketStream()
@@ -7,12 +7,13 @@ import os
 import time
 import hmac
 import hashlib
-import requests
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
 
+from http_client import http_transport
+
 # Load environment variables
 load_dotenv()
 
@@ -36,6 +37,7 @@ class BinanceTrading:
         self.headers = {
             'X-MBX-APIKEY': self.api_key
         }
+        self.session = http_transport.sync_session(self.headers)
         
         # Trading pairs mapping
         self.pair_mapping = {
@@ -84,15 +86,11 @@ class BinanceTrading:
                 params['timestamp'] = int(time.time() * 1000)
                 params['signature'] = self._generate_signature(params)
             
-            if method == 'GET':
-                response = requests.get(url, params=params, headers=self.headers, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, params=params, headers=self.headers, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, params=params, headers=self.headers, timeout=10)
-            else:
+            if method not in ('GET', 'POST', 'DELETE'):
                 logger.error(f"Unsupported method: {method}")
                 return None
+
+            response = self.session.request(method, url, params=params, timeout=10)
             
             if response.status_code == 200:
                 return response.json()
@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import Dict, Optional
 import logging
 
+from circuit_breaker import get_breaker
+
 logger = logging.getLogger(__name__)
 
 AMOY_NETWORK_NAME = "Polygon Amoy Testnet"
@@ -36,6 +38,8 @@ class BlockchainService:
             try:
                 w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={'timeout': 10}))
                 if w3.is_connected():
+                    # Both Amoy services share one breaker so a failing RPC stops all callers
+                    w3.provider.make_request = get_breaker("polygon_amoy").wrap(w3.provider.make_request)
                     self.w3 = w3
                     self.connected = True
                     logger.info(f"✓ Connected to {AMOY_NETWORK_NAME}: {rpc}")
@@ -0,0 +1,157 @@
+"""
+Bounded in-memory cache with LRU eviction, per-entry TTL and a memory cap.
+
+Used for provider response caches that would otherwise grow without limit in
+long-lived workers. Hit, miss and eviction counters are kept so the limits can
+be sized from real traffic.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size in bytes of plain JSON-like values."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+
+class BoundedCache:
+    """Thread-safe LRU cache bounded by entry count and estimated bytes."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 512,
+        max_bytes: int = 16 * 1024 * 1024,
+        default_ttl: float = 10.0,
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # key -> (value, expires_at, size_bytes)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, default_ttl: float, max_entries: int = 512, max_mb: float = 16) -> "BoundedCache":
+        """Build a cache whose limits can be overridden with <PREFIX>_MAX_ENTRIES / <PREFIX>_MAX_MB."""
+        return cls(
+            name,
+            max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", str(max_entries))),
+            max_bytes=int(float(os.getenv(f"{prefix}_MAX_MB", str(max_mb))) * 1024 * 1024),
+            default_ttl=default_ttl,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a fresh value and mark it most recently used."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at, _ = entry
+            if expires_at <= now:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Return a value even if it has expired, without touching LRU order or counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry is not None else default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> Any:
+        size = estimate_size(value)
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if size > self.max_bytes:
+                # Would evict everything else and still not fit
+                self.evictions += 1
+                return value
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            self._enforce_limits()
+        return value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _enforce_limits(self) -> None:
+        now = time.time()
+
+        # Drop expired entries first, oldest use first, before evicting live ones
+        if len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            for key in [key for key, entry in self._entries.items() if entry[1] <= now]:
+                self._remove(key)
+                self.expirations += 1
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "default_ttl_seconds": self.default_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,151 @@
+"""
+Background warmer for hot response caches.
+
+Runs registered refresh jobs on a fixed cadence so cache expiry is paid for
+by this task instead of by user requests. Jobs run in stages (prices before
+the per-symbol views that read them), each start is jittered so refreshes do
+not line up at the same instant, at most `concurrency` jobs run at once, and
+each cycle may spend at most `request_budget` estimated upstream requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmJob:
+    name: str
+    refresh: Callable[[], Awaitable[Any]]
+    stage: int = 0
+    # Estimated upstream requests, or a callable evaluated right before the run
+    cost: Union[int, Callable[[], int]] = 1
+    # Returns False when the cached entry is still fresh enough to skip
+    due: Optional[Callable[[], bool]] = None
+
+
+class CacheWarmer:
+    """Periodic, budgeted refresh of in-memory caches."""
+
+    def __init__(self) -> None:
+        self.interval_seconds = float(os.getenv("CACHE_WARMER_INTERVAL_SECONDS", "30"))
+        self.jitter_seconds = float(os.getenv("CACHE_WARMER_JITTER_SECONDS", "3"))
+        self.concurrency = max(1, int(os.getenv("CACHE_WARMER_CONCURRENCY", "3")))
+        self.request_budget = int(os.getenv("CACHE_WARMER_REQUEST_BUDGET", "40"))
+        self.jobs: List[WarmJob] = []
+        self.cycles = 0
+        self.last_cycle_at: Optional[float] = None
+        self.last_cycle_seconds: Optional[float] = None
+        self.last_cycle_spent = 0
+        self.refreshed = 0
+        self.skipped_fresh = 0
+        self.skipped_budget = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_job(self, job: WarmJob) -> None:
+        self.jobs.append(job)
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """Start the warm loop on the running event loop."""
+        if not self.jobs:
+            return False
+
+        if self.is_running():
+            return True
+
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_cycle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.warning("Cache warm cycle failed: %s", e)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_cycle(self) -> None:
+        started_at = time.time()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        spent = 0
+
+        async def run_job(job: WarmJob) -> None:
+            nonlocal spent
+            if job.due is not None and not job.due():
+                self.skipped_fresh += 1
+                return
+
+            await asyncio.sleep(random.uniform(0, self.jitter_seconds))
+            async with semaphore:
+                cost = job.cost() if callable(job.cost) else job.cost
+                if spent + cost > self.request_budget:
+                    self.skipped_budget += 1
+                    logger.debug("Cache warm job %s skipped: request budget spent", job.name)
+                    return
+                spent += cost
+
+                try:
+                    await job.refresh()
+                    self.refreshed += 1
+                except Exception as e:
+                    self.failures += 1
+                    self.last_error = f"{job.name}: {type(e).__name__}: {e}"
+                    logger.warning("Cache warm job %s failed: %s", job.name, e)
+
+        for stage in sorted({job.stage for job in self.jobs}):
+            await asyncio.gather(*(run_job(job) for job in self.jobs if job.stage == stage))
+
+        self.cycles += 1
+        self.last_cycle_at = started_at
+        self.last_cycle_seconds = round(time.time() - started_at, 3)
+        self.last_cycle_spent = spent
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running(),
+            "jobs": len(self.jobs),
+            "interval_seconds": self.interval_seconds,
+            "jitter_seconds": self.jitter_seconds,
+            "concurrency": self.concurrency,
+            "request_budget": self.request_budget,
+            "cycles": self.cycles,
+            "last_cycle_at": self.last_cycle_at,
+            "last_cycle_seconds": self.last_cycle_seconds,
+            "last_cycle_spent": self.last_cycle_spent,
+            "refreshed": self.refreshed,
+            "skipped_fresh": self.skipped_fresh,
+            "skipped_budget": self.skipped_budget,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+# Global instance
+cache_warmer = CacheWarmer()
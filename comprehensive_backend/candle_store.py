@@ -0,0 +1,401 @@
+"""
+Persistent OHLCV candle store.
+
+Klines are kept in a local SQLite table keyed by (symbol, interval, open_time),
+so chart and history requests become local reads and survive restarts. Each
+sync only asks Binance for bars newer than the last stored one, and any holes
+inside the requested window are detected and back-filled.
+
+1m bars are the base series: higher intervals are rolled up from it locally
+whenever the window is small enough (or already backfilled), and the live 1m
+bar from the market stream is folded into the open bar of every interval, so
+all intervals agree and only one kline series is fetched per symbol.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from binance_api import binance_api
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+MAX_KLINES_PER_REQUEST = 1000
+BASE_INTERVAL = "1m"
+
+KlineFetcher = Callable[..., List[Dict[str, Any]]]
+
+
+def _default_path() -> str:
+    """candles.db next to this module, or in the temp dir where the package is read-only (serverless)."""
+    package_dir = Path(__file__).resolve().parent
+    directory = package_dir if os.access(package_dir, os.W_OK) else Path(tempfile.gettempdir())
+    return str(directory / "candles.db")
+
+
+def _fetch_binance_klines(
+    symbol: str, interval: str, start_time: int, end_time: int, limit: int
+) -> List[Dict[str, Any]]:
+    return binance_api.get_klines(
+        f"{symbol}/USDT", interval=interval, limit=limit, start_time=start_time, end_time=end_time
+    )
+
+
+class CandleStore:
+    """SQLite-backed candle history with incremental sync and gap repair."""
+
+    def __init__(self, path: Optional[str] = None, fetch_klines: KlineFetcher = _fetch_binance_klines) -> None:
+        self.path = path or os.getenv("CANDLE_STORE_PATH") or _default_path()
+        self.refresh_seconds = float(os.getenv("CANDLE_STORE_REFRESH_SECONDS", "10"))
+        # Largest 1m window synced on demand for a rollup (default about a week)
+        self.rollup_max_base_bars = int(os.getenv("CANDLE_ROLLUP_MAX_BASE_BARS", "10080"))
+        self.fetch_klines = fetch_klines
+        self._lock = threading.Lock()
+        # (time, window_start) of the last sync per (symbol, interval)
+        self._last_sync: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        # Ranges Binance returned nothing for (exchange downtime); not retried
+        self._empty_ranges: Set[Tuple[str, str, int, int]] = set()
+        self._connection: Optional[sqlite3.Connection] = None
+        # Still-open 1m bar per symbol from the market stream
+        self._live_bars: Dict[str, Dict[str, Any]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS candles (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    open_time INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    volume REAL NOT NULL,
+                    PRIMARY KEY (symbol, interval, open_time)
+                ) WITHOUT ROWID
+                """
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def upsert(self, symbol: str, interval: str, klines: List[Dict[str, Any]]) -> int:
+        """Insert or overwrite candles; the still-open bar is refreshed in place."""
+        rows = [
+            (
+                symbol,
+                interval,
+                int(kline["timestamp"]),
+                float(kline["open"]),
+                float(kline["high"]),
+                float(kline["low"]),
+                float(kline["close"]),
+                float(kline["volume"]),
+            )
+            for kline in klines
+        ]
+        if not rows:
+            return 0
+
+        with self._lock:
+            connection = self._connect()
+            connection.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.commit()
+        return len(rows)
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MAX(open_time) FROM candles WHERE symbol = ? AND interval = ?",
+                (symbol, interval),
+            ).fetchone()
+        return row[0] if row else None
+
+    def stored_range(self, symbol: str, interval: str, start_time: int, end_time: int) -> Optional[Tuple[int, int]]:
+        """First and last stored open times inside [start_time, end_time], or None if empty."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MIN(open_time), MAX(open_time) FROM candles "
+                "WHERE symbol = ? AND interval = ? AND open_time BETWEEN ? AND ?",
+                (symbol, interval, int(start_time), int(end_time)),
+            ).fetchone()
+        return (row[0], row[1]) if row and row[0] is not None else None
+
+    def get_candles(
+        self,
+        symbol: str,
+        interval: str,
+        limit: Optional[int] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Read stored candles, oldest first, as the latest `limit` bars and/or a time range."""
+        query = "SELECT open_time, open, high, low, close, volume FROM candles WHERE symbol = ? AND interval = ?"
+        params: List[Any] = [symbol, interval]
+
+        if start_time is not None:
+            query += " AND open_time >= ?"
+            params.append(int(start_time))
+        if end_time is not None:
+            query += " AND open_time <= ?"
+            params.append(int(end_time))
+
+        query += " ORDER BY open_time DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+
+        return [
+            {"timestamp": row[0], "open": row[1], "high": row[2], "low": row[3], "close": row[4], "volume": row[5]}
+            for row in reversed(rows)
+        ]
+
+    def find_gaps(self, symbol: str, interval: str, start_time: int, end_time: int) -> List[Tuple[int, int]]:
+        """Return missing (first_open_time, last_open_time) ranges inside [start_time, end_time]."""
+        step_ms = INTERVAL_MS[interval]
+
+        with self._lock:
+            rows = self._connect().execute(
+                """
+                SELECT previous_time, open_time FROM (
+                    SELECT open_time, LAG(open_time) OVER (ORDER BY open_time) AS previous_time
+                    FROM candles
+                    WHERE symbol = ? AND interval = ? AND open_time BETWEEN ? AND ?
+                )
+                WHERE previous_time IS NOT NULL AND open_time - previous_time > ?
+                """,
+                (symbol, interval, int(start_time), int(end_time), step_ms),
+            ).fetchall()
+            first_row = self._connect().execute(
+                "SELECT MIN(open_time) FROM candles WHERE symbol = ? AND interval = ? AND open_time BETWEEN ? AND ?",
+                (symbol, interval, int(start_time), int(end_time)),
+            ).fetchone()
+
+        gaps = [(previous_time + step_ms, open_time - step_ms) for previous_time, open_time in rows]
+
+        first_stored = first_row[0] if first_row else None
+        if first_stored is not None and first_stored > start_time:
+            gaps.insert(0, (int(start_time), first_stored - step_ms))
+
+        return [
+            gap for gap in gaps
+            if (symbol, interval, gap[0], gap[1]) not in self._empty_ranges
+        ]
+
+    def fetch_range(self, symbol: str, interval: str, start_time: int, end_time: int) -> int:
+        """Page a time range in from Binance and store it. Returns the number of candles stored."""
+        step_ms = INTERVAL_MS[interval]
+        cursor = int(start_time)
+        stored = 0
+
+        while cursor <= end_time:
+            batch = self.fetch_klines(
+                symbol, interval, start_time=cursor, end_time=int(end_time), limit=MAX_KLINES_PER_REQUEST
+            )
+            if not batch:
+                break
+
+            stored += self.upsert(symbol, interval, batch)
+            cursor = int(batch[-1]["timestamp"]) + step_ms
+            if len(batch) < MAX_KLINES_PER_REQUEST:
+                break
+
+        return stored
+
+    def sync(self, symbol: str, interval: str, limit: int) -> None:
+        """Bring the latest `limit` bars up to date, fetching only what is missing."""
+        key = (symbol, interval)
+        now = time.time()
+        step_ms = INTERVAL_MS[interval]
+        current_open = int(now * 1000) // step_ms * step_ms
+        window_start = current_open - (limit - 1) * step_ms
+
+        synced_at, synced_from = self._last_sync.get(key, (0.0, 0))
+        if now - synced_at < self.refresh_seconds and synced_from <= window_start:
+            # A recent sync already covered this window; a longer one still syncs
+            return
+        self._last_sync[key] = (now, window_start)
+
+        last_stored = self.last_open_time(symbol, interval)
+        if last_stored is None or last_stored < window_start:
+            self.fetch_range(symbol, interval, window_start, current_open)
+            return
+
+        live_bar = self.live_bar(symbol) if interval == BASE_INTERVAL else None
+        stream_current = live_bar is not None and last_stored >= current_open - step_ms
+        if not stream_current:
+            # Re-fetch from the last stored bar so the still-open candle is refreshed
+            self.fetch_range(symbol, interval, last_stored, current_open)
+
+        for gap_start, gap_end in self.find_gaps(symbol, interval, window_start, current_open):
+            if not self.fetch_range(symbol, interval, gap_start, gap_end):
+                self._empty_ranges.add((symbol, interval, gap_start, gap_end))
+
+    def record_live_kline(self, symbol: str, kline: Dict[str, Any], is_closed: bool) -> None:
+        """Track the stream's 1m bar; closed bars are written to the base series."""
+        if is_closed:
+            self._live_bars.pop(symbol, None)
+            self.upsert(symbol, BASE_INTERVAL, [kline])
+        else:
+            self._live_bars[symbol] = dict(kline)
+
+    def live_bar(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """The stream's open 1m bar, if it is the current minute; stale bars are dropped."""
+        live_bar = self._live_bars.get(symbol)
+        if live_bar is None:
+            return None
+
+        base_step_ms = INTERVAL_MS[BASE_INTERVAL]
+        if live_bar["timestamp"] != int(time.time() * 1000) // base_step_ms * base_step_ms:
+            # The stream stopped before this bar closed; stored bars are authoritative
+            self._live_bars.pop(symbol, None)
+            return None
+        return live_bar
+
+    def clear_live_bars(self) -> None:
+        """Forget every open stream bar (the market stream disconnected)."""
+        self._live_bars.clear()
+
+    def _base_window(self, interval: str, limit: int) -> Tuple[int, int]:
+        step_ms = INTERVAL_MS[interval]
+        current_open = int(time.time() * 1000) // step_ms * step_ms
+        return current_open - (limit - 1) * step_ms, current_open + step_ms - INTERVAL_MS[BASE_INTERVAL]
+
+    def can_roll_up(self, symbol: str, interval: str, limit: int) -> bool:
+        """True if `interval` can be built from 1m bars: a small window, or one already stored."""
+        if interval == BASE_INTERVAL:
+            return False
+
+        base_bars = limit * INTERVAL_MS[interval] // INTERVAL_MS[BASE_INTERVAL]
+        if base_bars <= self.rollup_max_base_bars:
+            return True
+
+        window_start, _ = self._base_window(interval, limit)
+        stored = self.stored_range(symbol, BASE_INTERVAL, window_start, int(time.time() * 1000))
+        return stored is not None and stored[0] <= window_start
+
+    def roll_up(self, symbol: str, interval: str, limit: int) -> List[Dict[str, Any]]:
+        """Aggregate stored 1m bars into the latest `limit` bars of `interval`."""
+        step_ms = INTERVAL_MS[interval]
+        window_start, window_end = self._base_window(interval, limit)
+        live_bar = self.live_bar(symbol)
+        if live_bar and live_bar["timestamp"] <= window_end:
+            # The stream's copy of the open minute wins over any stored snapshot of it
+            window_end = live_bar["timestamp"] - 1
+        base = self.get_candles(symbol, BASE_INTERVAL, start_time=window_start, end_time=window_end)
+        if not base:
+            return []
+
+        open_times = np.fromiter((bar["timestamp"] for bar in base), dtype=np.int64, count=len(base))
+        columns = {
+            field: np.fromiter((bar[field] for bar in base), dtype=float, count=len(base))
+            for field in ("open", "high", "low", "close", "volume")
+        }
+
+        buckets = open_times // step_ms * step_ms
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(base)] - 1
+
+        highs = np.maximum.reduceat(columns["high"], starts)
+        lows = np.minimum.reduceat(columns["low"], starts)
+        volumes = np.add.reduceat(columns["volume"], starts)
+
+        return [
+            {
+                "timestamp": int(buckets[start]),
+                "open": float(columns["open"][start]),
+                "high": float(high),
+                "low": float(low),
+                "close": float(columns["close"][end]),
+                "volume": float(volume),
+            }
+            for start, end, high, low, volume in zip(starts, ends, highs, lows, volumes)
+        ]
+
+    def _merge_live_bar(
+        self, candles: List[Dict[str, Any]], symbol: str, interval: str, rolled_up: bool
+    ) -> List[Dict[str, Any]]:
+        """Fold the stream's open 1m bar into the open bar of `interval`."""
+        live_bar = self.live_bar(symbol)
+        if not live_bar or not candles:
+            return candles
+
+        step_ms = INTERVAL_MS[interval]
+        bucket = live_bar["timestamp"] // step_ms * step_ms
+        last = candles[-1]
+
+        if interval == BASE_INTERVAL:
+            if bucket == last["timestamp"]:
+                candles[-1] = dict(live_bar)
+            elif bucket > last["timestamp"]:
+                candles.append(dict(live_bar))
+            return candles
+
+        if bucket == last["timestamp"]:
+            # A native (not rolled-up) open bar already counts part of this minute's volume
+            candles[-1] = {
+                "timestamp": last["timestamp"],
+                "open": last["open"],
+                "high": max(last["high"], live_bar["high"]),
+                "low": min(last["low"], live_bar["low"]),
+                "close": live_bar["close"],
+                "volume": last["volume"] + live_bar["volume"] if rolled_up else last["volume"],
+            }
+        elif bucket > last["timestamp"]:
+            candles.append({**live_bar, "timestamp": bucket})
+        return candles
+
+    def get_recent(self, symbol: str, interval: str, limit: int) -> List[Dict[str, Any]]:
+        """Sync the store, then serve the latest `limit` candles from disk.
+
+        Intervals above 1m are rolled up from the 1m base series when possible,
+        so only that one series is fetched upstream.
+        """
+        use_rollup = self.can_roll_up(symbol, interval, limit)
+        sync_interval, sync_limit = interval, limit
+        if use_rollup:
+            # Sync 1m bars back to the first bucket boundary so no bucket is partial
+            base_step_ms = INTERVAL_MS[BASE_INTERVAL]
+            window_start, _ = self._base_window(interval, limit)
+            current_base_open = int(time.time() * 1000) // base_step_ms * base_step_ms
+            sync_interval = BASE_INTERVAL
+            sync_limit = (current_base_open - window_start) // base_step_ms + 1
+
+        try:
+            self.sync(symbol, sync_interval, sync_limit)
+        except Exception as e:
+            logger.warning("Candle store sync failed for %s %s: %s", symbol, sync_interval, e)
+
+        if use_rollup:
+            candles = self.roll_up(symbol, interval, limit)
+        else:
+            candles = self.get_candles(symbol, interval, limit=limit)
+        return self._merge_live_bar(candles, symbol, interval, use_rollup)[-limit:]
+
+
+# Global instance
+candle_store = CandleStore()
@@ -0,0 +1,221 @@
+"""
+Circuit breakers for external providers.
+
+Each upstream gets one breaker. While it is closed, request outcomes are
+tracked over a sliding time window; once the failure rate crosses the
+threshold it opens and every call fails fast with CircuitOpenError, so
+callers drop straight to their cache or fallback path instead of waiting
+for a timeout. After the cool-down a single probe request is let through
+(half-open): success closes the breaker, failure re-opens it with a longer
+cool-down.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float, reason: Optional[str] = None) -> None:
+        self.name = name
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"{name} circuit is open (retry in {retry_after:.0f}s{f', {reason}' if reason else ''})")
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with single-probe half-open recovery."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 300.0,
+        probe_timeout_seconds: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+
+        self.state = CLOSED
+        self.reason: Optional[str] = None
+        self.opened_at: Optional[float] = None
+        self.open_until = 0.0
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._current_open_seconds = open_seconds
+        self._probe_started_at: Optional[float] = None
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _open(self, now: float, duration: float, reason: Optional[str]) -> None:
+        self.state = OPEN
+        self.reason = reason
+        self.opened_at = now
+        self.open_until = now + duration
+        self.times_opened += 1
+        self._probe_started_at = None
+        self._outcomes.clear()
+        logger.warning("Circuit %s opened for %.0fs (%s)", self.name, duration, reason or "failure rate")
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go upstream right now."""
+        now = time.time()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and now < self.open_until:
+                self.rejected_calls += 1
+                return False
+
+            # Cool-down over: admit exactly one probe at a time
+            probe_stalled = (
+                self._probe_started_at is not None
+                and now - self._probe_started_at > self.probe_timeout_seconds
+            )
+            if self.state == OPEN or self._probe_started_at is None or probe_stalled:
+                self.state = HALF_OPEN
+                self._probe_started_at = now
+                return True
+
+            self.rejected_calls += 1
+            return False
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a call may go upstream."""
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, max(0.0, self.open_until - time.time()), self.reason)
+
+    def record_success(self) -> None:
+        now = time.time()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                logger.info("Circuit %s closed after successful probe", self.name)
+                self.state = CLOSED
+                self.reason = None
+                self.opened_at = None
+                self._probe_started_at = None
+                self._current_open_seconds = self.open_seconds
+                self._outcomes.clear()
+                return
+
+            self._outcomes.append((now, True))
+            self._prune(now)
+
+    def record_failure(self, reason: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._current_open_seconds = min(self._current_open_seconds * 2, self.max_open_seconds)
+                self._open(now, self._current_open_seconds, reason or "probe failed")
+                return
+
+            if self.state == OPEN:
+                return
+
+            self._outcomes.append((now, False))
+            self._prune(now)
+
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if len(self._outcomes) >= self.minimum_calls and failures / len(self._outcomes) >= self.failure_rate_threshold:
+                self._open(now, self._current_open_seconds, reason)
+
+    def trip(self, duration: float, reason: str) -> None:
+        """Force the breaker open, e.g. when the upstream reports a long block."""
+        with self._lock:
+            self._open(time.time(), duration, reason)
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a sync call through the breaker; any exception counts as a failure."""
+        self.check()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        self.record_success()
+        return result
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def guarded(*args: Any, **kwargs: Any) -> Any:
+            return self.call(func, *args, **kwargs)
+        return guarded
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": self.state,
+                "reason": self.reason,
+                "retry_in_seconds": round(self.open_until - now, 1) if self.state == OPEN and now < self.open_until else 0,
+                "window_calls": len(self._outcomes),
+                "window_failures": failures,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, **overrides: Any) -> CircuitBreaker:
+    """Return the process-wide breaker for a provider, creating it on first use.
+
+    Defaults come from CIRCUIT_* env vars, overridable per provider with
+    CIRCUIT_<NAME>_* (e.g. CIRCUIT_COINGECKO_OPEN_SECONDS).
+    """
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            def setting(key: str, default: float) -> float:
+                raw_value = os.getenv(f"CIRCUIT_{name.upper()}_{key}") or os.getenv(f"CIRCUIT_{key}")
+                return float(raw_value) if raw_value else default
+
+            options = {
+                "failure_rate_threshold": setting("FAILURE_RATE", 0.5),
+                "minimum_calls": int(setting("MINIMUM_CALLS", 5)),
+                "window_seconds": setting("WINDOW_SECONDS", 60),
+                "open_seconds": setting("OPEN_SECONDS", 30),
+                "max_open_seconds": setting("MAX_OPEN_SECONDS", 300),
+            }
+            options.update(overrides)
+            breaker = CircuitBreaker(name, **options)
+            _breakers[name] = breaker
+        return breaker
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.get_status() for name, breaker in breakers.items()}
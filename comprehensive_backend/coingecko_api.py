@@ -4,13 +4,27 @@ Free API - No authentication required
 """
 
 import requests
+import httpx
 import logging
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+import os
+import threading
 import time
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+
+from bounded_cache import BoundedCache
+from circuit_breaker import get_breaker
+from http_client import http_transport
+from rate_limiter import PriorityTokenBucket
+from single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
+# Rate-limit lanes: price fallbacks are served before market overlays, then sentiment/trending
+PRIORITY_PRICE = 0
+PRIORITY_MARKET = 1
+PRIORITY_SENTIMENT = 2
+
 
 class CoinGeckoAPI:
     """CoinGecko API client for cryptocurrency market data"""
@@ -31,34 +45,123 @@ class CoinGeckoAPI:
         'AVAX': 'avalanche-2',
         'LINK': 'chainlink',
     }
+
+    # Query for coins/{id} sentiment without the heavy localization/ticker/market payloads
+    SENTIMENT_PARAMS = {
+        'localization': 'false',
+        'tickers': 'false',
+        'market_data': 'false',
+        'community_data': 'true',
+        'developer_data': 'true'
+    }
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'Accept': 'application/json',
             'User-Agent': 'AI-Power-Trade/1.0'
-        })
-        self.last_request_time = 0
-        self.rate_limit_delay = 1.5  # Seconds between requests (free tier)
-    
-    def _rate_limit(self):
-        """Implement rate limiting for free tier"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        }
+        self.session = http_transport.sync_session(self.headers)
+        # Free tier allows roughly one request per 1.5s; lower lanes leave tokens for the ones above
+        self.limiter = PriorityTokenBucket(
+            "coingecko",
+            rate=float(os.getenv("COINGECKO_RATE_PER_SECOND", str(1 / 1.5))),
+            capacity=float(os.getenv("COINGECKO_BURST", "3")),
+            max_waiters=(8, 4, 2),
+            max_wait=(3.0, 5.0, 2.0),
+            reserve=(0, 1, 2),
+        )
+        # Last good response per request, served when the budget or breaker refuses a call
+        self.fallback_cache = BoundedCache.from_env(
+            "coingecko_fallback", "COINGECKO_FALLBACK_CACHE", default_ttl=3600, max_entries=128, max_mb=4
+        )
+        self.fallbacks_served = 0
+        self.breaker = get_breaker("coingecko")
+
+        # One coins/markets call refreshes every COIN_IDS entry; per-symbol reads share it
+        self.markets_ttl = float(os.getenv("COINGECKO_MARKETS_TTL_SECONDS", "60"))
+        # Past this age a snapshot that failed to refresh is no longer served at all
+        self.markets_max_stale = float(os.getenv("COINGECKO_MARKETS_MAX_STALE_SECONDS", "600"))
+        self._markets: Dict[str, Dict] = {}
+        self._markets_at = 0.0
+        self._markets_lock = threading.Lock()
+        self.markets_refreshes = 0
+        # coins/markets has no sentiment fields and there is no multi-id endpoint for them,
+        # so per-coin sentiment is cached for much longer; it moves slowly
+        self.sentiment_cache = BoundedCache(
+            "coingecko_sentiment", max_entries=64, default_ttl=float(os.getenv("COINGECKO_SENTIMENT_TTL_SECONDS", "1800"))
+        )
+
+    @staticmethod
+    def _request_key(endpoint: str, params: Optional[Dict]) -> str:
+        return endpoint + "?" + "&".join(f"{key}={value}" for key, value in sorted((params or {}).items()))
+
+    def _fallback(self, endpoint: str, params: Optional[Dict], reason: str) -> Optional[Dict]:
+        data = self.fallback_cache.peek(self._request_key(endpoint, params))
+        if data is not None:
+            self.fallbacks_served += 1
+        logger.debug("CoinGecko %s skipped (%s); %s", endpoint, reason, "serving last response" if data else "no fallback")
+        return data
+
+    def get_limiter_status(self) -> Dict[str, Any]:
+        return {
+            **self.limiter.get_stats(),
+            "fallbacks_served": self.fallbacks_served,
+            "fallback_cache": self.fallback_cache.get_stats(),
+            "markets_snapshot": {
+                "coins": len(self._markets),
+                "age_seconds": round(time.time() - self._markets_at, 1) if self._markets_at else None,
+                "ttl_seconds": self.markets_ttl,
+                "max_stale_seconds": self.markets_max_stale,
+                "refreshes": self.markets_refreshes,
+            },
+            "sentiment_cache": self.sentiment_cache.get_stats(),
+        }
     
-    def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
+    def _record_status(self, status_code: int) -> None:
+        # 4xx other than 429 is a bad request on our side, not an unhealthy upstream
+        if status_code >= 500 or status_code == 429:
+            self.breaker.record_failure(f"HTTP {status_code}")
+        else:
+            self.breaker.record_success()
+
+    def _make_request(self, endpoint: str, params: Dict = None, priority: int = PRIORITY_MARKET) -> Optional[Dict]:
         """Make API request with error handling"""
-        self._rate_limit()
+        # Fail fast while the breaker is open instead of waiting on the rate limit
+        if not self.breaker.allow_request():
+            return self._fallback(endpoint, params, "circuit open")
+        if not self.limiter.acquire_sync(priority):
+            return self._fallback(endpoint, params, "rate limited")
         
         try:
             url = f"{self.BASE_URL}/{endpoint}"
             response = self.session.get(url, params=params, timeout=10)
+            self._record_status(response.status_code)
             response.raise_for_status()
-            return response.json()
+            return self.fallback_cache.set(self._request_key(endpoint, params), response.json())
         except requests.exceptions.RequestException as e:
+            if getattr(e, "response", None) is None:
+                self.breaker.record_failure(f"{type(e).__name__}: {e}")
+            logger.error(f"CoinGecko API error: {e}")
+            return None
+
+    async def _make_request_async(
+        self, endpoint: str, params: Dict = None, priority: int = PRIORITY_MARKET
+    ) -> Optional[Dict]:
+        """Make API request on the shared async connection pool"""
+        if not self.breaker.allow_request():
+            return self._fallback(endpoint, params, "circuit open")
+        if not await self.limiter.acquire(priority):
+            return self._fallback(endpoint, params, "rate limited")
+
+        try:
+            url = f"{self.BASE_URL}/{endpoint}"
+            response = await http_transport.get(url, params=params, headers=self.headers, timeout=10)
+            self._record_status(response.status_code)
+            response.raise_for_status()
+            return self.fallback_cache.set(self._request_key(endpoint, params), response.json())
+        except (httpx.HTTPError, ValueError) as e:
+            if isinstance(e, httpx.TransportError):
+                self.breaker.record_failure(f"{type(e).__name__}: {e}")
             logger.error(f"CoinGecko API error: {e}")
             return None
     
@@ -66,44 +169,100 @@ class CoinGeckoAPI:
         """Get CoinGecko coin ID from symbol"""
         return self.COIN_IDS.get(symbol.upper())
     
+    def _markets_params(self) -> Dict[str, str]:
+        return {
+            'vs_currency': 'usd',
+            'ids': ','.join(dict.fromkeys(self.COIN_IDS.values())),
+            'price_change_percentage': '24h,7d,30d',
+            'per_page': '250',
+            'sparkline': 'false',
+        }
+
+    def _markets_fresh(self) -> bool:
+        return bool(self._markets) and time.time() - self._markets_at < self.markets_ttl
+
+    def _usable_markets(self) -> Dict[str, Dict]:
+        """The snapshot, or {} once a failed refresh has left it older than markets_max_stale."""
+        if time.time() - self._markets_at > self.markets_max_stale:
+            return {}
+        return self._markets
+
+    def _snapshot_fields(self) -> Dict[str, Any]:
+        """When the markets snapshot was taken, so fallbacks cannot pass old prices off as current."""
+        age = time.time() - self._markets_at
+        return {
+            'timestamp': datetime.fromtimestamp(self._markets_at).isoformat(),
+            'age_seconds': round(age, 1),
+            'stale': age >= self.markets_ttl,
+        }
+
+    def _store_markets(self, data: Optional[List[Dict]]) -> None:
+        if not isinstance(data, list):
+            return
+        rows = {row['id']: row for row in data if isinstance(row, dict) and row.get('id')}
+        if rows:
+            self._markets = rows
+            self._markets_at = time.time()
+            self.markets_refreshes += 1
+
+    def refresh_markets(self) -> Dict[str, Dict]:
+        """Refresh the shared coins/markets snapshot if it is older than the TTL."""
+        with self._markets_lock:
+            if not self._markets_fresh():
+                self._store_markets(self._make_request('coins/markets', params=self._markets_params(), priority=PRIORITY_PRICE))
+        return self._usable_markets()
+
+    async def refresh_markets_async(self) -> Dict[str, Dict]:
+        """Async variant of refresh_markets; concurrent callers share one request."""
+        if not self._markets_fresh():
+            async def fetch() -> None:
+                self._store_markets(
+                    await self._make_request_async('coins/markets', params=self._markets_params(), priority=PRIORITY_PRICE)
+                )
+            await single_flight.do('coingecko:markets', fetch)
+        return self._usable_markets()
+
+    def markets_needs_refresh(self, within: float = 0.0) -> bool:
+        return not self._markets or time.time() - self._markets_at >= self.markets_ttl - within
+
     def get_price(self, symbol: str) -> Optional[Dict]:
         """Get current price and market data"""
         coin_id = self.get_coin_id(symbol)
         if not coin_id:
             return None
-        
-        data = self._make_request(
-            f"coins/{coin_id}",
-            params={
-                'localization': 'false',
-                'tickers': 'false',
-                'community_data': 'false',
-                'developer_data': 'false'
-            }
-        )
-        
-        if not data:
+
+        return self._parse_price(symbol, self.refresh_markets().get(coin_id))
+
+    async def get_price_async(self, symbol: str) -> Optional[Dict]:
+        """Async variant of get_price"""
+        coin_id = self.get_coin_id(symbol)
+        if not coin_id:
+            return None
+
+        return self._parse_price(symbol, (await self.refresh_markets_async()).get(coin_id))
+
+    def _parse_price(self, symbol: str, row: Optional[Dict]) -> Optional[Dict]:
+        if not row:
             return None
         
         try:
-            market_data = data.get('market_data', {})
             return {
                 'symbol': symbol.upper(),
-                'price': market_data.get('current_price', {}).get('usd', 0),
-                'market_cap': market_data.get('market_cap', {}).get('usd', 0),
-                'volume_24h': market_data.get('total_volume', {}).get('usd', 0),
-                'price_change_24h': market_data.get('price_change_percentage_24h', 0),
-                'price_change_7d': market_data.get('price_change_percentage_7d', 0),
-                'price_change_30d': market_data.get('price_change_percentage_30d', 0),
-                'high_24h': market_data.get('high_24h', {}).get('usd', 0),
-                'low_24h': market_data.get('low_24h', {}).get('usd', 0),
-                'ath': market_data.get('ath', {}).get('usd', 0),
-                'ath_change_percentage': market_data.get('ath_change_percentage', {}).get('usd', 0),
-                'atl': market_data.get('atl', {}).get('usd', 0),
-                'atl_change_percentage': market_data.get('atl_change_percentage', {}).get('usd', 0),
-                'circulating_supply': market_data.get('circulating_supply', 0),
-                'total_supply': market_data.get('total_supply', 0),
-                'timestamp': datetime.now().isoformat()
+                'price': row.get('current_price') or 0,
+                'market_cap': row.get('market_cap') or 0,
+                'volume_24h': row.get('total_volume') or 0,
+                'price_change_24h': row.get('price_change_percentage_24h') or 0,
+                'price_change_7d': row.get('price_change_percentage_7d_in_currency') or 0,
+                'price_change_30d': row.get('price_change_percentage_30d_in_currency') or 0,
+                'high_24h': row.get('high_24h') or 0,
+                'low_24h': row.get('low_24h') or 0,
+                'ath': row.get('ath') or 0,
+                'ath_change_percentage': row.get('ath_change_percentage') or 0,
+                'atl': row.get('atl') or 0,
+                'atl_change_percentage': row.get('atl_change_percentage') or 0,
+                'circulating_supply': row.get('circulating_supply') or 0,
+                'total_supply': row.get('total_supply') or 0,
+                **self._snapshot_fields(),
             }
         except Exception as e:
             logger.error(f"Error parsing CoinGecko data: {e}")
@@ -111,50 +270,31 @@ class CoinGeckoAPI:
 
     def get_simple_prices(self, symbols: List[str]) -> Dict[str, Dict]:
         """Get batch spot prices with lightweight metadata for multiple symbols."""
-        normalized_symbols = [str(symbol or "").upper() for symbol in symbols]
-        symbol_to_coin_id = {}
+        return self._parse_simple_prices(symbols, self.refresh_markets())
 
-        for symbol in normalized_symbols:
-            coin_id = self.get_coin_id(symbol)
-            if coin_id:
-                symbol_to_coin_id[symbol] = coin_id
-
-        if not symbol_to_coin_id:
-            return {}
+    async def get_simple_prices_async(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Async variant of get_simple_prices"""
+        return self._parse_simple_prices(symbols, await self.refresh_markets_async())
 
-        data = self._make_request(
-            "simple/price",
-            params={
-                "ids": ",".join(dict.fromkeys(symbol_to_coin_id.values())),
-                "vs_currencies": "usd",
-                "include_24hr_change": "true",
-                "include_24hr_vol": "true",
-            },
-        )
-
-        if not data:
-            return {}
-
-        timestamp = datetime.now().isoformat()
+    def _parse_simple_prices(self, symbols: List[str], markets: Dict[str, Dict]) -> Dict[str, Dict]:
+        snapshot_fields = self._snapshot_fields()
         prices: Dict[str, Dict] = {}
 
-        for symbol, coin_id in symbol_to_coin_id.items():
-            coin_data = data.get(coin_id) or {}
-            price = coin_data.get("usd", 0)
-            change_24h = coin_data.get("usd_24h_change", 0)
-            volume_24h = coin_data.get("usd_24h_vol", 0)
-
+        for symbol in [str(symbol or "").upper() for symbol in symbols]:
+            row = markets.get(self.get_coin_id(symbol) or "") or {}
+            price = row.get("current_price") or 0
             if not price:
                 continue
 
+            change_24h = row.get("price_change_percentage_24h") or 0
             prices[symbol] = {
                 "symbol": symbol,
                 "price": float(price),
-                "high_24h": float(price * (1 + abs(change_24h or 0) / 100)),
-                "low_24h": float(price * (1 - abs(change_24h or 0) / 100)),
-                "volume_24h": float(volume_24h or 0),
-                "change_24h": float(change_24h or 0),
-                "timestamp": timestamp,
+                "high_24h": float(row.get("high_24h") or price),
+                "low_24h": float(row.get("low_24h") or price),
+                "volume_24h": float(row.get("total_volume") or 0),
+                "change_24h": float(change_24h),
+                **snapshot_fields,
                 "source": "CoinGecko",
             }
 
@@ -197,8 +337,13 @@ class CoinGeckoAPI:
     
     def get_global_market_data(self) -> Optional[Dict]:
         """Get global cryptocurrency market data"""
-        data = self._make_request("global")
-        
+        return self._parse_global_market_data(self._make_request("global"))
+
+    async def get_global_market_data_async(self) -> Optional[Dict]:
+        """Async variant of get_global_market_data"""
+        return self._parse_global_market_data(await self._make_request_async("global"))
+
+    def _parse_global_market_data(self, data: Optional[Dict]) -> Optional[Dict]:
         if not data:
             return None
         
@@ -220,8 +365,13 @@ class CoinGeckoAPI:
     
     def get_trending_coins(self) -> Optional[List[Dict]]:
         """Get trending coins"""
-        data = self._make_request("search/trending")
-        
+        return self._parse_trending_coins(self._make_request("search/trending", priority=PRIORITY_SENTIMENT))
+
+    async def get_trending_coins_async(self) -> Optional[List[Dict]]:
+        """Async variant of get_trending_coins"""
+        return self._parse_trending_coins(await self._make_request_async("search/trending", priority=PRIORITY_SENTIMENT))
+
+    def _parse_trending_coins(self, data: Optional[Dict]) -> Optional[List[Dict]]:
         if not data:
             return None
         
@@ -246,9 +396,31 @@ class CoinGeckoAPI:
         coin_id = self.get_coin_id(symbol)
         if not coin_id:
             return None
-        
-        data = self._make_request(f"coins/{coin_id}")
-        
+
+        cached = self.sentiment_cache.get(coin_id)
+        if cached is not None:
+            return cached
+
+        data = self._make_request(f"coins/{coin_id}", params=self.SENTIMENT_PARAMS, priority=PRIORITY_SENTIMENT)
+        return self._cache_sentiment(coin_id, self._parse_market_sentiment(symbol, data))
+
+    async def get_market_sentiment_async(self, symbol: str) -> Optional[Dict]:
+        """Async variant of get_market_sentiment"""
+        coin_id = self.get_coin_id(symbol)
+        if not coin_id:
+            return None
+
+        cached = self.sentiment_cache.get(coin_id)
+        if cached is not None:
+            return cached
+
+        data = await self._make_request_async(f"coins/{coin_id}", params=self.SENTIMENT_PARAMS, priority=PRIORITY_SENTIMENT)
+        return self._cache_sentiment(coin_id, self._parse_market_sentiment(symbol, data))
+
+    def _cache_sentiment(self, coin_id: str, sentiment: Optional[Dict]) -> Optional[Dict]:
+        return self.sentiment_cache.set(coin_id, sentiment) if sentiment else None
+
+    def _parse_market_sentiment(self, symbol: str, data: Optional[Dict]) -> Optional[Dict]:
         if not data:
             return None
         
@@ -275,7 +447,15 @@ class CoinGeckoAPI:
         """Get comprehensive market data for a coin"""
         price_data = self.get_price(symbol)
         sentiment_data = self.get_market_sentiment(symbol)
-        
+        return self._combine_enhanced_market_data(price_data, sentiment_data)
+
+    async def get_enhanced_market_data_async(self, symbol: str) -> Optional[Dict]:
+        """Async variant of get_enhanced_market_data"""
+        price_data = await self.get_price_async(symbol)
+        sentiment_data = await self.get_market_sentiment_async(symbol)
+        return self._combine_enhanced_market_data(price_data, sentiment_data)
+
+    def _combine_enhanced_market_data(self, price_data: Optional[Dict], sentiment_data: Optional[Dict]) -> Optional[Dict]:
         if not price_data:
             return None
         
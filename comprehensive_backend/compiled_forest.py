@@ -0,0 +1,174 @@
+"""
+Random Forest compiled into flat NumPy node arrays for fast batch inference.
+
+Every tree of a fitted sklearn RandomForestClassifier is laid end to end in
+shared arrays: split feature, threshold, left/right child and per-node
+class probabilities. Leaves point at themselves, so a batch of rows walks
+all trees at once with one gather per depth level and no Python per tree.
+
+A StandardScaler in front of the forest is folded into the thresholds.
+sklearn decides a split as float32((x - mean) / scale) <= threshold; that
+predicate is monotone in x, so each node gets the largest raw float64
+value that still goes left (found by bisecting over float64 bit patterns).
+Raw features then compare directly and route exactly as sklearn would.
+Probabilities are averaged over trees in sklearn's order; they match
+predict_proba to within a few ulps (~1e-15), not bit for bit.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+_SIGN_MASK = np.int64(0x7FFFFFFFFFFFFFFF)
+
+
+def _ordered_keys(values: np.ndarray) -> np.ndarray:
+    """Map float64 values to int64 keys with the same ordering (self-inverse)."""
+    bits = values.view(np.int64)
+    return bits ^ ((bits >> 63) & _SIGN_MASK)
+
+
+def _from_ordered_keys(keys: np.ndarray) -> np.ndarray:
+    return (keys ^ ((keys >> 63) & _SIGN_MASK)).view(np.float64)
+
+
+def fold_thresholds(thresholds: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Largest raw x per node with float32((x - mean) / scale) <= threshold."""
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    mean = np.asarray(mean, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+
+    def goes_left(keys: np.ndarray) -> np.ndarray:
+        with np.errstate(over="ignore", invalid="ignore"):
+            scaled = ((_from_ordered_keys(keys) - mean) / scale).astype(np.float32)
+        return scaled <= thresholds
+
+    # Invariant: lo goes left and hi does not (both ends of the finite range)
+    lo = _ordered_keys(np.full(len(thresholds), -np.finfo(np.float64).max))
+    hi = _ordered_keys(np.full(len(thresholds), np.finfo(np.float64).max))
+    always_left, never_left = goes_left(hi), ~goes_left(lo)
+    for _ in range(66):
+        # Midpoint without overflowing int64 across the whole key range
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        left = goes_left(mid)
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+    folded = np.where(always_left, np.inf, _from_ordered_keys(lo))
+    return np.where(never_left, -np.inf, folded)
+
+
+class CompiledForest:
+    """Flat-array evaluator equivalent to a fitted RandomForestClassifier."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        depth: int,
+        classes: np.ndarray,
+        feature_importances: np.ndarray,
+    ) -> None:
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # Interleaved [left, right] pairs: child of node n is children[2n + went_right]
+        self.children = np.column_stack((left, right)).ravel()
+        # (nodes, classes) class probabilities of each node
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.classes = classes
+        self.feature_importances = feature_importances
+
+    @classmethod
+    def from_sklearn(cls, model: Any, scaler: Optional[Any] = None) -> "CompiledForest":
+        """Compile `model`, folding an optional fitted StandardScaler into its thresholds."""
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        n_features = int(model.n_features_in_)
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+        if scaler is not None:
+            if getattr(scaler, "mean_", None) is not None:
+                mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if getattr(scaler, "scale_", None) is not None:
+                scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            count = tree.node_count
+            nodes = np.arange(offset, offset + count)
+            leaf = tree.children_left < 0
+            feature = np.where(leaf, 0, tree.feature).astype(np.intp)
+
+            threshold = np.full(count, np.inf)
+            split = ~leaf
+            threshold[split] = fold_thresholds(tree.threshold[split], mean[feature[split]], scale[feature[split]])
+
+            # Leaves loop back to themselves so every row can take the same number of steps
+            lefts.append(np.where(leaf, nodes, tree.children_left + offset))
+            rights.append(np.where(leaf, nodes, tree.children_right + offset))
+
+            # Per-tree probabilities, normalized the way DecisionTreeClassifier.predict_proba does
+            proba = tree.value[:, 0, :].astype(np.float64)
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            roots.append(offset)
+            depth = max(depth, int(tree.max_depth))
+            offset += count
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            depth=depth,
+            classes=np.asarray(model.classes_),
+            feature_importances=np.asarray(model.feature_importances_, dtype=np.float64),
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    def predict_proba(self, rows: np.ndarray) -> np.ndarray:
+        """Class probabilities for raw (unscaled) feature rows, shape (rows, classes)."""
+        rows = np.ascontiguousarray(np.atleast_2d(rows), dtype=np.float64)
+        flat_rows = rows.ravel()
+        row_offset = (np.arange(len(rows)) * rows.shape[1])[:, None]
+        nodes = np.repeat(self.roots[None, :], len(rows), axis=0)
+        for _ in range(self.depth):
+            values = flat_rows.take(row_offset + self.feature.take(nodes))
+            went_right = values > self.threshold.take(nodes)
+            nodes = self.children.take(2 * nodes + went_right)
+
+        # Sum trees in order along the leading axis (sequential, as sklearn accumulates)
+        return self.value.take(nodes.T, axis=0).sum(axis=0) / len(self.roots)
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(rows), axis=1)]
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "trees": len(self.roots),
+            "nodes": self.node_count,
+            "max_depth": self.depth,
+            "classes": self.classes.tolist(),
+        }
@@ -5,9 +5,11 @@ Provides improved predictions with confidence visualization
 
 import numpy as np
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
+from indicator_series import indicator_series
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -67,64 +69,16 @@ class EnhancedPredictor:
         else:
             return 'LOW'
     
-    def calculate_technical_indicators(self, prices: List[float]) -> Dict:
+    def calculate_technical_indicators(self, prices: Union[List[float], np.ndarray]) -> Dict:
         """Calculate technical indicators from price history"""
         if len(prices) < 20:
             return {}
-        
-        prices_array = np.array(prices)
-        
-        # RSI
-        deltas = np.diff(prices_array)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        avg_gain = np.mean(gains[-14:]) if len(gains) >= 14 else 0
-        avg_loss = np.mean(losses[-14:]) if len(losses) >= 14 else 0
-        rs = avg_gain / (avg_loss + 0.0001)
-        rsi = 100 - (100 / (1 + rs))
-        
-        # Moving Averages
-        ma_5 = np.mean(prices_array[-5:])
-        ma_20 = np.mean(prices_array[-20:])
-        
-        # MACD
-        ema_12 = self._calculate_ema(prices_array, 12)
-        ema_26 = self._calculate_ema(prices_array, 26)
-        macd = ema_12 - ema_26
-        
-        # Bollinger Bands
-        bb_middle = ma_20
-        bb_std = np.std(prices_array[-20:])
-        bb_upper = bb_middle + (2 * bb_std)
-        bb_lower = bb_middle - (2 * bb_std)
-        
-        # Volatility
-        volatility = np.std(prices_array[-20:]) / np.mean(prices_array[-20:])
-        
-        return {
-            'rsi': float(rsi),
-            'ma_5': float(ma_5),
-            'ma_20': float(ma_20),
-            'macd': float(macd),
-            'bb_upper': float(bb_upper),
-            'bb_middle': float(bb_middle),
-            'bb_lower': float(bb_lower),
-            'volatility': float(volatility),
-            'current_price': float(prices_array[-1])
-        }
-    
-    def _calculate_ema(self, prices: np.ndarray, period: int) -> float:
-        """Calculate Exponential Moving Average"""
-        if len(prices) < period:
-            return float(np.mean(prices))
-        
-        multiplier = 2 / (period + 1)
-        ema = np.mean(prices[:period])
-        
-        for price in prices[period:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return float(ema)
+
+        series = indicator_series(prices)
+        keys = ('rsi', 'ma_5', 'ma_20', 'macd', 'bb_upper', 'bb_middle', 'bb_lower', 'volatility')
+        indicators = {key: float(series[key][-1]) for key in keys}
+        indicators['current_price'] = float(series['price'][-1])
+        return indicators
     
     def _extract_price(self, point: Any) -> float:
         """Extract numeric price from float or dict history items."""
@@ -148,29 +102,31 @@ class EnhancedPredictor:
                 return 0.0
         return 0.0
 
-    def normalize_price_history(self, price_history: List[Any]) -> List[Dict]:
+    def normalized_columns(self, price_history: Union[List[Any], np.ndarray]) -> Dict[str, np.ndarray]:
+        """Aligned feature columns for a whole history, computed in one vectorized pass."""
+        if isinstance(price_history, np.ndarray):
+            prices = np.asarray(price_history, dtype=float)
+            volumes = np.zeros(len(prices))
+        else:
+            prices = np.array([self._extract_price(point) for point in price_history], dtype=float)
+            volumes = np.array([self._extract_volume(point) for point in price_history], dtype=float)
+
+        series = indicator_series(prices)
+        # Points before the first full 20-price window carry neutral defaults
+        warming_up = np.isnan(series['ma_20'])
+        columns = {'price': prices, 'volume': volumes}
+        columns['rsi'] = np.where(warming_up, 50.0, series['rsi'])
+        columns['macd'] = np.where(warming_up, 0.0, series['macd'])
+        for key in ('ma_5', 'ma_20', 'bb_upper', 'bb_lower'):
+            columns[key] = np.where(warming_up, prices, series[key])
+        return columns
+
+    def normalize_price_history(self, price_history: Union[List[Any], np.ndarray]) -> List[Dict]:
         """Convert mixed price history into feature-rich dict items."""
-        normalized_history = []
-        running_prices: List[float] = []
-
-        for point in price_history:
-            price = self._extract_price(point)
-            volume = self._extract_volume(point)
-            running_prices.append(price)
-
-            indicators = self.calculate_technical_indicators(running_prices) if len(running_prices) >= 20 else {}
-            normalized_history.append({
-                'price': price,
-                'volume': volume,
-                'rsi': float(indicators.get('rsi', 50.0)),
-                'macd': float(indicators.get('macd', 0.0)),
-                'ma_5': float(indicators.get('ma_5', price)),
-                'ma_20': float(indicators.get('ma_20', price)),
-                'bb_upper': float(indicators.get('bb_upper', price)),
-                'bb_lower': float(indicators.get('bb_lower', price)),
-            })
-
-        return normalized_history
+        columns = self.normalized_columns(price_history)
+        names = list(columns)
+        rows = np.column_stack([columns[name] for name in names]).tolist()
+        return [dict(zip(names, row)) for row in rows]
 
     def _get_signal_from_scores(self, signal_scores: Dict[str, float]) -> str:
         """Pick the dominant signal, using HOLD when scores are too close."""
@@ -438,7 +394,7 @@ class EnhancedPredictor:
             'rationale_summary': ' '.join(rationale_parts).strip()
         }
     
-    def predict(self, symbol: str, price_history: List[Any]) -> Dict:
+    def predict(self, symbol: str, price_history: Union[List[Any], np.ndarray]) -> Dict:
         """Generate enhanced prediction with all available data"""
         result = {
             'symbol': symbol,
@@ -490,16 +446,15 @@ class EnhancedPredictor:
             
             # ML prediction
             ml_pred = None
-            if self.ml and prices_only:
-                indicators = self.calculate_technical_indicators(prices_only)
-                if indicators:
-                    ml_pred = self.ml.predict(indicators)
-                    if ml_pred:
-                        result['models']['random_forest'] = {
-                            'signal': ml_pred['prediction'],
-                            'confidence': ml_pred['ml_confidence'],
-                            'win_probability': ml_pred['win_probability']
-                        }
+            indicators = self.calculate_technical_indicators(prices_only) if prices_only else {}
+            if self.ml and indicators:
+                ml_pred = self.ml.predict(indicators)
+                if ml_pred:
+                    result['models']['random_forest'] = {
+                        'signal': ml_pred['prediction'],
+                        'confidence': ml_pred['ml_confidence'],
+                        'win_probability': ml_pred['win_probability']
+                    }
             
             # Combine predictions
             combined = self.combine_predictions(lstm_pred, ml_pred, market_data, research_context)
@@ -521,7 +476,6 @@ class EnhancedPredictor:
             
             # Add technical indicators
             if prices_only:
-                indicators = self.calculate_technical_indicators(prices_only)
                 result['technical_indicators'] = indicators
             
         except Exception as e:
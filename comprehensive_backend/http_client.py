@@ -0,0 +1,115 @@
+"""
+Shared HTTP transport for upstream market-data and exchange providers.
+
+Async callers go through one pooled httpx.AsyncClient per event loop, so
+keep-alive connections, DNS lookups and TLS sessions are reused across
+providers and a per-host semaphore stops one slow upstream from hogging the
+pool. Code that still runs synchronously (worker threads, signing flows)
+gets requests sessions mounted on a single shared connection-pool adapter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPTransport:
+    """Process-wide connection pools with uniform timeouts and per-host limits."""
+
+    def __init__(self) -> None:
+        self.timeout_seconds = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+        self.connect_timeout_seconds = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "3"))
+        self.max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.max_connections_per_host = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[bool, httpx.AsyncClient] = {}
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._sync_adapter = HTTPAdapter(
+            pool_connections=self.max_keepalive_connections,
+            pool_maxsize=self.max_connections_per_host,
+        )
+
+    def _bind_loop(self) -> None:
+        # Clients and semaphores are tied to the loop that created them
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._clients = {}
+            self._host_limits = {}
+
+    def async_client(self, verify: bool = True) -> httpx.AsyncClient:
+        self._bind_loop()
+        client = self._clients.get(verify)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                verify=verify,
+                timeout=httpx.Timeout(self.timeout_seconds, connect=self.connect_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=30.0,
+                ),
+                headers={"User-Agent": "AI-Power-Trade/1.0"},
+            )
+            self._clients[verify] = client
+        return client
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_limits[host] = semaphore
+        return semaphore
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        verify: bool = True,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request on the shared async pool, bounded per upstream host."""
+        client = self.async_client(verify)
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=min(timeout, self.connect_timeout_seconds))
+
+        async with self._host_limit(httpx.URL(url).host):
+            return await client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def sync_session(self, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+        """Return a requests session whose connections come from the shared pool."""
+        session = requests.Session()
+        session.mount("https://", self._sync_adapter)
+        session.mount("http://", self._sync_adapter)
+        session.headers.update({"User-Agent": "AI-Power-Trade/1.0"})
+        if headers:
+            session.headers.update(headers)
+        return session
+
+    async def aclose(self) -> None:
+        for client in list(self._clients.values()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning("Failed to close HTTP client: %s", e)
+        self._clients = {}
+
+
+# Global instance
+http_transport = HTTPTransport()
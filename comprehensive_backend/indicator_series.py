@@ -0,0 +1,154 @@
+"""
+Vectorized indicator series over a whole price array.
+
+Where StreamingIndicators answers "what are the indicators now", this module
+computes every point's indicators for an entire series in one pass, as
+aligned columns. Moving averages come from cumulative sums and Bollinger
+widths from one strided pass over the windows. EMAs and Wilder averages are
+first-order linear recurrences run through scipy.signal.lfilter, or a
+blocked closed-form numpy fallback when scipy is not installed.
+
+The definitions match StreamingIndicators point for point: EMAs are the
+running mean until `period` prices have arrived, Wilder RSI reads 50 until
+a full period of changes (and on flat stretches), and rolling columns are
+NaN until their window has filled.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+    SCIPY_AVAILABLE = True
+except ImportError:
+    lfilter = None
+    SCIPY_AVAILABLE = False
+
+
+def _recurrence(values: np.ndarray, decay: float, initial: float) -> np.ndarray:
+    """y[n] = decay * y[n - 1] + values[n], starting from y[-1] = initial."""
+    if not len(values):
+        return values.copy()
+    if lfilter is not None:
+        output, _ = lfilter([1.0], [1.0, -decay], values, zi=[decay * initial])
+        return output
+    if decay == 0:
+        return values.copy()
+
+    # Closed form per block: y[k] = decay**k * (decay * y_prev + sum_j values[j] / decay**j).
+    # Blocks are sized so decay**-k stays far from overflowing.
+    block = max(1, int(230 / -math.log(decay)))
+    output = np.empty_like(values)
+    previous = initial
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(len(chunk), dtype=np.float64)
+        output[start:start + len(chunk)] = powers * (decay * previous + np.cumsum(chunk / powers))
+        previous = output[start + len(chunk) - 1]
+    return output
+
+
+def ema_series(prices: np.ndarray, period: int) -> np.ndarray:
+    """EMA at every point, seeded with the SMA of the first `period` prices."""
+    prices = np.asarray(prices, dtype=np.float64)
+    output = np.cumsum(prices) / np.arange(1, len(prices) + 1)
+    if len(prices) > period:
+        alpha = 2 / (period + 1)
+        output[period:] = _recurrence(alpha * prices[period:], 1 - alpha, output[period - 1])
+    return output
+
+
+def wilder_average(values: np.ndarray, period: int) -> np.ndarray:
+    """Running mean for the first `period` values, then Wilder smoothing."""
+    values = np.asarray(values, dtype=np.float64)
+    output = np.cumsum(values) / np.arange(1, len(values) + 1)
+    if len(values) > period:
+        output[period:] = _recurrence(values[period:] / period, 1 - 1 / period, output[period - 1])
+    return output
+
+
+def rsi_series(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI at every point; 50 before a full period of changes."""
+    prices = np.asarray(prices, dtype=np.float64)
+    output = np.full(len(prices), 50.0)
+    if len(prices) <= period:
+        return output
+
+    changes = np.diff(prices)
+    avg_gain = wilder_average(np.maximum(changes, 0.0), period)[period - 1:]
+    avg_loss = wilder_average(np.maximum(-changes, 0.0), period)[period - 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi = np.where(avg_loss == 0, 100.0, rsi)
+    rsi = np.where((avg_gain == 0) & (avg_loss == 0), 50.0, rsi)
+    output[period:] = rsi
+    return output
+
+
+def rolling_mean(prices: np.ndarray, window: int) -> np.ndarray:
+    """Mean of each trailing `window`; NaN until the window fills."""
+    prices = np.asarray(prices, dtype=np.float64)
+    output = np.full(len(prices), np.nan)
+    if len(prices) >= window:
+        sums = np.cumsum(np.concatenate(([0.0], prices)))
+        output[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return output
+
+
+def rolling_std(prices: np.ndarray, window: int) -> np.ndarray:
+    """Population std of each trailing `window`; NaN until the window fills."""
+    prices = np.asarray(prices, dtype=np.float64)
+    output = np.full(len(prices), np.nan)
+    if len(prices) >= window:
+        # Deviations from each window's own mean: a running sum of squares would
+        # cancel away small variances (flat stretches) at large price levels
+        windows = np.lib.stride_tricks.sliding_window_view(prices, window)
+        deviations = windows - rolling_mean(prices, window)[window - 1:, None]
+        std = np.sqrt(np.einsum("ij,ij->i", deviations, deviations) / window)
+        # Flat windows are exactly 0, as in StreamingIndicators
+        std[windows.max(axis=1) == windows.min(axis=1)] = 0.0
+        output[window - 1:] = std
+    return output
+
+
+def indicator_series(
+    prices: np.ndarray,
+    rsi_period: int = 14,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+    short_window: int = 5,
+    long_window: int = 20,
+    band_width: float = 2.0,
+) -> Dict[str, np.ndarray]:
+    """Every indicator column for the whole series, aligned with `prices`."""
+    prices = np.asarray(prices, dtype=np.float64)
+    ema_fast = ema_series(prices, fast_period)
+    ema_slow = ema_series(prices, slow_period)
+    macd = ema_fast - ema_slow
+    macd_signal = ema_series(macd, signal_period)
+    ma_long = rolling_mean(prices, long_window)
+    std_long = rolling_std(prices, long_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility = np.where(ma_long != 0, std_long / ma_long, 0.0)
+
+    return {
+        "price": prices,
+        "rsi": rsi_series(prices, rsi_period),
+        "ma_5": rolling_mean(prices, short_window),
+        "ma_20": ma_long,
+        "ema_12": ema_fast,
+        "ema_26": ema_slow,
+        "macd": macd,
+        "macd_signal": macd_signal,
+        "macd_histogram": macd - macd_signal,
+        "bb_upper": ma_long + band_width * std_long,
+        "bb_middle": ma_long,
+        "bb_lower": ma_long - band_width * std_long,
+        "std_20": std_long,
+        "volatility": volatility,
+    }
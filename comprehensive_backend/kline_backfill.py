@@ -0,0 +1,304 @@
+"""
+Parallel historical kline backfill into the local candle store.
+
+Splits each requested (symbol, interval, time range) into 1000-bar pages and
+fetches them from Binance /klines with a pool of async workers. Request
+weight is tracked from the X-MBX-USED-WEIGHT-1M response header so the pool
+pauses before the per-minute limit instead of getting 429/418 bans. Only
+ranges missing from the store are queued, so an interrupted run resumes
+where it stopped when started again.
+
+Usage:
+    python kline_backfill.py --symbols BTC,ETH --intervals 1m,1h --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from binance_api import binance_api
+from candle_store import INTERVAL_MS, MAX_KLINES_PER_REQUEST, CandleStore, candle_store
+from circuit_breaker import CircuitOpenError
+from http_client import http_transport
+
+logger = logging.getLogger(__name__)
+
+# Page = (symbol, interval, start_time, end_time)
+Page = Tuple[str, str, int, int]
+
+
+class WeightLimiter:
+    """Keeps request weight under Binance's per-minute REQUEST_WEIGHT limit."""
+
+    def __init__(self, limit_per_minute: int, request_weight: int) -> None:
+        self.limit_per_minute = limit_per_minute
+        self.request_weight = request_weight
+        self.used_weight = 0
+        self.window_started_at = self._window_start()
+        self.paused_until = 0.0
+        self.waits = 0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _window_start() -> float:
+        # Binance weight windows reset on the minute
+        return time.time() // 60 * 60
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.time()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                window_start = self._window_start()
+                if window_start != self.window_started_at:
+                    self.window_started_at = window_start
+                    self.used_weight = 0
+
+                if self.used_weight + self.request_weight <= self.limit_per_minute:
+                    self.used_weight += self.request_weight
+                    return
+
+                self.waits += 1
+                await asyncio.sleep(window_start + 60 - now + 0.05)
+
+    def observe(self, headers: Any) -> None:
+        """Adopt the server's count, which also includes other clients on this IP."""
+        used = headers.get("x-mbx-used-weight-1m")
+        if used is not None and used.isdigit():
+            self.used_weight = max(self.used_weight, int(used))
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.time() + seconds)
+
+
+class KlineBackfill:
+    """Resumable, weight-aware parallel backfill of Binance klines."""
+
+    def __init__(self, store: CandleStore = candle_store) -> None:
+        self.store = store
+        self.workers = int(os.getenv("BACKFILL_WORKERS", "8"))
+        self.weight_limit = int(os.getenv("BACKFILL_WEIGHT_LIMIT_1M", "4800"))
+        self.request_weight = int(os.getenv("BACKFILL_KLINES_REQUEST_WEIGHT", "2"))
+        self.timeout_seconds = float(os.getenv("BACKFILL_TIMEOUT_SECONDS", "15"))
+        self.max_retries = 5
+        self.status: Dict[str, Any] = {"state": "idle"}
+        self._task: Optional[asyncio.Task] = None
+
+    def plan(self, symbol: str, interval: str, start_time: int, end_time: int) -> List[Page]:
+        """Split the ranges missing from the store into single-request pages."""
+        step_ms = INTERVAL_MS[interval]
+        start_time = int(start_time) // step_ms * step_ms
+        end_time = int(end_time) // step_ms * step_ms
+
+        stored = self.store.stored_range(symbol, interval, start_time, end_time)
+        if stored is None:
+            missing = [(start_time, end_time)]
+        else:
+            missing = self.store.find_gaps(symbol, interval, start_time, end_time)
+            last_stored = stored[1]
+            if last_stored < end_time:
+                missing.append((last_stored + step_ms, end_time))
+
+        page_span = (MAX_KLINES_PER_REQUEST - 1) * step_ms
+        pages = []
+        for range_start, range_end in missing:
+            cursor = range_start
+            while cursor <= range_end:
+                pages.append((symbol, interval, cursor, min(cursor + page_span, range_end)))
+                cursor += page_span + step_ms
+        return pages
+
+    async def _fetch_page(self, limiter: WeightLimiter, page: Page) -> int:
+        symbol, interval, start_time, end_time = page
+        params = binance_api._kline_params(
+            binance_api._to_binance_symbol(f"{symbol}/USDT"), interval, MAX_KLINES_PER_REQUEST, start_time, end_time
+        )
+
+        for attempt in range(self.max_retries):
+            await limiter.acquire()
+            binance_api.breaker.check()
+            try:
+                response = await http_transport.get(
+                    f"{binance_api.base_url}/klines",
+                    params=params,
+                    timeout=self.timeout_seconds,
+                    verify=binance_api.verify_ssl,
+                )
+            except Exception as e:
+                binance_api.breaker.record_failure(f"{type(e).__name__}: {e}")
+                await asyncio.sleep(min(2 ** attempt, 30))
+                continue
+
+            limiter.observe(response.headers)
+            if response.status_code in (418, 429):
+                # Back off for as long as Binance asks; 418 means an IP ban is in place
+                retry_after = float(response.headers.get("retry-after") or 60)
+                limiter.pause(retry_after)
+                binance_api.breaker.record_failure(f"HTTP {response.status_code}")
+                continue
+            if response.status_code >= 500:
+                binance_api.breaker.record_failure(f"HTTP {response.status_code}")
+                await asyncio.sleep(min(2 ** attempt, 30))
+                continue
+
+            binance_api.breaker.record_success()
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code} for {symbol} {interval}: {response.text[:200]}")
+
+            klines = binance_api._parse_klines(response.json())
+            return await asyncio.to_thread(self.store.upsert, symbol, interval, klines)
+
+        raise RuntimeError(f"Giving up on {symbol} {interval} page at {start_time} after {self.max_retries} attempts")
+
+    async def run(
+        self,
+        symbols: List[str],
+        intervals: List[str],
+        start_time: int,
+        end_time: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Backfill every symbol/interval pair over [start_time, end_time] (ms)."""
+        end_time = int(end_time if end_time is not None else time.time() * 1000)
+        unknown = [interval for interval in intervals if interval not in INTERVAL_MS]
+        if unknown:
+            raise ValueError(f"Unsupported intervals: {', '.join(unknown)}")
+
+        pages: List[Page] = []
+        for symbol in symbols:
+            for interval in intervals:
+                pages.extend(await asyncio.to_thread(self.plan, symbol.upper(), interval, start_time, end_time))
+
+        queue: "asyncio.Queue[Page]" = asyncio.Queue()
+        for page in pages:
+            queue.put_nowait(page)
+
+        limiter = WeightLimiter(self.weight_limit, self.request_weight)
+        started_at = time.time()
+        self.status = {
+            "state": "running",
+            "symbols": [symbol.upper() for symbol in symbols],
+            "intervals": list(intervals),
+            "start_time": int(start_time),
+            "end_time": end_time,
+            "pages_total": len(pages),
+            "pages_done": 0,
+            "pages_failed": 0,
+            "candles_stored": 0,
+            "errors": [],
+            "started_at": started_at,
+        }
+
+        async def worker() -> None:
+            while True:
+                try:
+                    page = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                try:
+                    stored = await self._fetch_page(limiter, page)
+                    self.status["candles_stored"] += stored
+                    self.status["pages_done"] += 1
+                except CircuitOpenError as e:
+                    # Binance is blocked or failing; leave the rest for a resumed run
+                    self.status["errors"].append(str(e))
+                    while not queue.empty():
+                        queue.get_nowait()
+                        self.status["pages_failed"] += 1
+                    self.status["pages_failed"] += 1
+                    return
+                except Exception as e:
+                    self.status["pages_failed"] += 1
+                    if len(self.status["errors"]) < 20:
+                        self.status["errors"].append(str(e))
+                    logger.warning("Backfill page %s failed: %s", page, e)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, workers or self.workers))))
+
+        self.status.update(
+            state="completed" if not self.status["pages_failed"] else "incomplete",
+            elapsed_seconds=round(time.time() - started_at, 1),
+            weight_waits=limiter.waits,
+        )
+        logger.info(
+            "Kline backfill %s: %d/%d pages, %d candles in %.1fs",
+            self.status["state"], self.status["pages_done"], len(pages),
+            self.status["candles_stored"], self.status["elapsed_seconds"],
+        )
+        return self.status
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, *args: Any, **kwargs: Any) -> bool:
+        """Run a backfill as a background task; False if one is already running."""
+        if self.is_running():
+            return False
+
+        async def run_logged() -> None:
+            try:
+                await self.run(*args, **kwargs)
+            except Exception as e:
+                self.status = {**self.status, "state": "failed", "errors": [str(e)]}
+                logger.error("Kline backfill failed: %s", e)
+
+        self.status = {"state": "starting"}
+        self._task = asyncio.create_task(run_logged())
+        return True
+
+
+# Global instance
+kline_backfill = KlineBackfill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill Binance klines into the local candle store")
+    parser.add_argument("--symbols", default=None, help="Comma-separated base symbols (defaults to the app's)")
+    parser.add_argument("--intervals", default="1m,1h", help="Comma-separated kline intervals")
+    parser.add_argument("--days", type=float, default=30, help="How far back to backfill")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel request workers")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    end_time = int(time.time() * 1000)
+    start_time = end_time - int(args.days * 86_400_000)
+
+    if args.symbols:
+        symbols = [symbol.strip().upper() for symbol in args.symbols.split(",") if symbol.strip()]
+    else:
+        # The app's own symbol list, so the backfill covers what it serves
+        from main import PRICE_SYMBOLS
+        symbols = list(PRICE_SYMBOLS)
+
+    async def run() -> Dict[str, Any]:
+        try:
+            return await kline_backfill.run(
+                symbols,
+                [interval.strip() for interval in args.intervals.split(",") if interval.strip()],
+                start_time,
+                end_time,
+                workers=args.workers,
+            )
+        finally:
+            await http_transport.aclose()
+
+    status = asyncio.run(run())
+    print(
+        f"{status['state']}: {status['pages_done']}/{status['pages_total']} pages, "
+        f"{status['candles_stored']} candles in {status['elapsed_seconds']}s"
+    )
+    for error in status["errors"]:
+        print(f"  error: {error}")
+
+
+if __name__ == "__main__":
+    main()
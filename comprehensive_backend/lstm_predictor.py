@@ -7,7 +7,7 @@ import numpy as np
 import pickle
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -94,15 +94,16 @@ class LSTMPredictor:
         except Exception as e:
             logger.error(f"Could not save LSTM model: {e}")
     
-    def prepare_data(self, price_history: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
-        """Prepare data for LSTM training"""
-        if len(price_history) < self.sequence_length + 1:
-            raise ValueError(f"Need at least {self.sequence_length + 1} data points")
-        
-        # Extract features
-        features = []
-        for data in price_history:
-            feature_vector = [
+    def _feature_matrix(self, price_history: Union[List[Dict], np.ndarray]) -> np.ndarray:
+        """Build the (n, features) matrix from feature dicts or a raw price view."""
+        if isinstance(price_history, np.ndarray):
+            from enhanced_predictor import enhanced_predictor
+            columns = enhanced_predictor.normalized_columns(price_history)
+            return np.column_stack([columns[name] for name in self.feature_names])
+
+        features = np.empty((len(price_history), len(self.feature_names)), dtype=float)
+        for index, data in enumerate(price_history):
+            features[index] = (
                 data.get('price', 0),
                 data.get('rsi', 50),
                 data.get('macd', 0),
@@ -111,10 +112,16 @@ class LSTMPredictor:
                 data.get('ma_20', 0),
                 data.get('bb_upper', 0),
                 data.get('bb_lower', 0)
-            ]
-            features.append(feature_vector)
+            )
+        return features
+
+    def prepare_data(self, price_history: Union[List[Dict], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Prepare data for LSTM training"""
+        if len(price_history) < self.sequence_length + 1:
+            raise ValueError(f"Need at least {self.sequence_length + 1} data points")
         
-        features = np.array(features)
+        # Extract features
+        features = self._feature_matrix(price_history)
         
         # Normalize data
         if self.scaler is None:
@@ -132,7 +139,7 @@ class LSTMPredictor:
         
         return np.array(X), np.array(y)
     
-    def train(self, price_history: List[Dict], epochs: int = 50, batch_size: int = 32) -> Dict:
+    def train(self, price_history: Union[List[Dict], np.ndarray], epochs: int = 50, batch_size: int = 32) -> Dict:
         """Train LSTM model on historical price data"""
         if not TENSORFLOW_AVAILABLE:
             return {"success": False, "error": "TensorFlow not installed"}
@@ -184,7 +191,7 @@ class LSTMPredictor:
             logger.error(f"LSTM training error: {e}")
             return {"success": False, "error": str(e)}
     
-    def predict(self, recent_data: List[Dict]) -> Optional[Dict]:
+    def predict(self, recent_data: Union[List[Dict], np.ndarray]) -> Optional[Dict]:
         """Predict next price using LSTM model"""
         if not TENSORFLOW_AVAILABLE or not self.is_trained:
             return None
@@ -193,22 +200,12 @@ class LSTMPredictor:
             return None
         
         try:
-            # Prepare input sequence
-            features = []
-            for data in recent_data[-self.sequence_length:]:
-                feature_vector = [
-                    data.get('price', 0),
-                    data.get('rsi', 50),
-                    data.get('macd', 0),
-                    data.get('volume', 0),
-                    data.get('ma_5', 0),
-                    data.get('ma_20', 0),
-                    data.get('bb_upper', 0),
-                    data.get('bb_lower', 0)
-                ]
-                features.append(feature_vector)
-            
-            features = np.array(features)
+            # Prepare input sequence; raw price views need their full history
+            # so the indicators of the last window are warmed up
+            if isinstance(recent_data, np.ndarray):
+                features = self._feature_matrix(recent_data)[-self.sequence_length:]
+            else:
+                features = self._feature_matrix(recent_data[-self.sequence_length:])
             features_scaled = self.scaler.transform(features)
             
             # Reshape for LSTM
@@ -222,7 +219,7 @@ class LSTMPredictor:
             dummy[0, 0] = prediction_scaled
             prediction = self.scaler.inverse_transform(dummy)[0, 0]
             
-            current_price = recent_data[-1].get('price', 0)
+            current_price = features[-1, 0]
             price_change = ((prediction - current_price) / current_price) * 100
             
             # Calculate confidence based on recent prediction accuracy
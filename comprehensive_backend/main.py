@@ -3,19 +3,21 @@ AI Trading Platform - Comprehensive Backend
 Combines AI prediction, smart contract, oracle, and trading engine features
 Integrated with WEEX Exchange Live Data
 """
-from fastapi import FastAPI, WebSocket, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, HTTPException, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 import asyncio
 import json
 from datetime import datetime
 from pathlib import Path
 import uvicorn
-import random
 import hashlib
+import hmac
 import numpy as np
 import logging
+import sqlite3
+import tempfile
 import time
 import os
 from dotenv import load_dotenv
@@ -43,6 +45,7 @@ CANDLE_INTERVAL_MS = {
 DEFAULT_CANDLE_LIMIT = 48
 MAX_CANDLE_LIMIT = 500
 EXPLAINABILITY_CACHE_DURATION_SECONDS = 900
+PRICE_REFRESH_DEADLINE_SECONDS = 4.0
 
 
 def env_flag(name: str, default: bool = False) -> bool:
@@ -170,6 +173,19 @@ def _build_cached_price_snapshot(symbol: str, cached_snapshot: Dict[str, Any]) -
 
 # Import Binance API, Binance Trading and Backtesting
 from binance_api import binance_api
+from binance_stream import binance_stream
+from cache_warmer import WarmJob, cache_warmer
+from candle_store import CandleStore, candle_store
+from http_client import http_transport
+from kline_backfill import kline_backfill
+from order_book import order_books
+from price_history import PriceRingBuffer, capacity_for_symbol
+from single_flight import single_flight
+from streaming_indicators import INDICATOR_COLUMNS, StreamingIndicators
+from swr_cache import FRESH, STALE, SWRCache
+from tick_replay import MAX_SPEED, MIN_SPEED, generate_events, load_events, seed_simulation, simulation_rng, tick_replay
+from ws_broadcast import MSGPACK_AVAILABLE, MarketBroadcaster, ENCODINGS as WS_ENCODINGS, PROTOCOLS as WS_PROTOCOLS
+from ws_channels import ALL_SYMBOLS, channel_hub
 from binance_trading import binance_trading
 from backtesting import BacktestEngine
 from blockchain_service import blockchain_service
@@ -267,6 +283,28 @@ async def startup_core_services():
     seed_price_history()
     asyncio.create_task(initialize_price_history_async())
 
+    register_stream_listeners()
+    if env_flag("ENABLE_BINANCE_STREAM", True):
+        if binance_stream.start(PRICE_SYMBOLS):
+            logger.info("📡 Binance market stream ingestion started")
+    else:
+        logger.info("💤 Binance market stream disabled (REST polling only)")
+
+    if env_flag("ENABLE_CACHE_WARMER", True):
+        register_cache_warm_jobs()
+        if cache_warmer.start():
+            logger.info("🔥 Cache warmer started (every %.0fs)", cache_warmer.interval_seconds)
+    else:
+        logger.info("💤 Cache warmer disabled (caches refresh on demand)")
+
+
+@app.on_event("shutdown")
+async def shutdown_core_services():
+    await tick_replay.stop()
+    await cache_warmer.stop()
+    await binance_stream.stop()
+    await http_transport.aclose()
+
 # Include auth and user routes
 app.include_router(auth_router)
 app.include_router(user_router)
@@ -284,7 +322,7 @@ trading_state = {
     "pnl": 0.0,
     "positions": [],
     "price_history": {
-        symbol: [] for symbol in PRICE_SYMBOLS
+        symbol: PriceRingBuffer(capacity_for_symbol(symbol)) for symbol in PRICE_SYMBOLS
     },
     "trades_today": 0,
     "daily_pnl": 0.0,
@@ -334,31 +372,33 @@ wallet_state = {
 
 # Initialize price history
 def initialize_price_history():
-    """Initialize price history from Binance"""
+    """Initialize price history from the local candle store, synced from Binance"""
     for symbol in PRICE_SYMBOLS:
-        # Get historical data from Binance
-        pair = f"{symbol}/USDT"
-        klines = binance_api.get_klines(pair, interval='1h', limit=50)
+        klines = candle_store.get_recent(symbol, '1h', 50)
+        history = trading_state["price_history"][symbol]
         if klines:
-            history = [k['close'] for k in klines]
-            trading_state["price_history"][symbol] = history
+            history.replace(
+                [k['close'] for k in klines],
+                [k['timestamp'] / 1000 for k in klines],
+            )
             logger.info(f"✓ Loaded {len(history)} price points for {symbol} from Binance")
         else:
             # Fallback to simulated only if Binance fails
-            trading_state["price_history"][symbol] = _generate_simulated_history(symbol)
+            history.replace(_generate_simulated_history(symbol))
             logger.warning(f"⚠ Using simulated data for {symbol}")
 
 def _generate_simulated_history(symbol: str) -> List[float]:
     """Generate simulated price history"""
     base_prices = {"BTC": 50000, "ETH": 3000, "BNB": 300, "SOL": 100}
     base = base_prices.get(symbol, 1000)
-    return [base + random.uniform(-base * 0.02, base * 0.02) for _ in range(50)]
+    return [base + simulation_rng.uniform(-base * 0.02, base * 0.02) for _ in range(50)]
 
 def seed_price_history():
     """Seed history so the API can respond immediately during local startup."""
     for symbol in PRICE_SYMBOLS:
-        if not trading_state["price_history"][symbol]:
-            trading_state["price_history"][symbol] = _generate_simulated_history(symbol)
+        history = trading_state["price_history"][symbol]
+        if not len(history):
+            history.replace(_generate_simulated_history(symbol))
 
     logger.info("✓ Seeded simulated price history for fast startup")
 
@@ -370,6 +410,113 @@ async def initialize_price_history_async():
         logger.warning(f"Background price history refresh failed: {e}")
 
 
+# Throwaway store for bars replayed through /api/admin/replay, kept apart from the real one
+replay_candle_store: Optional[CandleStore] = None
+
+
+def stream_candle_store() -> CandleStore:
+    """Where stream klines are recorded: the replay store while an admin replay runs."""
+    if binance_stream.replaying and replay_candle_store is not None:
+        return replay_candle_store
+    return candle_store
+
+
+def isolate_price_history_for_replay() -> Callable[[], None]:
+    """Give an admin replay empty price histories of its own; returns a function restoring the live ones."""
+    live_histories = trading_state["price_history"]
+    trading_state["price_history"] = {
+        symbol: PriceRingBuffer(history.capacity) for symbol, history in live_histories.items()
+    }
+    # Fresh buffers restart their versions, so memo keys from either side could collide
+    ai_predictor.clear_memo()
+
+    def restore() -> None:
+        trading_state["price_history"] = live_histories
+        ai_predictor.clear_memo()
+
+    return restore
+
+
+def register_stream_listeners() -> None:
+    """Hook the app into market stream events, whether live or replayed by tick_replay."""
+    binance_stream.add_kline_listener(record_stream_kline)
+    binance_stream.add_ticker_listener(publish_stream_ticker)
+    binance_stream.add_depth_listener(order_books.handle_depth_event)
+    binance_stream.add_disconnect_listener(candle_store.clear_live_bars)
+
+
+def record_stream_kline(symbol: str, kline: Dict[str, Any], is_closed: bool) -> None:
+    """Feed stream klines into the candle store and closed ones into the price history."""
+    stream_candle_store().record_live_kline(symbol, kline, is_closed)
+    channel_hub.publish("candles", symbol, {**kline, "interval": binance_stream.kline_interval, "is_closed": is_closed})
+
+    if not is_closed or symbol not in trading_state["price_history"]:
+        return
+
+    trading_state["price_history"][symbol].append(kline["close"], kline["timestamp"] / 1000)
+
+    # Signals only move when a bar closes; recompute for symbols someone is watching
+    if channel_hub.has_subscribers("signals", symbol):
+        schedule_signal_refresh(symbol)
+
+
+# Symbols whose signal is being recomputed off the event loop
+pending_signal_refreshes: Set[str] = set()
+
+
+def schedule_signal_refresh(symbol: str) -> None:
+    """Recompute a signal in a worker thread; publish_change pushes it to subscribers."""
+    if symbol in pending_signal_refreshes:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        ai_predictor.generate_signal(symbol)
+        return
+
+    async def refresh() -> None:
+        try:
+            await asyncio.to_thread(ai_predictor.generate_signal, symbol)
+        except Exception as e:
+            logger.warning(f"Signal refresh failed for {symbol}: {e}")
+        finally:
+            pending_signal_refreshes.discard(symbol)
+
+    pending_signal_refreshes.add(symbol)
+    loop.create_task(refresh())
+
+
+def publish_stream_ticker(symbol: str, snapshot: Dict[str, Any]) -> None:
+    """Push live mini-ticker snapshots to ticker channel subscribers."""
+    channel_hub.publish("ticker", symbol, snapshot)
+
+
+def get_price_history_view(symbol: str) -> np.ndarray:
+    """Return a read-only view of a symbol's price history, oldest first (valid until the next append)."""
+    history = trading_state["price_history"].get(symbol)
+    return history.values() if history is not None else np.empty(0)
+
+
+def get_price_history_snapshot(symbol: str) -> np.ndarray:
+    """Copy of a symbol's price history, safe to hand to worker threads or hold across an await."""
+    return get_price_history_view(symbol).copy()
+
+
+def get_stream_prices(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Return normalized price snapshots for every symbol the live stream currently covers."""
+    prices = {}
+    for symbol, snapshot in binance_stream.get_live_snapshots(symbols).items():
+        prices[symbol] = _normalize_price_snapshot(
+            price=snapshot["price"],
+            change_24h=snapshot["change_24h"],
+            high_24h=snapshot["high_24h"],
+            low_24h=snapshot["low_24h"],
+            volume_24h=snapshot["volume_24h"],
+            source="Binance Stream",
+        )
+    return prices
+
+
 def clamp_candle_limit(limit: int) -> int:
     return max(12, min(int(limit or DEFAULT_CANDLE_LIMIT), MAX_CANDLE_LIMIT))
 
@@ -406,12 +553,14 @@ def build_explainability_cache_response(
 
 
 def build_fallback_candles(symbol: str, interval: str, limit: int) -> List[Dict]:
-    history = trading_state["price_history"].get(symbol) or _generate_simulated_history(symbol)
+    history = get_price_history_view(symbol)
+    if not len(history):
+        history = _generate_simulated_history(symbol)
     closes = history[-limit:]
     step_ms = CANDLE_INTERVAL_MS[interval]
     end_timestamp = int(time.time() * 1000)
     candles = []
-    previous_close = closes[0] if closes else 0.0
+    previous_close = float(closes[0]) if len(closes) else 0.0
 
     for index, close_price in enumerate(closes):
         open_price = previous_close if index else close_price
@@ -475,6 +624,20 @@ class WalletOperation(BaseModel):
     amount: float
     currency: str = "USDT"
 
+class KlineBackfillRequest(BaseModel):
+    symbols: Optional[List[str]] = None  # defaults to PRICE_SYMBOLS
+    intervals: List[str] = ["1m", "1h"]
+    days: float = 30
+    workers: Optional[int] = None
+
+class TickReplayRequest(BaseModel):
+    path: Optional[str] = None  # server-side CSV/JSONL of ticks or klines
+    symbol: Optional[str] = None  # for files without a symbol column
+    generate: Optional[int] = None  # replay this many seeded random-walk ticks instead
+    speed: float = 1.0
+    seed: Optional[int] = None
+    measure_signals: bool = True
+
 # ============ ML Predictor Import ============
 from ml_predictor import ml_predictor
 
@@ -482,61 +645,81 @@ from ml_predictor import ml_predictor
 class AIPredictor:
     def __init__(self):
         self.model_version = "v3.0-comprehensive"
+        # (symbol, kind) -> (memo key, result); one entry per pair, replaced when the key moves
+        self._memo: Dict[Tuple[str, str], Tuple[Tuple, Dict]] = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
 
     def calculate_indicators(self, prices: List[float]) -> Dict:
-        """Calculate technical indicators"""
+        """Calculate technical indicators for an arbitrary price series"""
         if len(prices) < 20:
             return {}
+        return StreamingIndicators.from_prices(prices).snapshot()
+
+    def symbol_indicators(self, symbol: str) -> Dict:
+        """Current indicators for a tracked symbol, maintained tick by tick"""
+        history = trading_state["price_history"].get(symbol)
+        return history.indicators.snapshot() if history is not None else {}
+
+    @staticmethod
+    def _book_pressure(order_book: Optional[Dict]) -> int:
+        """+1/-1 when the local order book leans clearly bid/ask side, else 0"""
+        if not order_book or order_book["imbalance"] is None:
+            return 0
+        if order_book["imbalance"] > 0.25 and order_book["microprice_premium_bps"] > 0:
+            return 1
+        if order_book["imbalance"] < -0.25 and order_book["microprice_premium_bps"] < 0:
+            return -1
+        return 0
+
+    def memo_key(self, symbol: str) -> Tuple[int, int, int, int]:
+        """Everything a signal depends on: price history, risk limits and ML model versions, book pressure"""
+        history = trading_state["price_history"][symbol]
+        return (
+            history.version,
+            smart_contract.risk_limits_version,
+            ml_predictor.version,
+            self._book_pressure(order_books.get_features(symbol)),
+        )
 
-        prices_arr = np.array(prices)
-
-        # RSI
-        deltas = np.diff(prices_arr[-14:])
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        avg_gain = np.mean(gains) if len(gains) > 0 else 0
-        avg_loss = np.mean(losses) if len(losses) > 0 else 0
-        rs = avg_gain / avg_loss if avg_loss != 0 else 0
-        rsi = 100 - (100 / (1 + rs))
-
-        # Moving Averages
-        ma_5 = np.mean(prices_arr[-5:])
-        ma_20 = np.mean(prices_arr[-20:])
-
-        # MACD
-        ema_12 = self._ema(prices_arr, 12)
-        ema_26 = self._ema(prices_arr, 26)
-        macd = ema_12 - ema_26
-
-        # Bollinger Bands
-        sma_20 = np.mean(prices_arr[-20:])
-        std_20 = np.std(prices_arr[-20:])
-        bb_upper = sma_20 + (2 * std_20)
-        bb_lower = sma_20 - (2 * std_20)
+    def _memo_lookup(self, symbol: str, kind: str, key: Tuple) -> Optional[Dict]:
+        """Memoized result if it was built for `key`, else None; counts the hit or miss"""
+        entry = self._memo.get((symbol, kind))
+        if entry is not None and entry[0] == key:
+            self.memo_hits += 1
+            return entry[1]
+        self.memo_misses += 1
+        return None
 
-        # Volatility
-        volatility = std_20 / sma_20 if sma_20 != 0 else 0
+    def _memo_store(self, symbol: str, kind: str, key: Tuple, result: Dict) -> Dict:
+        self._memo[(symbol, kind)] = (key, result)
+        return result
 
+    def memoized(self, symbol: str, kind: str, build: Callable[[str], Dict]) -> Dict:
+        """Return build(symbol), reusing the last result until memo_key(symbol) changes"""
+        key = self.memo_key(symbol)
+        result = self._memo_lookup(symbol, kind, key)
+        if result is None:
+            result = self._memo_store(symbol, kind, key, build(symbol))
+        # Callers annotate the result they get back; keep the memoized copy clean
+        return dict(result)
+
+    def clear_memo(self) -> None:
+        """Drop every memoized result (the price histories were swapped out)"""
+        self._memo.clear()
+
+    def get_memo_stats(self) -> Dict[str, Any]:
+        lookups = self.memo_hits + self.memo_misses
         return {
-            "rsi": rsi,
-            "ma_5": ma_5,
-            "ma_20": ma_20,
-            "macd": macd,
-            "bb_upper": bb_upper,
-            "bb_lower": bb_lower,
-            "volatility": volatility,
-            "current_price": prices_arr[-1]
+            "name": "signal_memo",
+            "entries": len(self._memo),
+            "hits": self.memo_hits,
+            "misses": self.memo_misses,
+            "hit_rate": round(self.memo_hits / lookups, 3) if lookups else 0.0,
         }
 
-    def _ema(self, prices, period):
-        alpha = 2 / (period + 1)
-        ema = prices[0]
-        for price in prices[1:]:
-            ema = alpha * price + (1 - alpha) * ema
-        return ema
-
     def generate_signal(self, symbol: str) -> Dict:
-        """Generate AI trading signal"""
+        """Generate AI trading signal, memoized per price tick"""
         if symbol not in trading_state["price_history"]:
             return {
                 "signal": "HOLD",
@@ -550,82 +733,119 @@ class AIPredictor:
                 "timestamp": datetime.now().isoformat()
             }
 
-        prices = trading_state["price_history"][symbol]
-        indicators = self.calculate_indicators(prices)
-
-        if not indicators:
-            return self._default_signal()
-
-        # Calculate signal scores
-        buy_score = 0
-        sell_score = 0
+        return self.memoized(symbol, "signal", self._compute_signal)
+
+    def _compute_signal(self, symbol: str) -> Dict:
+        return self._compute_signals([symbol])[symbol]
+
+    @staticmethod
+    def indicator_matrix(rows: List[Dict]) -> np.ndarray:
+        """Stack indicator dicts into a (symbols, INDICATOR_COLUMNS) array; NaN where missing"""
+        return np.array(
+            [[row.get(column, np.nan) for column in INDICATOR_COLUMNS] for row in rows],
+            dtype=float,
+        ).reshape(len(rows), len(INDICATOR_COLUMNS))
+
+    @staticmethod
+    def score_signals(matrix: np.ndarray, pressure: np.ndarray) -> Dict[str, np.ndarray]:
+        """Rule scores, signal, confidence, risk and position size for every row at once"""
+        column = {name: matrix[:, index] for index, name in enumerate(INDICATOR_COLUMNS)}
+        rsi, macd, price = column["rsi"], column["macd"], column["current_price"]
+        ma_trend = column["ma_5"] > column["ma_20"]
+        below_band = price <= column["bb_lower"]
+        above_band = ~below_band & (price >= column["bb_upper"])
+
+        # RSI, MACD, MA crossover, Bollinger Bands, order book pressure
+        buy_score = (
+            np.where(rsi < 30, 2.0, 0.0) + np.where(macd > 0, 1.5, 0.0) + np.where(ma_trend, 1.0, 0.0)
+            + np.where(below_band, 1.5, 0.0) + np.where(pressure > 0, 1.0, 0.0)
+        )
+        sell_score = (
+            np.where(rsi > 70, 2.0, 0.0) + np.where(macd > 0, 0.0, 1.5) + np.where(ma_trend, 0.0, 1.0)
+            + np.where(above_band, 1.5, 0.0) + np.where(pressure < 0, 1.0, 0.0)
+        )
 
-        # RSI analysis
-        if indicators["rsi"] < 30:
-            buy_score += 2
-        elif indicators["rsi"] > 70:
-            sell_score += 2
+        # Determine signal
+        total_score = buy_score + sell_score
+        buying = buy_score > sell_score
+        signal = np.where(total_score == 0, "HOLD", np.where(buying, "BUY", "SELL"))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            leading = np.where(buying, buy_score, sell_score) / (total_score * 2)
+        confidence = np.where(total_score == 0, 0.5, np.minimum(0.95, 0.5 + leading))
 
-        # MACD analysis
-        if indicators["macd"] > 0:
-            buy_score += 1.5
-        else:
-            sell_score += 1.5
+        # Risk score and position size
+        risk_score = np.clip(np.trunc(50 + column["volatility"] * 200), 0, 100).astype(int)
+        position_size = np.clip(confidence * 15 * (1 - risk_score / 200), 1, 20)
 
-        # MA crossover
-        if indicators["ma_5"] > indicators["ma_20"]:
-            buy_score += 1
-        else:
-            sell_score += 1
+        return {
+            "signal": signal,
+            "confidence": confidence,
+            "buy_score": buy_score,
+            "sell_score": sell_score,
+            "risk_score": risk_score,
+            "position_size": position_size,
+        }
 
-        # Bollinger Bands
-        if indicators["current_price"] <= indicators["bb_lower"]:
-            buy_score += 1.5
-        elif indicators["current_price"] >= indicators["bb_upper"]:
-            sell_score += 1.5
+    def _compute_signals(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Signals for several symbols from one vectorized scoring pass and one ML batch"""
+        results = {symbol: self._default_signal() for symbol in symbols}
+        rows = {symbol: self.symbol_indicators(symbol) for symbol in symbols}
+        ready = [symbol for symbol in symbols if rows[symbol]]
+        if not ready:
+            return results
+
+        # Order book pressure from the live local book, when one is synced
+        order_book = {symbol: order_books.get_features(symbol) for symbol in ready}
+        pressure = np.array([self._book_pressure(order_book[symbol]) for symbol in ready])
+        scores = self.score_signals(self.indicator_matrix([rows[symbol] for symbol in ready]), pressure)
+
+        # Get ML predictions if available
+        ml_predictions = ml_predictor.predict_batch([rows[symbol] for symbol in ready])
+
+        for index, symbol in enumerate(ready):
+            signal = str(scores["signal"][index])
+            confidence = float(scores["confidence"][index])
+            risk_score = int(scores["risk_score"][index])
+            result = {
+                "signal": signal,
+                "confidence": round(confidence, 3),
+                "buy_score": round(float(scores["buy_score"][index]), 2),
+                "sell_score": round(float(scores["sell_score"][index]), 2),
+                "risk_score": risk_score,
+                "position_size": round(float(scores["position_size"][index]), 2),
+                "indicators": rows[symbol],
+                "timestamp": datetime.now().isoformat()
+            }
 
-        # Determine signal
-        total_score = buy_score + sell_score
-        if total_score == 0:
-            signal = "HOLD"
-            confidence = 0.5
-        elif buy_score > sell_score:
-            signal = "BUY"
-            confidence = min(0.95, 0.5 + (buy_score / (total_score * 2)))
-        else:
-            signal = "SELL"
-            confidence = min(0.95, 0.5 + (sell_score / (total_score * 2)))
+            if order_book[symbol]:
+                result["order_book"] = order_book[symbol]
 
-        # Risk score
-        risk_score = int(50 + (indicators["volatility"] * 200))
-        risk_score = max(0, min(100, risk_score))
+            # Add ML prediction if available
+            ml_prediction = ml_predictions[index]
+            if ml_prediction:
+                result["ml_prediction"] = ml_prediction
+                # Combine rule-based and ML confidence
+                combined_confidence = (confidence + ml_prediction["ml_confidence"]) / 2
+                result["combined_confidence"] = round(combined_confidence, 3)
 
-        # Position size
-        position_size = confidence * 15 * (1 - risk_score / 200)
-        position_size = max(1, min(20, position_size))
+            channel_hub.publish_change(
+                "signals", symbol, (signal, result["confidence"], risk_score, result.get("combined_confidence")), result
+            )
+            results[symbol] = result
 
-        # Get ML prediction if available
-        ml_prediction = ml_predictor.predict(indicators)
+        return results
 
-        result = {
-            "signal": signal,
-            "confidence": round(confidence, 3),
-            "buy_score": round(buy_score, 2),
-            "sell_score": round(sell_score, 2),
-            "risk_score": risk_score,
-            "position_size": round(position_size, 2),
-            "indicators": indicators,
-            "timestamp": datetime.now().isoformat()
-        }
+    def generate_signals(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Memoized signals for many symbols; only symbols whose inputs moved are rescored, together"""
+        keys = {symbol: self.memo_key(symbol) for symbol in symbols}
+        results = {symbol: self._memo_lookup(symbol, "signal", keys[symbol]) for symbol in symbols}
 
-        # Add ML prediction if available
-        if ml_prediction:
-            result["ml_prediction"] = ml_prediction
-            # Combine rule-based and ML confidence
-            combined_confidence = (confidence + ml_prediction["ml_confidence"]) / 2
-            result["combined_confidence"] = round(combined_confidence, 3)
+        stale = [symbol for symbol, result in results.items() if result is None]
+        if stale:
+            for symbol, result in self._compute_signals(stale).items():
+                results[symbol] = self._memo_store(symbol, "signal", keys[symbol], result)
 
-        return result
+        return {symbol: dict(result) for symbol, result in results.items()}
 
     def _default_signal(self):
         return {
@@ -649,10 +869,17 @@ class SmartContract:
             "min_confidence": 0.65,
             "max_daily_trades": 50
         }
+        # Bumped whenever risk_limits change, so memoized signals are rebuilt
+        self.risk_limits_version = 0
         self.on_chain_records = []
         self.validations = []
         self.settlements = []
 
+    def update_risk_limits(self, new_limits: Dict) -> Dict:
+        self.risk_limits.update(new_limits)
+        self.risk_limits_version += 1
+        return self.risk_limits
+
     def validate_trade(self, signal: Dict, portfolio: Dict) -> Dict:
         """Validate trade against smart contract rules"""
         validations = []
@@ -815,11 +1042,15 @@ class TradingEngine:
         trade_value = trading_state["balance"] * (signal["position_size"] / 100)
         quantity = trade_value / current_price
 
-        # Simulate execution with slippage
-        execution_price = current_price * (1 + random.uniform(-0.001, 0.001))
+        # Pre-trade slippage from the local order book; simulated when no book is synced
+        fill_estimate = order_books.estimate_fill(symbol, signal["signal"], quantity)
+        if fill_estimate and fill_estimate["fully_filled"]:
+            execution_price = fill_estimate["average_price"]
+        else:
+            execution_price = current_price * (1 + simulation_rng.uniform(-0.001, 0.001))
 
         # Simulate P&L
-        profit_loss = random.uniform(-trade_value * 0.05, trade_value * 0.08)
+        profit_loss = simulation_rng.uniform(-trade_value * 0.05, trade_value * 0.08)
 
         trade = {
             "trade_id": f"TRD_{len(self.trades) + 1}",
@@ -832,6 +1063,8 @@ class TradingEngine:
             "confidence": signal["confidence"],
             "timestamp": datetime.now().isoformat()
         }
+        if fill_estimate:
+            trade["estimated_slippage_bps"] = round(fill_estimate["slippage_bps"], 2)
 
         self.trades.append(trade)
 
@@ -840,6 +1073,7 @@ class TradingEngine:
         trading_state["daily_pnl"] += profit_loss
         trading_state["trades_today"] += 1
         trading_state["positions"].append(trade)
+        channel_hub.publish("trades", symbol, trade)
 
         return {"success": True, "trade": trade}
 
@@ -874,44 +1108,102 @@ oracle = OracleLayer()
 trading_engine = TradingEngine()
 backtest_engine = BacktestEngine()
 
+# Hot response caches serve stale entries while one background task refreshes them;
+# only entries past max_stale make a request wait for upstream
 # Performance cache with longer TTL
-performance_cache = {"data": None, "timestamp": 0, "ttl": 300}  # 5 minutes cache
+performance_cache = SWRCache("performance", ttl=300, max_stale=3600)  # 5 minutes fresh
 
 # Prices cache to reduce API calls - Optimized for speed
-prices_cache = {"data": None, "timestamp": 0, "ttl": 90}  # 90 seconds cache (1.5 minutes)
+prices_cache = SWRCache("prices", ttl=90, max_stale=600)  # 90 seconds fresh (1.5 minutes)
 
 # Keep the last successful SoSoValue research snapshot per symbol for graceful fallback.
 sosovalue_research_cache = {}
 
 # Dashboard cache for faster loading - Increased TTL
-dashboard_cache = {"data": {}, "timestamp": {}, "ttl": 60}  # 60 seconds per symbol (1 minute)
+dashboard_cache = SWRCache("dashboard", ttl=60, max_stale=300)  # 60 seconds per symbol (1 minute)
 
 # Trade history cache to reduce blockchain calls
 trade_history_cache = {"data": None, "timestamp": 0, "ttl": 60, "key": None}  # 60 seconds cache
 
 # AI Explanation cache for faster AI Explainer page
-ai_explanation_cache = {"data": {}, "timestamp": {}, "ttl": 90}  # 90 seconds per symbol
+ai_explanation_cache = SWRCache("ai_explanation", ttl=90, max_stale=600)  # 90 seconds per symbol
+
+PRICES_CACHE_KEY = "all"
+PERFORMANCE_CACHE_KEY = "engine"
+
 
 def get_cached_performance():
     """Get performance data with caching - optimized for speed"""
-    import time
-    current_time = time.time()
+    cached, state = performance_cache.lookup(PERFORMANCE_CACHE_KEY)
 
     # Return cached data if still valid
-    if performance_cache["data"] and (current_time - performance_cache["timestamp"]) < performance_cache["ttl"]:
+    if state == FRESH:
         logger.debug("Using cached performance data")
-        return performance_cache["data"]
+        return cached
 
     # If cache expired but data exists, return stale data and update in background
-    if performance_cache["data"]:
+    if state == STALE:
         logger.debug("Returning stale cache while updating")
-        # TODO: Update in background thread
-        return performance_cache["data"]
+        performance_cache.refresh_in_background(PERFORMANCE_CACHE_KEY, _refresh_cached_performance)
+        return cached
 
-    performance = trading_engine.get_performance()
-    performance_cache["data"] = performance
-    performance_cache["timestamp"] = current_time
-    return performance
+    return performance_cache.set(PERFORMANCE_CACHE_KEY, trading_engine.get_performance())
+
+
+async def _refresh_cached_performance() -> Dict[str, Any]:
+    performance = await asyncio.to_thread(trading_engine.get_performance)
+    return performance_cache.set(PERFORMANCE_CACHE_KEY, performance)
+
+
+def register_cache_warm_jobs():
+    """Keep prices, then per-symbol dashboards and explanations, warm ahead of expiry."""
+    if cache_warmer.jobs:
+        return
+
+    # Refresh anything that would expire before the next warm cycle
+    lead = cache_warmer.interval_seconds + cache_warmer.jitter_seconds
+
+    cache_warmer.add_job(WarmJob(
+        name="prices",
+        refresh=lambda: prices_cache.compute(PRICES_CACHE_KEY, _refresh_market_prices),
+        stage=0,
+        # One REST ticker per symbol the stream does not cover, plus a CoinGecko fallback
+        cost=lambda: len(PRICE_SYMBOLS) - len(get_stream_prices(PRICE_SYMBOLS)) + 1,
+        due=lambda: prices_cache.needs_refresh(PRICES_CACHE_KEY, lead),
+    ))
+    if ENHANCED_AI_AVAILABLE and coingecko_api:
+        # One coins/markets call keeps every symbol's CoinGecko fallback and overlay warm
+        cache_warmer.add_job(WarmJob(
+            name="coingecko_markets",
+            refresh=coingecko_api.refresh_markets_async,
+            stage=0,
+            cost=1,
+            due=lambda: coingecko_api.markets_needs_refresh(lead),
+        ))
+    cache_warmer.add_job(WarmJob(
+        name="performance",
+        refresh=lambda: performance_cache.compute(PERFORMANCE_CACHE_KEY, _refresh_cached_performance),
+        stage=0,
+        cost=0,
+        due=lambda: performance_cache.needs_refresh(PERFORMANCE_CACHE_KEY, lead),
+    ))
+
+    # Dashboards and explanations only read the warmed prices and local predictors
+    for symbol in PRICE_SYMBOLS:
+        cache_warmer.add_job(WarmJob(
+            name=f"dashboard:{symbol}",
+            refresh=lambda symbol=symbol: dashboard_cache.compute(symbol, _build_dashboard, symbol, symbol),
+            stage=1,
+            cost=0,
+            due=lambda symbol=symbol: dashboard_cache.needs_refresh(symbol, lead),
+        ))
+        cache_warmer.add_job(WarmJob(
+            name=f"ai_explain:{symbol}",
+            refresh=lambda symbol=symbol: ai_explanation_cache.compute(symbol, _build_ai_explanation, symbol, symbol),
+            stage=1,
+            cost=0,
+            due=lambda symbol=symbol: ai_explanation_cache.needs_refresh(symbol, lead),
+        ))
 
 # ============ API Endpoints ============
 
@@ -940,7 +1232,7 @@ async def get_api_status():
     # Test Binance market data connection
     binance_market_health = False
     try:
-        test_price = binance_api.get_price("BTC/USDT")
+        test_price = await binance_api.get_price_async("BTC/USDT")
         binance_market_health = test_price is not None
     except:
         pass
@@ -964,6 +1256,9 @@ async def get_api_status():
             }
         },
         "data_source": "Binance",
+        "market_stream": binance_stream.get_status(),
+        "order_books": order_books.get_status(),
+        "websocket": {**market_broadcaster.get_status(), "channels": channel_hub.get_status()},
         "trading_state": {
             "balance": trading_state["balance"],
             "pnl": trading_state["pnl"],
@@ -973,6 +1268,23 @@ async def get_api_status():
     }
 
 
+@app.get("/api/status/cache")
+async def get_cache_status():
+    """Provider response cache sizes and hit/miss/eviction counters"""
+    return {
+        "success": True,
+        "caches": [binance_api.cache.get_stats()],
+        "response_caches": [
+            cache.get_stats()
+            for cache in (prices_cache, dashboard_cache, ai_explanation_cache, performance_cache)
+        ],
+        "warmer": cache_warmer.get_status(),
+        "coingecko_rate_limit": coingecko_api.get_limiter_status() if ENHANCED_AI_AVAILABLE else None,
+        "signal_memo": ai_predictor.get_memo_stats(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
 @app.get("/api/health")
 async def get_health():
     """Lightweight healthcheck for platform load balancers."""
@@ -1024,7 +1336,7 @@ async def get_ssi_overview(
     balance = blockchain_service.get_balance(address)
     can_claim = blockchain_service.can_claim_faucet(address)
     cooldown = blockchain_service.time_until_next_claim(address)
-    history_payload = build_trade_history_response(
+    history_payload = await build_trade_history_response(
         limit=normalized_limit,
         user_address=address,
         account_id=account_id,
@@ -1054,16 +1366,24 @@ async def get_dashboard(symbol: str = "BTC"):
     """Get complete dashboard data with live prices and AI signal for specified symbol"""
     import time
 
-    # Check dashboard cache first
-    current_time = time.time()
+    # Check dashboard cache first; stale entries are served while a refresh runs
     cache_key = symbol
-    if (cache_key in dashboard_cache["data"] and
-        cache_key in dashboard_cache["timestamp"] and
-        (current_time - dashboard_cache["timestamp"][cache_key]) < dashboard_cache["ttl"]):
-        cached_data = dashboard_cache["data"][cache_key]
+    cached_data, cache_state = dashboard_cache.lookup(cache_key)
+    if cached_data is not None:
+        if cache_state == STALE:
+            dashboard_cache.refresh_in_background(cache_key, _build_dashboard, symbol, cache_key)
         cached_data["cache_hit"] = True
+        # Cached signal and stats are fine, but prices can stay live from the stream
+        stream_prices = get_stream_prices(PRICE_SYMBOLS)
+        if stream_prices:
+            cached_data["prices"] = {**cached_data["prices"], **stream_prices}
         return {"success": True, "data": cached_data, "source": "cache"}
 
+    # Concurrent misses for the same symbol share one rebuild
+    return await dashboard_cache.compute(cache_key, _build_dashboard, symbol, cache_key)
+
+
+async def _build_dashboard(symbol: str, cache_key: str) -> Dict[str, Any]:
     # Get current prices (live or simulated)
     prices_response = await get_prices()
     prices = prices_response["data"]
@@ -1102,8 +1422,7 @@ async def get_dashboard(symbol: str = "BTC"):
     }
 
     # Save to cache
-    dashboard_cache["data"][cache_key] = response_data
-    dashboard_cache["timestamp"][cache_key] = current_time
+    dashboard_cache.set(cache_key, response_data)
 
     return {
         "success": True,
@@ -1111,6 +1430,47 @@ async def get_dashboard(symbol: str = "BTC"):
         "source": "fresh"
     }
 
+async def _fetch_binance_concurrently(fetch, symbols: List[str]) -> Dict[str, Any]:
+    """Run an async per-pair Binance fetch for all symbols concurrently.
+
+    Every pair is requested in parallel on the shared connection pool and the
+    whole batch shares a single deadline, so a refresh costs the slowest
+    symbol instead of the sum of all of them. Symbols that miss the deadline
+    are treated as unavailable and go through the regular fallback chain.
+    """
+    if not symbols:
+        return {}
+
+    tasks = {
+        symbol: asyncio.ensure_future(fetch(f"{symbol}/USDT"))
+        for symbol in symbols
+    }
+    done, pending = await asyncio.wait(tasks.values(), timeout=PRICE_REFRESH_DEADLINE_SECONDS)
+
+    for task in pending:
+        task.cancel()
+
+    if pending:
+        logger.warning(
+            "Binance price refresh deadline (%.1fs) hit for %d symbol(s)",
+            PRICE_REFRESH_DEADLINE_SECONDS,
+            len(pending),
+        )
+
+    results = {}
+    for symbol, task in tasks.items():
+        if task not in done or task.cancelled() or task.exception():
+            continue
+        result = task.result()
+        if result:
+            results[symbol] = result
+
+    return results
+
+
+async def _fetch_binance_24h_stats(symbols: List[str]) -> Dict[str, Dict]:
+    return await _fetch_binance_concurrently(binance_api.get_24h_stats_async, symbols)
+
 @app.get("/api/market/prices")
 async def get_prices():
     """Get current market prices from Binance"""
@@ -1118,35 +1478,55 @@ async def get_prices():
 
     print(f"\n[Market Prices] Request received at {datetime.now()}")
 
-    # Check cache first
+    # Live stream snapshots are fresher than any cache, serve them straight from memory
+    stream_prices = get_stream_prices(PRICE_SYMBOLS)
+    if len(stream_prices) == len(PRICE_SYMBOLS):
+        prices_cache.set(PRICES_CACHE_KEY, stream_prices)
+        return {
+            "success": True,
+            "data": stream_prices,
+            "source": "stream",
+            "data_source": f"Binance Stream ({len(stream_prices)} live)",
+        }
+
+    # Check cache first; a stale snapshot is served at once while one task refreshes it
+    cached_prices, cache_state = prices_cache.lookup(PRICES_CACHE_KEY)
+    if cached_prices:
+        if cache_state == STALE:
+            prices_cache.refresh_in_background(PRICES_CACHE_KEY, _refresh_market_prices)
+        print(f"[Market Prices] ✅ Returning {cache_state} cached data ({len(cached_prices)} symbols)")
+        return {"success": True, "data": {**cached_prices, **stream_prices}, "source": "cache", "cache_state": cache_state}
+
+    # Concurrent misses share one upstream fan-out
+    return await prices_cache.compute(PRICES_CACHE_KEY, _refresh_market_prices)
+
+
+async def _refresh_market_prices() -> Dict[str, Any]:
     current_time = time.time()
-    if prices_cache["data"] and (current_time - prices_cache["timestamp"]) < prices_cache["ttl"]:
-        print(f"[Market Prices] ✅ Returning cached data ({len(prices_cache['data'])} symbols)")
-        return {"success": True, "data": prices_cache["data"], "source": "cache"}
+    stream_prices = get_stream_prices(PRICE_SYMBOLS)
 
     # Trading Pairs - Top 8 coins (Best Balance)
-    previous_prices = prices_cache["data"] or {}
-    prices = {}
+    previous_prices = prices_cache.peek(PRICES_CACHE_KEY) or {}
+    prices = dict(stream_prices)
+    stream_count = len(stream_prices)
     live_count = 0
     coingecko_count = 0
     cached_count = 0
     simulated_count = 0
     missing_symbols = []
 
-    # Get live data from Binance
-    for symbol in PRICE_SYMBOLS:
-        pair = f"{symbol}/USDT"
-        stats = binance_api.get_24h_stats(pair)
+    # Get live data from Binance REST for symbols the stream does not cover,
+    # all at once under one shared deadline
+    rest_symbols = [symbol for symbol in PRICE_SYMBOLS if symbol not in stream_prices]
+    binance_stats = await _fetch_binance_24h_stats(rest_symbols)
+    for symbol in rest_symbols:
+        stats = binance_stats.get(symbol)
 
         if stats:
             live_count += 1
             # Update price history
             if symbol in trading_state["price_history"]:
-                history = trading_state["price_history"][symbol]
-                new_price = stats['price']
-                history.append(new_price)
-                if len(history) > 100:
-                    history.pop(0)
+                trading_state["price_history"][symbol].append(stats['price'])
 
             prices[symbol] = _normalize_price_snapshot(
                 price=stats["price"],
@@ -1162,7 +1542,7 @@ async def get_prices():
     coingecko_prices = {}
     if missing_symbols and ENHANCED_AI_AVAILABLE and coingecko_api:
         try:
-            coingecko_prices = coingecko_api.get_simple_prices(missing_symbols)
+            coingecko_prices = await coingecko_api.get_simple_prices_async(missing_symbols)
         except Exception as e:
             logger.warning("CoinGecko market fallback failed: %s", e)
 
@@ -1177,6 +1557,9 @@ async def get_prices():
                 low_24h=coingecko_snapshot.get("low_24h", coingecko_snapshot["price"]),
                 volume_24h=coingecko_snapshot.get("volume_24h", 0),
                 source=coingecko_snapshot.get("source") or "CoinGecko",
+                timestamp=coingecko_snapshot.get("timestamp"),
+                age_seconds=coingecko_snapshot.get("age_seconds"),
+                stale=coingecko_snapshot.get("stale", False),
             )
             coingecko_count += 1
             continue
@@ -1195,11 +1578,10 @@ async def get_prices():
         print(f"[Market Prices] ⚠️  {symbol}: Using simulated price ${prices[symbol]['price']:.2f}")
 
     # Update cache
-    prices_cache["data"] = prices
-    prices_cache["timestamp"] = current_time
+    prices_cache.set(PRICES_CACHE_KEY, prices)
 
     print(
-        f"[Market Prices] ✅ Returning {live_count} Binance + {coingecko_count} CoinGecko + "
+        f"[Market Prices] ✅ Returning {stream_count} stream + {live_count} Binance + {coingecko_count} CoinGecko + "
         f"{cached_count} cached + {simulated_count} simulated prices"
     )
 
@@ -1207,6 +1589,7 @@ async def get_prices():
         "success": True,
         "data": prices,
         "data_source": (
+            f"Binance Stream ({stream_count} live), "
             f"Binance ({live_count} live), CoinGecko ({coingecko_count} fallback), "
             f"Cache ({cached_count}), Simulated ({simulated_count})"
         ),
@@ -1229,7 +1612,12 @@ async def get_market_candles(symbol: str, interval: str = "1h", limit: int = DEF
 
     normalized_limit = clamp_candle_limit(limit)
     pair = f"{normalized_symbol}/USDT"
-    candles = binance_api.get_klines(pair, interval=interval, limit=normalized_limit)
+    try:
+        candles = await asyncio.to_thread(candle_store.get_recent, normalized_symbol, interval, normalized_limit)
+    except sqlite3.Error as e:
+        # An unusable store (e.g. a read-only filesystem) falls back like a failed fetch
+        logger.warning("Candle store read failed for %s %s: %s", normalized_symbol, interval, e)
+        candles = []
     source = "Binance"
 
     if not candles:
@@ -1248,26 +1636,164 @@ async def get_market_candles(symbol: str, interval: str = "1h", limit: int = DEF
         "source": source,
     }
 
+
+@app.get("/api/market/orderbook/{symbol}")
+async def get_market_order_book(symbol: str, depth: int = 10):
+    """Top of the locally maintained order book, with imbalance and microprice."""
+    normalized_symbol = symbol.upper().strip()
+    depth = min(max(int(depth or 10), 1), 100)
+    book = order_books.get_book(normalized_symbol)
+    if not book:
+        raise HTTPException(status_code=503, detail=f"No live order book for {normalized_symbol}")
+
+    return {
+        "success": True,
+        "data": {
+            "symbol": normalized_symbol,
+            "bids": book.top_bids(depth),
+            "asks": book.top_asks(depth),
+            "last_update_id": book.last_update_id,
+            **order_books.get_features(normalized_symbol, depth),
+        },
+        "source": "Binance depth stream",
+    }
+
+
+def require_admin_token(token: Optional[str]) -> None:
+    expected = os.getenv("ADMIN_API_TOKEN", "").strip()
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_API_TOKEN)")
+    if not hmac.compare_digest((token or "").encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@app.post("/api/admin/backfill/klines")
+async def start_kline_backfill(request: KlineBackfillRequest, x_admin_token: Optional[str] = Header(None)):
+    """Start a background backfill of historical klines into the local candle store."""
+    require_admin_token(x_admin_token)
+
+    symbols = [symbol.upper().strip() for symbol in (request.symbols or PRICE_SYMBOLS)]
+    unknown_intervals = [interval for interval in request.intervals if interval not in CANDLE_INTERVAL_MS]
+    if unknown_intervals:
+        raise HTTPException(status_code=400, detail=f"Unsupported intervals: {', '.join(unknown_intervals)}")
+    if request.days <= 0:
+        raise HTTPException(status_code=400, detail="days must be positive")
+
+    end_time = int(time.time() * 1000)
+    start_time = end_time - int(request.days * 86_400_000)
+    if not kline_backfill.start(symbols, request.intervals, start_time, end_time, workers=request.workers):
+        raise HTTPException(status_code=409, detail="A kline backfill is already running")
+
+    return {"success": True, "data": kline_backfill.status}
+
+
+@app.get("/api/admin/backfill/klines")
+async def get_kline_backfill_status(x_admin_token: Optional[str] = Header(None)):
+    """Progress of the current or last kline backfill."""
+    require_admin_token(x_admin_token)
+    return {"success": True, "data": kline_backfill.status}
+
+
+@app.post("/api/admin/replay")
+async def start_tick_replay(request: TickReplayRequest, x_admin_token: Optional[str] = Header(None)):
+    """Replay recorded or seeded ticks through the market data pipeline (offline instances only).
+
+    The replay runs on its own price histories and candle store. Signals and the /ws
+    channels follow the replayed market while it runs; the instance's own price
+    history comes back when it ends. Replayed candles stay in the replay store
+    (its path is returned) and are not served by /api/market/candles.
+    """
+    global replay_candle_store
+    require_admin_token(x_admin_token)
+
+    if env_flag("ENABLE_BINANCE_STREAM", True) and not env_flag("ENABLE_TICK_REPLAY", False):
+        raise HTTPException(
+            status_code=403, detail="Tick replay needs ENABLE_BINANCE_STREAM=0 or ENABLE_TICK_REPLAY=1 on this instance"
+        )
+    # Also covers a stream that is between reconnects (running but not connected)
+    if binance_stream.is_running():
+        raise HTTPException(status_code=409, detail="Disable the live Binance stream before replaying ticks")
+    if not MIN_SPEED <= request.speed <= MAX_SPEED:
+        raise HTTPException(status_code=400, detail=f"speed must be between {MIN_SPEED:g} and {MAX_SPEED:g}")
+    if not request.path and not request.generate:
+        raise HTTPException(status_code=400, detail="Provide a path or a number of ticks to generate")
+
+    if request.seed is not None:
+        seed_simulation(request.seed)
+
+    if request.generate:
+        events = generate_events(PRICE_SYMBOLS, request.generate, request.seed or 0)
+    else:
+        try:
+            events = await asyncio.to_thread(load_events, request.path, request.symbol)
+        except (OSError, ValueError, KeyError) as e:
+            raise HTTPException(status_code=400, detail=f"Could not load replay file: {e}")
+
+    if tick_replay.is_running():
+        raise HTTPException(status_code=409, detail="A tick replay is already running")
+
+    if replay_candle_store is None:
+        replay_candle_store = CandleStore(
+            path=os.getenv("REPLAY_CANDLE_STORE_PATH")
+            or os.path.join(tempfile.mkdtemp(prefix="tick_replay_"), "candles.db")
+        )
+
+    signal_probe = ai_predictor.generate_signal if request.measure_signals else None
+    tick_replay.start(events, request.speed, signal_probe=signal_probe, on_done=isolate_price_history_for_replay())
+
+    return {"success": True, "data": tick_replay.status, "candle_store": replay_candle_store.path}
+
+
+@app.get("/api/admin/replay")
+async def get_tick_replay_status(x_admin_token: Optional[str] = Header(None)):
+    """Progress, throughput and signal latency of the current or last replay."""
+    require_admin_token(x_admin_token)
+    return {"success": True, "data": tick_replay.status}
+
+
+@app.delete("/api/admin/replay")
+async def stop_tick_replay(x_admin_token: Optional[str] = Header(None)):
+    require_admin_token(x_admin_token)
+    return {"success": True, "stopped": await tick_replay.stop(), "data": tick_replay.status}
+
 def _get_simulated_price(symbol: str) -> Dict:
     """Get simulated price for a symbol"""
     history = trading_state["price_history"][symbol]
-    if not history:
+    if not len(history):
         history.extend(_generate_simulated_history(symbol))
 
-    new_price = history[-1] + random.uniform(-history[-1] * 0.01, history[-1] * 0.01)
+    new_price = history.last + simulation_rng.uniform(-history.last * 0.01, history.last * 0.01)
     history.append(new_price)
-    if len(history) > 100:
-        history.pop(0)
 
     return {
         "price": round(new_price, 2),
         "change_24h": round(((new_price - history[-2]) / history[-2]) * 100, 2) if len(history) > 1 else 0,
         "high_24h": round(new_price * 1.03, 2),
         "low_24h": round(new_price * 0.97, 2),
-        "volume_24h": round(random.uniform(1000000, 10000000), 2),
+        "volume_24h": round(simulation_rng.uniform(1000000, 10000000), 2),
         "source": "Simulated"
     }
 
+@app.get("/api/predictions")
+async def get_predictions(symbols: Optional[str] = None):
+    """AI signals and a symbols x indicators matrix for many symbols in one pass"""
+    requested = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else list(PRICE_SYMBOLS)
+    unknown = [s for s in requested if s not in trading_state["price_history"]]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Symbols not found: {', '.join(unknown)}")
+
+    signals = ai_predictor.generate_signals(requested)
+    matrix = ai_predictor.indicator_matrix([signals[s]["indicators"] for s in requested])
+    return {
+        "success": True,
+        "symbols": requested,
+        "columns": list(INDICATOR_COLUMNS),
+        # Rows follow `symbols`; null where a symbol's history is still warming up
+        "matrix": np.where(np.isnan(matrix), None, matrix).tolist(),
+        "signals": signals,
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/api/predictions/{symbol}")
 async def get_prediction(symbol: str):
     """Get AI prediction for symbol"""
@@ -1283,17 +1809,30 @@ async def explain_ai_decision(symbol: str):
     if symbol not in trading_state["price_history"]:
         raise HTTPException(status_code=404, detail="Symbol not found")
 
-    # Check cache first for faster loading
-    current_time = time.time()
+    # Check cache first for faster loading; stale entries are refreshed in the background
     cache_key = symbol
-    if (cache_key in ai_explanation_cache["data"] and
-        cache_key in ai_explanation_cache["timestamp"] and
-        (current_time - ai_explanation_cache["timestamp"][cache_key]) < ai_explanation_cache["ttl"]):
-        cached_data = ai_explanation_cache["data"][cache_key]
+    cached_data, cache_state = ai_explanation_cache.lookup(cache_key)
+    if cached_data is not None:
+        if cache_state == STALE:
+            ai_explanation_cache.refresh_in_background(cache_key, _build_ai_explanation, symbol, cache_key)
         cached_data["cache_hit"] = True
         logger.debug(f"Using cached AI explanation for {symbol}")
         return {"success": True, "data": cached_data, "source": "cache"}
 
+    return await ai_explanation_cache.compute(cache_key, _build_ai_explanation, symbol, cache_key)
+
+
+async def _build_ai_explanation(symbol: str, cache_key: str) -> Dict[str, Any]:
+    # Reasoning is rebuilt only when the signal it explains can have changed
+    explanation = ai_predictor.memoized(symbol, "explanation", _explain_signal)
+
+    # Cache the explanation for faster subsequent requests
+    ai_explanation_cache.set(cache_key, explanation)
+
+    return {"success": True, "data": explanation, "source": "fresh"}
+
+
+def _explain_signal(symbol: str) -> Dict[str, Any]:
     # Get AI signal with all indicators
     signal = ai_predictor.generate_signal(symbol)
     indicators = signal["indicators"]
@@ -1428,11 +1967,7 @@ async def explain_ai_decision(symbol: str):
     if "ml_prediction" in signal:
         explanation["ml_prediction"] = signal["ml_prediction"]
 
-    # Cache the explanation for faster subsequent requests
-    ai_explanation_cache["data"][cache_key] = explanation
-    ai_explanation_cache["timestamp"][cache_key] = current_time
-
-    return {"success": True, "data": explanation, "source": "fresh"}
+    return explanation
 
 @app.post("/api/trades/execute")
 async def execute_trade(request: TradeRequest):
@@ -1443,7 +1978,7 @@ async def execute_trade(request: TradeRequest):
         raise HTTPException(status_code=404, detail="Symbol not found")
 
     # Get current price
-    current_price = trading_state["price_history"][symbol][-1]
+    current_price = trading_state["price_history"][symbol].last
 
     # Get AI signal
     signal = ai_predictor.generate_signal(symbol)
@@ -1492,7 +2027,8 @@ async def execute_trade(request: TradeRequest):
         try:
             service = require_sodex_service()
             prepared_order = request.sodex_signed_order
-            sodex_result = service.submit_prepared_order(
+            sodex_result = await asyncio.to_thread(
+                service.submit_prepared_order,
                 request_body=prepared_order.get("request_body") or {},
                 signature=str(prepared_order.get("signature") or ""),
                 nonce=int(prepared_order.get("nonce")),
@@ -1538,6 +2074,7 @@ async def execute_trade(request: TradeRequest):
                 "cl_ord_id": primary_result.get("clOrdID") or prepared_order.get("cl_ord_id"),
                 "exchange_order_id": primary_result.get("orderID"),
             }
+            channel_hub.publish("trades", symbol, executed_trade)
 
             return {
                 "success": True,
@@ -1953,7 +2490,7 @@ def _calculate_trade_performance(trades: List[Dict[str, Any]]) -> Dict[str, Any]
     }
 
 
-def build_trade_history_response(
+async def build_trade_history_response(
     limit: int = 20,
     *,
     user_address: Optional[str] = None,
@@ -1963,12 +2500,9 @@ def build_trade_history_response(
     filter_primary_by_user: bool = False,
     use_cache: bool = True,
 ) -> Dict[str, Any]:
-    import time
-
     normalized_limit = min(max(int(limit or 20), 1), 250)
     normalized_symbol = str(symbol or "").strip().upper() or None
     include_sodex_history = bool(include_sodex) if include_sodex is not None else bool(user_address)
-    primary_user_filter = user_address if filter_primary_by_user else None
     cache_key = _build_trade_history_cache_key(
         normalized_limit,
         user_address=user_address,
@@ -1984,6 +2518,36 @@ def build_trade_history_response(
             logger.debug("Using cached trade history")
             return trade_history_cache["data"]
 
+    # Settlement and SoDEX reads block, so collect in a worker thread and
+    # let identical concurrent requests share one collection
+    return await single_flight.do(
+        f"trade_history:{cache_key}",
+        asyncio.to_thread,
+        _collect_trade_history_response,
+        normalized_limit,
+        cache_key=cache_key,
+        user_address=user_address,
+        normalized_symbol=normalized_symbol,
+        account_id=account_id,
+        include_sodex_history=include_sodex_history,
+        filter_primary_by_user=filter_primary_by_user,
+        use_cache=use_cache,
+    )
+
+
+def _collect_trade_history_response(
+    normalized_limit: int,
+    *,
+    cache_key: str,
+    user_address: Optional[str],
+    normalized_symbol: Optional[str],
+    account_id: Optional[str],
+    include_sodex_history: bool,
+    filter_primary_by_user: bool,
+    use_cache: bool,
+) -> Dict[str, Any]:
+    primary_user_filter = user_address if filter_primary_by_user else None
+
     primary_result = _collect_primary_trade_history(
         normalized_limit,
         user_address=primary_user_filter,
@@ -2057,7 +2621,7 @@ async def get_trade_history(
 ):
     """Get a unified execution history across internal, settlement, and optional SoDEX sources."""
     try:
-        return build_trade_history_response(
+        return await build_trade_history_response(
             limit=limit,
             user_address=user_address,
             symbol=symbol,
@@ -2098,7 +2662,7 @@ async def get_performance(
     )
 
     if wants_unified_history:
-        history_payload = build_trade_history_response(
+        history_payload = await build_trade_history_response(
             limit=limit,
             user_address=user_address,
             symbol=symbol,
@@ -2170,8 +2734,7 @@ async def get_risk_limits():
 async def update_risk_limits(update: RiskLimitsUpdate):
     """Update risk limits"""
     new_limits = {k: v for k, v in update.dict().items() if v is not None}
-    smart_contract.risk_limits.update(new_limits)
-    return {"success": True, "data": smart_contract.risk_limits}
+    return {"success": True, "data": smart_contract.update_risk_limits(new_limits)}
 
 @app.get("/api/oracle/verifications")
 async def get_oracle_verifications(limit: int = 20):
@@ -2179,46 +2742,133 @@ async def get_oracle_verifications(limit: int = 20):
     verifications = oracle.verifications[-limit:][::-1]
     return {"success": True, "data": verifications, "count": len(verifications)}
 
+async def build_market_update_frame() -> Dict[str, Any]:
+    """Build one market_update frame shared by every /ws subscriber."""
+    # Get prices from Binance, the live stream first and REST as fallback
+    rest_symbols = [symbol for symbol in trading_state["price_history"] if not binance_stream.is_live(symbol)]
+    rest_prices = await _fetch_binance_concurrently(binance_api.get_price_async, rest_symbols)
+
+    for symbol in rest_symbols:
+        history = trading_state["price_history"][symbol]
+        price = rest_prices.get(symbol)
+        if price:
+            history.append(price)
+        else:
+            # Fallback to simulated if Binance fails
+            new_price = history.last + simulation_rng.uniform(-history.last * 0.005, history.last * 0.005)
+            history.append(new_price)
+
+    return {
+        "type": "market_update",
+        "prices": {
+            symbol: round(binance_stream.get_price(symbol) or trading_state["price_history"][symbol].last, 2)
+            for symbol in trading_state["price_history"]
+        },
+        "pnl": round(trading_state["pnl"], 2),
+        "balance": trading_state["balance"],
+        "data_source": "Binance",
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+market_broadcaster = MarketBroadcaster(
+    build_market_update_frame,
+    interval_seconds=2.0,
+    max_queue=int(os.getenv("WS_CLIENT_QUEUE_SIZE", "4")),
+)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket for real-time updates from Binance"""
+    """WebSocket for real-time updates: the shared market feed plus per-symbol channels"""
     await websocket.accept()
-    try:
-        while True:
-            # Get prices from Binance
-            for symbol in trading_state["price_history"]:
-                pair = f"{symbol}/USDT"
-                price = binance_api.get_price(pair)
-                if price:
-                    history = trading_state["price_history"][symbol]
-                    history.append(price)
-                    if len(history) > 100:
-                        history.pop(0)
-                else:
-                    # Fallback to simulated if Binance fails
-                    history = trading_state["price_history"][symbol]
-                    new_price = history[-1] + random.uniform(-history[-1] * 0.005, history[-1] * 0.005)
-                    history.append(new_price)
-                    if len(history) > 100:
-                        history.pop(0)
-
-            # Send update
-            data = {
-                "type": "market_update",
-                "prices": {
-                    symbol: round(trading_state["price_history"][symbol][-1], 2)
-                    for symbol in trading_state["price_history"]
-                },
-                "pnl": round(trading_state["pnl"], 2),
-                "balance": trading_state["balance"],
-                "data_source": "Binance",
-                "timestamp": datetime.now().isoformat()
-            }
 
-            await websocket.send_text(json.dumps(data))
-            await asyncio.sleep(2)
+    # Opt-in protocol negotiated at connect time: /ws?protocol=delta&encoding=json|msgpack|packed
+    protocol = websocket.query_params.get("protocol", "full").lower()
+    encoding = websocket.query_params.get("encoding", "json").lower()
+    if protocol not in WS_PROTOCOLS or encoding not in WS_ENCODINGS:
+        await websocket.close(code=1008, reason="Unsupported protocol or encoding")
+        return
+    if encoding == "msgpack" and not MSGPACK_AVAILABLE:
+        await websocket.close(code=1008, reason="msgpack encoding is not available on this server")
+        return
+
+    # Without ?channels=... the connection starts on the market feed only, as before
+    channels_param = websocket.query_params.get("channels")
+    channels = channel_hub.connect(channels_param.split(",") if channels_param is not None else None)
+    send_lock = asyncio.Lock()
+    market_task: Optional[asyncio.Task] = None
+
+    async def send(frame) -> None:
+        async with send_lock:
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+
+    async def pump_market() -> None:
+        subscriber = market_broadcaster.subscribe(protocol, encoding)
+        try:
+            while True:
+                frame = await subscriber.next_frame()
+                if frame is None:
+                    # Evicted for falling too far behind the broadcast
+                    await websocket.close(code=1013)
+                    return
+                await send(frame)
+        finally:
+            market_broadcaster.unsubscribe(subscriber)
+
+    async def pump_channels() -> None:
+        while True:
+            message = await channels.next_message()
+            if message is None:
+                await websocket.close(code=1013)
+                return
+            await send(message)
+
+    def sync_market_feed() -> None:
+        nonlocal market_task
+        if channels.wants_market and (market_task is None or market_task.done()):
+            market_task = asyncio.create_task(pump_market())
+        elif not channels.wants_market and market_task is not None:
+            market_task.cancel()
+            market_task = None
+
+    async def send_signal_snapshots(subscribed: List[str]) -> None:
+        """Current signal for new signals:<SYM> subscriptions; after that they only arrive on change"""
+        symbols: List[str] = []
+        for channel in subscribed:
+            kind, _, symbol = channel.partition(":")
+            if kind == "signals":
+                symbols.extend(PRICE_SYMBOLS if symbol == ALL_SYMBOLS else [symbol])
+        symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol in trading_state["price_history"]]
+        if not symbols:
+            return
+
+        signals = await asyncio.to_thread(ai_predictor.generate_signals, symbols)
+        for symbol, signal in signals.items():
+            await send(channel_hub.format_message("signals", symbol, signal))
+
+    async def read_commands() -> None:
+        await send_signal_snapshots(sorted(channels.channels))
+        while True:
+            reply = channel_hub.handle_command(channels, await websocket.receive_text())
+            sync_market_feed()
+            await send(json.dumps(reply))
+            if reply["type"] == "subscribed":
+                await send_signal_snapshots(reply["channels"])
+
+    sync_market_feed()
+    tasks = [asyncio.create_task(read_commands()), asyncio.create_task(pump_channels())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
     except:
         pass
+    finally:
+        for task in tasks + ([market_task] if market_task else []):
+            task.cancel()
+        channel_hub.disconnect(channels)
 
 # ============ Backtesting Endpoints ============
 
@@ -2320,7 +2970,7 @@ async def get_wallet():
     # Add crypto values (convert to USDT)
     for symbol in ["BTC", "ETH", "BNB", "SOL"]:
         if wallet_state["balances"][symbol] > 0:
-            current_price = trading_state["price_history"][symbol][-1]
+            current_price = trading_state["price_history"][symbol].last
             total_value += wallet_state["balances"][symbol] * current_price
 
     return {
@@ -2346,7 +2996,7 @@ async def get_wallet_balances():
             value_usdt = balance
             price = 1.0
         else:
-            price = trading_state["price_history"][currency][-1]
+            price = trading_state["price_history"][currency].last
             value_usdt = balance * price
 
         balances.append({
@@ -2556,7 +3206,7 @@ async def claim_faucet_native(request: dict):
             raise HTTPException(status_code=400, detail="Address required")
 
         # Try SoDEX faucet first
-        result = sodex_service.claim_faucet(address)
+        result = await asyncio.to_thread(sodex_service.claim_faucet, address)
 
         if result.get("success"):
             return {
@@ -2581,7 +3231,7 @@ async def claim_faucet_native(request: dict):
 async def get_faucet_info():
     """Get faucet availability and information for the current network."""
     try:
-        info = sodex_service.get_faucet_info()
+        info = await asyncio.to_thread(sodex_service.get_faucet_info)
         return {
             "success": True,
             "data": info
@@ -2631,9 +3281,10 @@ async def train_ml_model():
                 trade_data = settlement_service.contract.functions.getTrade(trade_id).call()
                 if trade_data[8]:  # settled
                     # Get indicators for this trade (simulate)
-                    indicators = ai_predictor.calculate_indicators(
-                        trading_state["price_history"].get("BTC", [50000] * 100)
-                    )
+                    if len(get_price_history_view("BTC")):
+                        indicators = ai_predictor.symbol_indicators("BTC")
+                    else:
+                        indicators = ai_predictor.calculate_indicators([50000] * 100)
 
                     trades.append({
                         "indicators": indicators,
@@ -2751,7 +3402,7 @@ class BinanceCancelRequest(BaseModel):
 @app.get("/api/binance/status")
 async def get_binance_trading_status():
     """Get Binance trading status and configuration"""
-    info = binance_trading.get_trading_info()
+    info = await asyncio.to_thread(binance_trading.get_trading_info)
 
     return {
         "success": True,
@@ -2764,7 +3415,7 @@ async def get_binance_balance(asset: str = "USDT"):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    balance = binance_trading.get_balance(asset)
+    balance = await asyncio.to_thread(binance_trading.get_balance, asset)
 
     if balance is None:
         raise HTTPException(status_code=500, detail="Failed to fetch balance")
@@ -2781,7 +3432,7 @@ async def get_all_binance_balances():
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    balances = binance_trading.get_all_balances()
+    balances = await asyncio.to_thread(binance_trading.get_all_balances)
 
     return {
         "success": True,
@@ -2799,7 +3450,7 @@ async def execute_binance_trade(request: BinanceTradeRequest):
         if request.usdt_amount and not request.quantity:
             # Get current price
             from binance_api import binance_api
-            current_price = binance_api.get_price(request.symbol)
+            current_price = await binance_api.get_price_async(request.symbol)
 
             if not current_price:
                 raise HTTPException(status_code=400, detail="Failed to get current price")
@@ -2812,7 +3463,8 @@ async def execute_binance_trade(request: BinanceTradeRequest):
 
         # Place order based on type
         if request.order_type.upper() == "MARKET":
-            result = binance_trading.place_market_order(
+            result = await asyncio.to_thread(
+                binance_trading.place_market_order,
                 request.symbol,
                 request.side,
                 request.quantity
@@ -2821,7 +3473,8 @@ async def execute_binance_trade(request: BinanceTradeRequest):
             if not request.price:
                 raise HTTPException(status_code=400, detail="Price required for limit orders")
 
-            result = binance_trading.place_limit_order(
+            result = await asyncio.to_thread(
+                binance_trading.place_limit_order,
                 request.symbol,
                 request.side,
                 request.quantity,
@@ -2850,7 +3503,7 @@ async def get_open_binance_orders(symbol: Optional[str] = None):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    orders = binance_trading.get_open_orders(symbol)
+    orders = await asyncio.to_thread(binance_trading.get_open_orders, symbol)
 
     return {
         "success": True,
@@ -2864,7 +3517,7 @@ async def get_binance_order_history(symbol: str, limit: int = 50):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    orders = binance_trading.get_all_orders(symbol, limit)
+    orders = await asyncio.to_thread(binance_trading.get_all_orders, symbol, limit)
 
     return {
         "success": True,
@@ -2878,7 +3531,7 @@ async def get_binance_trade_history(symbol: str, limit: int = 50):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    trades = binance_trading.get_trade_history(symbol, limit)
+    trades = await asyncio.to_thread(binance_trading.get_trade_history, symbol, limit)
 
     return {
         "success": True,
@@ -2892,7 +3545,7 @@ async def cancel_binance_order(request: BinanceCancelRequest):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    result = binance_trading.cancel_order(request.symbol, request.order_id)
+    result = await asyncio.to_thread(binance_trading.cancel_order, request.symbol, request.order_id)
 
     if not result:
         raise HTTPException(status_code=500, detail="Failed to cancel order")
@@ -2908,7 +3561,7 @@ async def get_binance_order_status(symbol: str, order_id: int):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    status = binance_trading.get_order_status(symbol, order_id)
+    status = await asyncio.to_thread(binance_trading.get_order_status, symbol, order_id)
 
     if not status:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -2938,7 +3591,7 @@ async def execute_ai_binance_trade(symbol: str, usdt_amount: float = 10.0):
 
         # Get current price
         from binance_api import binance_api
-        current_price = binance_api.get_price(symbol)
+        current_price = await binance_api.get_price_async(symbol)
 
         if not current_price:
             raise HTTPException(status_code=400, detail="Failed to get current price")
@@ -2947,7 +3600,8 @@ async def execute_ai_binance_trade(symbol: str, usdt_amount: float = 10.0):
         quantity = binance_trading.calculate_quantity(symbol, usdt_amount, current_price)
 
         # Execute trade
-        result = binance_trading.place_market_order(
+        result = await asyncio.to_thread(
+            binance_trading.place_market_order,
             symbol,
             signal["signal"],
             quantity
@@ -2997,7 +3651,7 @@ class BinanceCancelRequest(BaseModel):
 @app.get("/api/binance/status")
 async def get_binance_trading_status():
     """Get Binance trading status and configuration"""
-    info = binance_trading.get_trading_info()
+    info = await asyncio.to_thread(binance_trading.get_trading_info)
 
     return {
         "success": True,
@@ -3010,7 +3664,7 @@ async def get_binance_balance(asset: str = "USDT"):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    balance = binance_trading.get_balance(asset)
+    balance = await asyncio.to_thread(binance_trading.get_balance, asset)
 
     if balance is None:
         raise HTTPException(status_code=500, detail="Failed to fetch balance")
@@ -3027,7 +3681,7 @@ async def get_all_binance_balances():
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    balances = binance_trading.get_all_balances()
+    balances = await asyncio.to_thread(binance_trading.get_all_balances)
 
     return {
         "success": True,
@@ -3045,7 +3699,7 @@ async def execute_binance_trade(request: BinanceTradeRequest):
         if request.usdt_amount and not request.quantity:
             # Get current price
             from binance_api import binance_api
-            current_price = binance_api.get_price(request.symbol)
+            current_price = await binance_api.get_price_async(request.symbol)
 
             if not current_price:
                 raise HTTPException(status_code=400, detail="Failed to get current price")
@@ -3058,7 +3712,8 @@ async def execute_binance_trade(request: BinanceTradeRequest):
 
         # Place order based on type
         if request.order_type.upper() == "MARKET":
-            result = binance_trading.place_market_order(
+            result = await asyncio.to_thread(
+                binance_trading.place_market_order,
                 request.symbol,
                 request.side,
                 request.quantity
@@ -3067,7 +3722,8 @@ async def execute_binance_trade(request: BinanceTradeRequest):
             if not request.price:
                 raise HTTPException(status_code=400, detail="Price required for limit orders")
 
-            result = binance_trading.place_limit_order(
+            result = await asyncio.to_thread(
+                binance_trading.place_limit_order,
                 request.symbol,
                 request.side,
                 request.quantity,
@@ -3096,7 +3752,7 @@ async def get_open_binance_orders(symbol: Optional[str] = None):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    orders = binance_trading.get_open_orders(symbol)
+    orders = await asyncio.to_thread(binance_trading.get_open_orders, symbol)
 
     return {
         "success": True,
@@ -3110,7 +3766,7 @@ async def get_binance_order_history(symbol: str, limit: int = 50):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    orders = binance_trading.get_all_orders(symbol, limit)
+    orders = await asyncio.to_thread(binance_trading.get_all_orders, symbol, limit)
 
     return {
         "success": True,
@@ -3124,7 +3780,7 @@ async def get_binance_trade_history(symbol: str, limit: int = 50):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    trades = binance_trading.get_trade_history(symbol, limit)
+    trades = await asyncio.to_thread(binance_trading.get_trade_history, symbol, limit)
 
     return {
         "success": True,
@@ -3138,7 +3794,7 @@ async def cancel_binance_order(request: BinanceCancelRequest):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    result = binance_trading.cancel_order(request.symbol, request.order_id)
+    result = await asyncio.to_thread(binance_trading.cancel_order, request.symbol, request.order_id)
 
     if not result:
         raise HTTPException(status_code=500, detail="Failed to cancel order")
@@ -3154,7 +3810,7 @@ async def get_binance_order_status(symbol: str, order_id: int):
     if not binance_trading.is_configured:
         raise HTTPException(status_code=400, detail="Binance trading not configured")
 
-    status = binance_trading.get_order_status(symbol, order_id)
+    status = await asyncio.to_thread(binance_trading.get_order_status, symbol, order_id)
 
     if not status:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -3184,7 +3840,7 @@ async def execute_ai_binance_trade(symbol: str, usdt_amount: float = 10.0):
 
         # Get current price
         from binance_api import binance_api
-        current_price = binance_api.get_price(symbol)
+        current_price = await binance_api.get_price_async(symbol)
 
         if not current_price:
             raise HTTPException(status_code=400, detail="Failed to get current price")
@@ -3193,7 +3849,8 @@ async def execute_ai_binance_trade(symbol: str, usdt_amount: float = 10.0):
         quantity = binance_trading.calculate_quantity(symbol, usdt_amount, current_price)
 
         # Execute trade
-        result = binance_trading.place_market_order(
+        result = await asyncio.to_thread(
+            binance_trading.place_market_order,
             symbol,
             signal["signal"],
             quantity
@@ -3228,8 +3885,8 @@ async def get_enhanced_prediction(symbol: str):
         )
 
     try:
-        # Get price history
-        price_history = trading_state["price_history"].get(symbol, [])
+        # Get price history; copied, since the stream keeps appending while the worker reads it
+        price_history = get_price_history_snapshot(symbol)
 
         if len(price_history) < 20:
             return {
@@ -3239,7 +3896,7 @@ async def get_enhanced_prediction(symbol: str):
             }
 
         # Generate enhanced prediction
-        prediction = enhanced_predictor.predict(symbol, price_history)
+        prediction = await asyncio.to_thread(enhanced_predictor.predict, symbol, price_history)
 
         return {
             "success": True,
@@ -3258,7 +3915,7 @@ async def get_coingecko_data(symbol: str):
         raise HTTPException(status_code=503, detail="CoinGecko integration not available")
 
     try:
-        market_data = coingecko_api.get_enhanced_market_data(symbol)
+        market_data = await coingecko_api.get_enhanced_market_data_async(symbol)
 
         if not market_data:
             raise HTTPException(status_code=404, detail=f"No data found for {symbol}")
@@ -3294,7 +3951,7 @@ async def get_market_sentiment(symbol: str):
         raise HTTPException(status_code=503, detail="Sentiment integrations are not available")
 
     try:
-        sentiment = coingecko_api.get_market_sentiment(normalized_symbol)
+        sentiment = await coingecko_api.get_market_sentiment_async(normalized_symbol)
 
         if not sentiment:
             sentiment = build_sentiment_fallback(
@@ -3331,7 +3988,7 @@ async def get_global_market():
         raise HTTPException(status_code=503, detail="CoinGecko integration not available")
 
     try:
-        global_data = coingecko_api.get_global_market_data()
+        global_data = await coingecko_api.get_global_market_data_async()
 
         if not global_data:
             return {
@@ -3366,7 +4023,7 @@ async def get_trending_coins():
         raise HTTPException(status_code=503, detail="CoinGecko integration not available")
 
     try:
-        trending = coingecko_api.get_trending_coins()
+        trending = await coingecko_api.get_trending_coins_async()
 
         if not trending:
             raise HTTPException(status_code=500, detail="Failed to fetch trending coins")
@@ -3453,7 +4110,7 @@ async def get_sosovalue_currencies():
     service = require_sosovalue_service()
 
     try:
-        currencies = service.get_listed_currencies()
+        currencies = await asyncio.to_thread(service.get_listed_currencies)
         return {
             "success": True,
             "data": currencies,
@@ -3470,7 +4127,7 @@ async def get_sosovalue_news(page_num: int = 1, page_size: int = 10):
     service = require_sosovalue_service()
 
     try:
-        feed = service.get_news_feed(page_num=page_num, page_size=page_size)
+        feed = await asyncio.to_thread(service.get_news_feed, page_num=page_num, page_size=page_size)
         return {
             "success": True,
             "data": feed
@@ -3486,7 +4143,7 @@ async def get_sosovalue_news_by_symbol(symbol: str, page_num: int = 1, page_size
     service = require_sosovalue_service()
 
     try:
-        feed = service.get_news_feed(symbol=symbol, page_num=page_num, page_size=page_size)
+        feed = await asyncio.to_thread(service.get_news_feed, symbol=symbol, page_num=page_num, page_size=page_size)
         return {
             "success": True,
             "data": feed
@@ -3504,7 +4161,7 @@ async def get_sosovalue_etf_metrics(etf_type: str = "us-btc-spot"):
     service = require_sosovalue_service()
 
     try:
-        metrics = service.get_etf_metrics(etf_type=etf_type)
+        metrics = await asyncio.to_thread(service.get_etf_metrics, etf_type=etf_type)
         return {
             "success": True,
             "data": metrics
@@ -3546,7 +4203,7 @@ async def get_sosovalue_research_context(symbol: str, news_limit: int = 5):
                 "message": fallback_reason,
             }
 
-        context = sosovalue_service.get_research_context(symbol=symbol, news_limit=news_limit)
+        context = await asyncio.to_thread(sosovalue_service.get_research_context, symbol=symbol, news_limit=news_limit)
         sosovalue_research_cache[normalized_symbol] = context
         return {
             "success": True,
@@ -3620,7 +4277,8 @@ async def prepare_sodex_order(request: SodexOrderPreparationRequest):
     service = require_sodex_service()
 
     try:
-        prepared_order = service.prepare_order(
+        prepared_order = await asyncio.to_thread(
+            service.prepare_order,
             symbol=request.symbol,
             trade_type=request.trade_type,
             amount=request.amount,
@@ -3658,7 +4316,7 @@ async def get_sodex_symbols(symbol: str = None):
     service = require_sodex_service()
 
     try:
-        symbols = service.get_symbols(symbol=symbol)
+        symbols = await asyncio.to_thread(service.get_symbols, symbol=symbol)
         return {
             "success": True,
             "data": symbols,
@@ -3675,7 +4333,7 @@ async def get_sodex_tickers(symbol: str = None):
     service = require_sodex_service()
 
     try:
-        tickers = service.get_tickers(symbol=symbol)
+        tickers = await asyncio.to_thread(service.get_tickers, symbol=symbol)
         return {
             "success": True,
             "data": tickers,
@@ -3692,7 +4350,8 @@ async def get_sodex_history(user_address: str, symbol: str = None, limit: int =
     service = require_sodex_service()
 
     try:
-        trades = service.get_account_trades(
+        trades = await asyncio.to_thread(
+            service.get_account_trades,
             user_address=user_address,
             symbol=symbol,
             limit=min(max(int(limit or 50), 1), 250),
@@ -3701,7 +4360,8 @@ async def get_sodex_history(user_address: str, symbol: str = None, limit: int =
         normalized = service.normalize_history_items(trades)
 
         if not normalized:
-            orders = service.get_account_order_history(
+            orders = await asyncio.to_thread(
+                service.get_account_order_history,
                 user_address=user_address,
                 symbol=symbol,
                 limit=min(max(int(limit or 50), 1), 250),
@@ -3790,6 +4450,27 @@ async def get_ai_explainability_bundle(
             ),
         }
 
+    return await single_flight.do(
+        cache_key,
+        _build_ai_explainability_bundle,
+        normalized_symbol,
+        news_limit,
+        candle_limit,
+        candle_interval,
+        cache_key,
+        set_cached,
+    )
+
+
+async def _build_ai_explainability_bundle(
+    normalized_symbol: str,
+    news_limit: int,
+    candle_limit: int,
+    candle_interval: str,
+    cache_key: str,
+    set_cached: Optional[Callable[..., Any]],
+) -> Dict[str, Any]:
+    cache_duration = EXPLAINABILITY_CACHE_DURATION_SECONDS
     explain_payload = await explain_ai_decision(normalized_symbol)
     candles_payload = await get_market_candles(
         normalized_symbol,
@@ -3808,17 +4489,18 @@ async def get_ai_explainability_bundle(
     sosovalue_feed = None
     if SOSOVALUE_AVAILABLE and sosovalue_service and sosovalue_service.is_available():
         try:
-            research_context = sosovalue_service.get_research_context(normalized_symbol, news_limit=news_limit)
+            research_context = await asyncio.to_thread(sosovalue_service.get_research_context, normalized_symbol, news_limit=news_limit)
         except Exception as e:
             warnings.append(f"SoSoValue research unavailable: {e}")
 
         try:
-            sosovalue_feed = sosovalue_service.get_news_feed(symbol=normalized_symbol, page_num=1, page_size=news_limit)
+            sosovalue_feed = await asyncio.to_thread(sosovalue_service.get_news_feed, symbol=normalized_symbol, page_num=1, page_size=news_limit)
         except Exception as e:
             warnings.append(f"SoSoValue news unavailable: {e}")
 
         try:
-            etf_metrics = sosovalue_service.get_etf_metrics(
+            etf_metrics = await asyncio.to_thread(
+                sosovalue_service.get_etf_metrics,
                 etf_type="us-eth-spot" if normalized_symbol == "ETH" else "us-btc-spot"
             )
         except Exception as e:
@@ -3988,7 +4670,7 @@ async def train_lstm_model(symbol: str, epochs: int = 50):
         raise HTTPException(status_code=503, detail="LSTM features not available")
 
     try:
-        price_history = trading_state["price_history"].get(symbol, [])
+        price_history = get_price_history_snapshot(symbol)
 
         if len(price_history) < lstm_predictor.sequence_length + 10:
             raise HTTPException(
@@ -4017,7 +4699,7 @@ async def get_lstm_prediction(symbol: str):
         raise HTTPException(status_code=503, detail="LSTM features not available")
 
     try:
-        price_history = trading_state["price_history"].get(symbol, [])
+        price_history = get_price_history_snapshot(symbol)
 
         if len(price_history) < lstm_predictor.sequence_length:
             raise HTTPException(
@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from compiled_forest import CompiledForest
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -34,6 +36,11 @@ class MLPredictor:
         ]
         self.model_path = 'ml_model.pkl'
         self.scaler_path = 'ml_scaler.pkl'
+        # Flat-array copy of the trained forest with the scaler folded in
+        self.compiled: Optional[CompiledForest] = None
+        self.feature_importance: Dict[str, float] = {}
+        # Bumped whenever a model is loaded or trained, so callers can drop cached predictions
+        self.version = 0
         
         if SKLEARN_AVAILABLE:
             self.model = RandomForestClassifier(
@@ -54,10 +61,23 @@ class MLPredictor:
                 with open(self.scaler_path, 'rb') as f:
                     self.scaler = pickle.load(f)
                 self.is_trained = True
+                self._compile()
                 logger.info("✓ ML model loaded successfully")
         except Exception as e:
             logger.warning(f"Could not load ML model: {e}")
     
+    def _compile(self):
+        """Compile the trained forest for fast inference and cache its static metadata"""
+        self.version += 1
+        self.feature_importance = {
+            k: round(float(v), 4) for k, v in zip(self.feature_names, self.model.feature_importances_)
+        }
+        try:
+            self.compiled = CompiledForest.from_sklearn(self.model, self.scaler)
+        except Exception as e:
+            self.compiled = None
+            logger.warning(f"Could not compile ML model, using sklearn inference: {e}")
+    
     def _save_model(self):
         """Save trained model"""
         try:
@@ -115,6 +135,7 @@ class MLPredictor:
             # Train model
             self.model.fit(X_scaled, y)
             self.is_trained = True
+            self._compile()
             
             # Calculate training accuracy
             train_accuracy = self.model.score(X_scaled, y)
@@ -138,36 +159,39 @@ class MLPredictor:
     
     def predict(self, indicators: Dict) -> Optional[Dict]:
         """Predict trade outcome using ML model"""
-        if not SKLEARN_AVAILABLE or not self.is_trained:
-            return None
+        return self.predict_batch([indicators])[0]
+    
+    def predict_batch(self, indicator_rows: List[Dict]) -> List[Optional[Dict]]:
+        """Predict trade outcomes for many indicator sets with one model call"""
+        if not SKLEARN_AVAILABLE or not self.is_trained or not indicator_rows:
+            return [None] * len(indicator_rows)
         
         try:
-            features = self.extract_features(indicators)
-            features_scaled = self.scaler.transform([features])
-            
-            # Get prediction
-            prediction = self.model.predict(features_scaled)[0]
-            probabilities = self.model.predict_proba(features_scaled)[0]
+            features = np.array([self.extract_features(indicators) for indicators in indicator_rows], dtype=float)
             
-            # Get feature importance
-            feature_importance = dict(zip(
-                self.feature_names,
-                self.model.feature_importances_
-            ))
+            # One predict_proba pass; the predicted class is its argmax, as in model.predict
+            if self.compiled is not None:
+                probabilities = self.compiled.predict_proba(features)
+            else:
+                probabilities = self.model.predict_proba(self.scaler.transform(features))
+            predictions = self.model.classes_[np.argmax(probabilities, axis=1)]
             
-            return {
-                "prediction": "BUY" if prediction == 1 else "SELL",
-                "ml_confidence": float(probabilities[1]),
-                "win_probability": float(probabilities[1]),
-                "loss_probability": float(probabilities[0]),
-                "model": "Random Forest",
-                "feature_importance": {k: round(v, 4) for k, v in feature_importance.items()},
-                "is_trained": True
-            }
+            return [
+                {
+                    "prediction": "BUY" if prediction == 1 else "SELL",
+                    "ml_confidence": float(row[1]),
+                    "win_probability": float(row[1]),
+                    "loss_probability": float(row[0]),
+                    "model": "Random Forest",
+                    "feature_importance": dict(self.feature_importance),
+                    "is_trained": True
+                }
+                for prediction, row in zip(predictions, probabilities)
+            ]
         
         except Exception as e:
             logger.error(f"Prediction error: {e}")
-            return None
+            return [None] * len(indicator_rows)
     
     def get_model_info(self) -> Dict:
         """Get ML model information"""
@@ -183,7 +207,9 @@ class MLPredictor:
             "model_type": "Random Forest Classifier",
             "n_estimators": 100,
             "features": self.feature_names,
-            "model_exists": os.path.exists(self.model_path)
+            "model_exists": os.path.exists(self.model_path),
+            "version": self.version,
+            "compiled": self.compiled.get_info() if self.compiled is not None else None
         }
 
 
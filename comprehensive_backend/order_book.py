@@ -0,0 +1,331 @@
+"""
+Local L2 order books maintained from the Binance depth-diff stream.
+
+Each book is seeded from a REST depth snapshot and then kept current by
+applying `<symbol>@depth` diff events in update-id order, following the
+Binance "manage a local order book" procedure: events are buffered until the
+snapshot arrives, events older than the snapshot are dropped, and any gap in
+the update-id sequence marks the book unsynced and triggers a fresh snapshot.
+
+Price levels live in dicts with parallel sorted price lists, so best bid/ask
+are O(1) reads and level updates are a bisect plus a list insert/delete.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from binance_api import binance_api
+
+logger = logging.getLogger(__name__)
+
+Level = Tuple[float, float]
+
+
+class OrderBook:
+    """Sorted bid/ask price levels for one symbol."""
+
+    def __init__(self, symbol: str, max_levels: int = 1000) -> None:
+        self.symbol = symbol
+        self.max_levels = max_levels
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        # Sort keys ascending with the best level last: bids by price, asks by -price
+        self._bid_keys: List[float] = []
+        self._ask_keys: List[float] = []
+        self.last_update_id = 0
+        self.synced = False
+        self.updated_at = 0.0
+
+    @staticmethod
+    def _set_level(levels: Dict[float, float], keys: List[float], price: float, key: float, quantity: float) -> None:
+        if quantity <= 0:
+            if levels.pop(price, None) is not None:
+                index = bisect.bisect_left(keys, key)
+                if index < len(keys) and keys[index] == key:
+                    del keys[index]
+            return
+
+        if price not in levels:
+            bisect.insort(keys, key)
+        levels[price] = quantity
+
+    def _set_bid(self, price: float, quantity: float) -> None:
+        self._set_level(self.bids, self._bid_keys, price, price, quantity)
+
+    def _set_ask(self, price: float, quantity: float) -> None:
+        self._set_level(self.asks, self._ask_keys, price, -price, quantity)
+
+    def _trim(self) -> None:
+        # Diffs also touch levels far from the touch; drop the worst ones beyond max_levels
+        for levels, keys, sign in ((self.bids, self._bid_keys, 1), (self.asks, self._ask_keys, -1)):
+            excess = len(keys) - self.max_levels
+            if excess > 0:
+                for key in keys[:excess]:
+                    levels.pop(key * sign, None)
+                del keys[:excess]
+
+    def load_snapshot(self, bids: List[List[str]], asks: List[List[str]], last_update_id: int) -> None:
+        self.bids.clear()
+        self.asks.clear()
+        self._bid_keys.clear()
+        self._ask_keys.clear()
+        for price, quantity in bids:
+            self._set_bid(float(price), float(quantity))
+        for price, quantity in asks:
+            self._set_ask(float(price), float(quantity))
+        self._trim()
+        self.last_update_id = int(last_update_id)
+        self.synced = True
+        self.updated_at = time.time()
+
+    def apply_diff(self, bids: List[List[str]], asks: List[List[str]], final_update_id: int) -> None:
+        for price, quantity in bids:
+            self._set_bid(float(price), float(quantity))
+        for price, quantity in asks:
+            self._set_ask(float(price), float(quantity))
+        self._trim()
+        self.last_update_id = int(final_update_id)
+        self.updated_at = time.time()
+
+    def best_bid(self) -> Optional[Level]:
+        if not self._bid_keys:
+            return None
+        price = self._bid_keys[-1]
+        return price, self.bids[price]
+
+    def best_ask(self) -> Optional[Level]:
+        if not self._ask_keys:
+            return None
+        price = -self._ask_keys[-1]
+        return price, self.asks[price]
+
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if not bid or not ask:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if not bid or not ask:
+            return None
+        return ask[0] - bid[0]
+
+    def top_bids(self, depth: int) -> List[Level]:
+        return [(price, self.bids[price]) for price in reversed(self._bid_keys[-depth:])]
+
+    def top_asks(self, depth: int) -> List[Level]:
+        return [(-key, self.asks[-key]) for key in reversed(self._ask_keys[-depth:])]
+
+    def imbalance(self, depth: int = 10) -> Optional[float]:
+        """(bid qty - ask qty) / total over the top `depth` levels, in [-1, 1]."""
+        bid_quantity = sum(quantity for _, quantity in self.top_bids(depth))
+        ask_quantity = sum(quantity for _, quantity in self.top_asks(depth))
+        total = bid_quantity + ask_quantity
+        return (bid_quantity - ask_quantity) / total if total else None
+
+    def microprice(self) -> Optional[float]:
+        """Touch prices weighted by the opposite side's size; leans toward the thinner side."""
+        bid, ask = self.best_bid(), self.best_ask()
+        if not bid or not ask or bid[1] + ask[1] <= 0:
+            return None
+        return (bid[0] * ask[1] + ask[0] * bid[1]) / (bid[1] + ask[1])
+
+    def estimate_fill(self, side: str, quantity: float) -> Optional[Dict[str, Any]]:
+        """Walk the opposite side of the book for a market order of `quantity`."""
+        mid = self.mid_price()
+        if mid is None or quantity <= 0:
+            return None
+
+        if side.upper() == "BUY":
+            levels = ((-key, self.asks[-key]) for key in reversed(self._ask_keys))
+        else:
+            levels = ((key, self.bids[key]) for key in reversed(self._bid_keys))
+
+        remaining = quantity
+        notional = 0.0
+        worst_price = None
+        for price, available in levels:
+            take = min(remaining, available)
+            notional += take * price
+            remaining -= take
+            worst_price = price
+            if remaining <= 0:
+                break
+
+        filled = quantity - remaining
+        if filled <= 0:
+            return None
+
+        average_price = notional / filled
+        direction = 1 if side.upper() == "BUY" else -1
+        return {
+            "side": side.upper(),
+            "requested_quantity": quantity,
+            "filled_quantity": filled,
+            "fully_filled": remaining <= 0,
+            "average_price": average_price,
+            "worst_price": worst_price,
+            "mid_price": mid,
+            "slippage_bps": direction * (average_price - mid) / mid * 10_000,
+        }
+
+
+class OrderBookManager:
+    """Keeps one synced OrderBook per symbol from depth-diff events."""
+
+    def __init__(self) -> None:
+        self.snapshot_limit = int(os.getenv("ORDER_BOOK_SNAPSHOT_LIMIT", "1000"))
+        self.max_age_seconds = float(os.getenv("ORDER_BOOK_MAX_AGE_SECONDS", "10"))
+        self.resync_backoff_seconds = float(os.getenv("ORDER_BOOK_RESYNC_BACKOFF_SECONDS", "5"))
+        self.max_buffered_events = 1000
+        self.books: Dict[str, OrderBook] = {}
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._resyncing: Dict[str, asyncio.Task] = {}
+        self._next_resync_at: Dict[str, float] = {}
+        self.sequence_gaps = 0
+        self.resyncs = 0
+        self.last_error: Optional[str] = None
+
+    def _book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = OrderBook(symbol, max_levels=self.snapshot_limit)
+            self.books[symbol] = book
+        return book
+
+    def handle_depth_event(self, symbol: str, event: Dict[str, Any]) -> None:
+        """Apply one depthUpdate event (fields U, u, b, a), resyncing on sequence gaps."""
+        book = self._book(symbol)
+
+        if not book.synced:
+            self._buffer(symbol, event)
+            self._schedule_resync(symbol)
+            return
+
+        first_update_id, final_update_id = int(event["U"]), int(event["u"])
+        if final_update_id <= book.last_update_id:
+            return
+
+        if first_update_id != book.last_update_id + 1:
+            self.sequence_gaps += 1
+            logger.info(
+                "Order book %s sequence gap (expected %d, got %d); resyncing",
+                symbol, book.last_update_id + 1, first_update_id,
+            )
+            book.synced = False
+            self._buffer(symbol, event)
+            self._schedule_resync(symbol)
+            return
+
+        book.apply_diff(event.get("b") or [], event.get("a") or [], final_update_id)
+
+    def _buffer(self, symbol: str, event: Dict[str, Any]) -> None:
+        buffer = self._buffers.setdefault(symbol, [])
+        buffer.append(event)
+        if len(buffer) > self.max_buffered_events:
+            del buffer[: len(buffer) - self.max_buffered_events]
+
+    def _schedule_resync(self, symbol: str) -> None:
+        task = self._resyncing.get(symbol)
+        if task is not None and not task.done():
+            return
+        if time.time() < self._next_resync_at.get(symbol, 0.0):
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._resyncing[symbol] = loop.create_task(self._resync(symbol))
+
+    async def _resync(self, symbol: str) -> None:
+        self._next_resync_at[symbol] = time.time() + self.resync_backoff_seconds
+        snapshot = await binance_api.get_depth_async(f"{symbol}/USDT", limit=self.snapshot_limit)
+        if not snapshot:
+            self.last_error = f"{symbol}: depth snapshot unavailable"
+            return
+
+        book = self._book(symbol)
+        last_update_id = int(snapshot["lastUpdateId"])
+        buffered = [
+            event for event in self._buffers.pop(symbol, [])
+            if int(event["u"]) > last_update_id
+        ]
+
+        # The first diff applied must straddle the snapshot's update id
+        if buffered and int(buffered[0]["U"]) > last_update_id + 1:
+            self.last_error = f"{symbol}: snapshot older than buffered diffs"
+            self._buffers[symbol] = buffered
+            return
+
+        book.load_snapshot(snapshot.get("bids") or [], snapshot.get("asks") or [], last_update_id)
+        self.resyncs += 1
+        if buffered:
+            first = buffered[0]
+            book.apply_diff(first.get("b") or [], first.get("a") or [], int(first["u"]))
+        for event in buffered[1:]:
+            self.handle_depth_event(symbol, event)
+
+        logger.info("✓ Order book %s synced at update %d", symbol, book.last_update_id)
+
+    def get_book(self, symbol: str) -> Optional[OrderBook]:
+        """Return a synced book updated within max_age_seconds, or None."""
+        book = self.books.get(symbol.upper())
+        if not book or not book.synced or time.time() - book.updated_at > self.max_age_seconds:
+            return None
+        return book
+
+    def get_features(self, symbol: str, depth: int = 10) -> Optional[Dict[str, Any]]:
+        book = self.get_book(symbol)
+        if not book:
+            return None
+
+        bid, ask = book.best_bid(), book.best_ask()
+        mid, microprice = book.mid_price(), book.microprice()
+        if not bid or not ask or not mid:
+            return None
+
+        return {
+            "best_bid": bid[0],
+            "best_ask": ask[0],
+            "mid_price": mid,
+            "spread": ask[0] - bid[0],
+            "spread_bps": (ask[0] - bid[0]) / mid * 10_000,
+            "imbalance": book.imbalance(depth),
+            "microprice": microprice,
+            "microprice_premium_bps": (microprice - mid) / mid * 10_000 if microprice else 0.0,
+            "depth_levels": depth,
+            "age_seconds": round(time.time() - book.updated_at, 3),
+        }
+
+    def estimate_fill(self, symbol: str, side: str, quantity: float) -> Optional[Dict[str, Any]]:
+        book = self.get_book(symbol)
+        return book.estimate_fill(side, quantity) if book else None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "symbols": {
+                symbol: {
+                    "synced": book.synced,
+                    "live": self.get_book(symbol) is not None,
+                    "last_update_id": book.last_update_id,
+                    "bid_levels": len(book.bids),
+                    "ask_levels": len(book.asks),
+                }
+                for symbol, book in self.books.items()
+            },
+            "sequence_gaps": self.sequence_gaps,
+            "resyncs": self.resyncs,
+            "last_error": self.last_error,
+        }
+
+
+# Global instance
+order_books = OrderBookManager()
@@ -0,0 +1,123 @@
+"""
+Fixed-capacity price history ring buffer.
+
+Each symbol keeps its prices and timestamps in preallocated float64 arrays.
+Every slot is written twice (at i and i + capacity), so the ordered history
+is always one contiguous slice and readers get a zero-copy view instead of a
+fresh list on every tick. A StreamingIndicators engine rides along and is
+fed on every append, so the symbol's indicator vector is always current.
+`version` increases on every change, so derived results can be memoized
+against it.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from streaming_indicators import StreamingIndicators
+
+DEFAULT_PRICE_HISTORY_CAPACITY = 100
+
+
+def capacity_for_symbol(symbol: str, default: int = DEFAULT_PRICE_HISTORY_CAPACITY) -> int:
+    """Resolve history capacity from PRICE_HISTORY_CAPACITY_<SYMBOL> or PRICE_HISTORY_CAPACITY."""
+    raw_value = os.getenv(f"PRICE_HISTORY_CAPACITY_{symbol.upper()}") or os.getenv("PRICE_HISTORY_CAPACITY")
+    try:
+        capacity = int(raw_value) if raw_value else default
+    except ValueError:
+        capacity = default
+    return max(capacity, 2)
+
+
+class PriceRingBuffer:
+    """Per-symbol price history with O(1) appends and zero-copy ordered views."""
+
+    def __init__(self, capacity: int = DEFAULT_PRICE_HISTORY_CAPACITY) -> None:
+        self.capacity = int(capacity)
+        self._prices = np.zeros(self.capacity * 2, dtype=np.float64)
+        self._timestamps = np.zeros(self.capacity * 2, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+        self.indicators = StreamingIndicators()
+        # Bumped on every append and clear; never reused, even across replace()
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.values())
+
+    def __getitem__(self, key):
+        return self.values()[key]
+
+    def __repr__(self) -> str:
+        return f"PriceRingBuffer(capacity={self.capacity}, size={self._size})"
+
+    @staticmethod
+    def _readonly(view: np.ndarray) -> np.ndarray:
+        view.flags.writeable = False
+        return view
+
+    def values(self) -> np.ndarray:
+        """Ordered prices, oldest first, as a read-only view into the buffer.
+
+        The view is only valid until the next append: once the buffer is full,
+        append overwrites the slot holding the oldest price. Copy it before
+        handing it to another thread or holding it across an await.
+        """
+        return self._readonly(self._prices[self._start:self._start + self._size])
+
+    def timestamps(self) -> np.ndarray:
+        """Ordered unix timestamps aligned with values(); valid until the next append, like values()."""
+        return self._readonly(self._timestamps[self._start:self._start + self._size])
+
+    @property
+    def last(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return float(self._prices[self._start + self._size - 1])
+
+    def append(self, price: float, timestamp: Optional[float] = None) -> None:
+        timestamp = time.time() if timestamp is None else timestamp
+
+        if self._size < self.capacity:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._prices[slot] = self._prices[slot + self.capacity] = price
+        self._timestamps[slot] = self._timestamps[slot + self.capacity] = timestamp
+        self.indicators.update(price)
+        self.version += 1
+
+    def extend(self, prices: Iterable[float], timestamps: Optional[Iterable[float]] = None) -> None:
+        prices = np.asarray(list(prices) if not isinstance(prices, np.ndarray) else prices, dtype=np.float64)
+        if timestamps is None:
+            # Space synthetic timestamps one second apart, ending now
+            timestamps = time.time() - np.arange(len(prices) - 1, -1, -1, dtype=np.float64)
+        else:
+            timestamps = np.asarray(list(timestamps), dtype=np.float64)
+
+        for price, timestamp in zip(prices[-self.capacity:], timestamps[-self.capacity:]):
+            self.append(price, timestamp)
+
+    def replace(self, prices: Iterable[float], timestamps: Optional[Iterable[float]] = None) -> None:
+        """Drop the current history and load a new series."""
+        self.clear()
+        self.extend(prices, timestamps)
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+        self.indicators.reset()
+        self.version += 1
+
+    def to_list(self) -> list:
+        return self.values().tolist()
@@ -9,7 +9,9 @@ from __future__ import annotations
 
 import os
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from circuit_breaker import get_breaker_states
 
 
 def _has_env(name: str) -> bool:
@@ -23,13 +25,16 @@ def _env_flag(name: str, default: bool = False) -> bool:
     return raw_value.strip().lower() in {"1", "true", "yes", "on"}
 
 
-def _provider_status(configured: bool, status: str, role: str, notes: str) -> Dict:
-    return {
+def _provider_status(configured: bool, status: str, role: str, notes: str, circuit: Optional[Dict] = None) -> Dict:
+    provider = {
         "configured": configured,
         "status": status,
         "role": role,
         "notes": notes,
     }
+    if circuit is not None:
+        provider["circuit"] = circuit
+    return provider
 
 
 def get_provider_registry() -> Dict:
@@ -43,6 +48,7 @@ def get_provider_registry() -> Dict:
     )
     graph_ready = _has_env("THE_GRAPH_URL")
     explorer_ready = _has_env("ETHERSCAN_API_KEY") or _has_env("POLYGONSCAN_API_KEY")
+    circuit_breakers = get_breaker_states()
 
     return {
         "generated_at": datetime.now(timezone.utc).isoformat(),
@@ -56,7 +62,7 @@ def get_provider_registry() -> Dict:
                 "label": "Harga BTC/ETH",
                 "status": "active",
                 "target_providers": ["Binance", "CoinGecko"],
-                "current_runtime": ["Binance", "CoinGecko overlay"],
+                "current_runtime": ["Binance WebSocket stream", "Binance REST fallback", "CoinGecko overlay"],
                 "backend_paths": ["/api/market/prices"],
                 "notes": "Live market prices are served from Binance, while CoinGecko remains available for enrichment and fallback logic.",
             },
@@ -124,18 +130,21 @@ def get_provider_registry() -> Dict:
                 "notes": "SSI participation is now modeled in the backend as a truthful preview layer driven by holdings and execution activity, while direct SSI contract settlement is still pending.",
             },
         ],
+        "circuit_breakers": circuit_breakers,
         "providers": {
             "binance": _provider_status(
                 configured=True,
                 status="active",
                 role="Spot prices and candle data",
                 notes="Primary live market data provider.",
+                circuit=circuit_breakers.get("binance"),
             ),
             "coingecko": _provider_status(
                 configured=True,
                 status="active",
                 role="Market overlays and sentiment enrichment",
                 notes="Already used by enhanced prediction and global market context endpoints.",
+                circuit=circuit_breakers.get("coingecko"),
             ),
             "openrouter": _provider_status(
                 configured=openrouter_ready,
@@ -166,6 +175,7 @@ def get_provider_registry() -> Dict:
                 status="partial" if not sodex_ready else "active",
                 role="External trade execution and fill history",
                 notes="Browser-signed execution and account history are wired. Add SoDEX credentials to enable live routing in this environment.",
+                circuit=circuit_breakers.get("sodex"),
             ),
             "ssi": _provider_status(
                 configured=ssi_enabled,
@@ -190,6 +200,7 @@ def get_provider_registry() -> Dict:
                 status="active" if sosovalue_ready else "optional_fallback",
                 role="Current research and catalyst context",
                 notes="Still used as research context and a transition-layer fallback while the app shifts app-level news sentiment toward CryptoPanic.",
+                circuit=circuit_breakers.get("sosovalue"),
             ),
         },
     }
@@ -0,0 +1,228 @@
+"""
+Token-bucket rate limiter with priority lanes and bounded wait queues.
+
+Tokens refill continuously at `rate` per second up to `capacity`. A caller
+that finds a token (and no waiter of equal or higher priority ahead of it)
+proceeds immediately; lower lanes may be required to leave a few tokens in
+reserve so a burst of background traffic cannot drain the bucket. Otherwise
+the caller queues in its priority lane and is woken as tokens refill,
+highest priority first. When its lane is full, or no token
+can arrive within its `max_wait`, it is refused right away so the caller can
+serve a cached or fallback payload instead of queueing behind slow traffic.
+
+Async callers wait on the event loop; sync callers running in worker threads
+sleep in their own thread, and sync callers on the event loop thread never
+wait at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+
+class PriorityTokenBucket:
+    """Shared request budget where lower lane numbers are served first."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        capacity: float,
+        max_waiters: Sequence[int],
+        max_wait: Sequence[float],
+        reserve: Optional[Sequence[float]] = None,
+    ) -> None:
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.max_waiters = list(max_waiters)
+        self.max_wait = list(max_wait)
+        # Tokens a lane must leave in the bucket for the lanes above it
+        self.reserve = list(reserve) if reserve is not None else [0.0] * len(self.max_waiters)
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        # One FIFO of (future, loop) per lane
+        self._lanes: List[Deque[Tuple[asyncio.Future, asyncio.AbstractEventLoop]]] = [
+            deque() for _ in self.max_waiters
+        ]
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._wakeup_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.granted = [0] * len(self.max_waiters)
+        self.waited = [0] * len(self.max_waiters)
+        self.rejected_full = [0] * len(self.max_waiters)
+        self.rejected_timeout = [0] * len(self.max_waiters)
+
+    def _lane(self, priority: int) -> int:
+        return min(max(int(priority), 0), len(self._lanes) - 1)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _queued_ahead(self, lane: int) -> int:
+        return sum(len(self._lanes[index]) for index in range(lane + 1))
+
+    def _time_until_token(self, lane: int, queued_ahead: int) -> float:
+        """Seconds until a token is left over for a caller behind `queued_ahead` waiters."""
+        missing = queued_ahead + 1 + self.reserve[lane] - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def _try_take(self, lane: int) -> bool:
+        self._refill()
+        if self.tokens >= 1 + self.reserve[lane] and not self._queued_ahead(lane):
+            self.tokens -= 1
+            self.granted[lane] += 1
+            return True
+        return False
+
+    async def acquire(self, priority: int = 0, max_wait: Optional[float] = None) -> bool:
+        """Wait for a token in `priority`'s lane; False when refused or timed out."""
+        lane = self._lane(priority)
+        max_wait = self.max_wait[lane] if max_wait is None else max_wait
+
+        with self._lock:
+            if self._try_take(lane):
+                return True
+            if len(self._lanes[lane]) >= self.max_waiters[lane]:
+                self.rejected_full[lane] += 1
+                return False
+            if self._time_until_token(lane, self._queued_ahead(lane)) > max_wait:
+                self.rejected_timeout[lane] += 1
+                return False
+
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._lanes[lane].append((future, loop))
+            self.waited[lane] += 1
+            self._schedule_dispatch(loop)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=max_wait)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if future.done() and not future.cancelled():
+                    # Granted at the deadline; keep the token
+                    return True
+                future.cancel()
+                self._discard(lane, future)
+                self.rejected_timeout[lane] += 1
+            return False
+        except asyncio.CancelledError:
+            with self._lock:
+                if future.done() and not future.cancelled():
+                    # Hand the unused token back
+                    self.tokens = min(self.capacity, self.tokens + 1)
+                    self.granted[lane] -= 1
+                future.cancel()
+                self._discard(lane, future)
+            raise
+
+    def acquire_sync(self, priority: int = 0, max_wait: Optional[float] = None) -> bool:
+        """Blocking acquire for worker threads; fails fast on an event loop thread."""
+        lane = self._lane(priority)
+        max_wait = self.max_wait[lane] if max_wait is None else max_wait
+        try:
+            asyncio.get_running_loop()
+            can_wait = False
+        except RuntimeError:
+            can_wait = True
+
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                if self._try_take(lane):
+                    return True
+                wait = self._time_until_token(lane, self._queued_ahead(lane))
+
+            remaining = deadline - time.monotonic()
+            if not can_wait or wait > remaining:
+                with self._lock:
+                    self.rejected_timeout[lane] += 1
+                return False
+            time.sleep(max(wait, 0.01))
+
+    def _discard(self, lane: int, future: asyncio.Future) -> None:
+        self._lanes[lane] = deque(entry for entry in self._lanes[lane] if entry[0] is not future)
+
+    def _schedule_dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        delay = self._time_until_token(0, 0)
+        if self._wakeup is not None and self._wakeup_loop is loop and not loop.is_closed():
+            # Keep the pending timer unless this waiter could be served sooner
+            if self._wakeup.when() <= loop.time() + delay:
+                return
+            self._wakeup.cancel()
+        self._schedule_wakeup(loop, delay)
+
+    def _schedule_wakeup(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        self._wakeup = loop.call_later(delay, self._dispatch)
+        self._wakeup_loop = loop
+
+    def _dispatch(self) -> None:
+        """Hand refilled tokens to queued waiters, highest lane first."""
+        with self._lock:
+            self._wakeup = None
+            self._refill()
+            for index, lane in enumerate(self._lanes):
+                while lane and lane[0][0].done():
+                    lane.popleft()
+                if not lane:
+                    continue
+
+                if self.tokens < 1 + self.reserve[index]:
+                    # Lower lanes keep waiting behind this one
+                    self._schedule_wakeup(lane[0][1], self._time_until_token(index, 0))
+                    return
+
+                while lane and self.tokens >= 1 + self.reserve[index]:
+                    future, loop = lane.popleft()
+                    if future.done():
+                        continue
+                    self.tokens -= 1
+                    self.granted[index] += 1
+                    self._grant(future, loop)
+
+                if lane:
+                    self._schedule_wakeup(lane[0][1], self._time_until_token(index, 0))
+                    return
+
+    @staticmethod
+    def _grant(future: asyncio.Future, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+
+        if on_loop:
+            future.set_result(True)
+        else:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(True))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill()
+            return {
+                "name": self.name,
+                "rate_per_second": self.rate,
+                "capacity": self.capacity,
+                "tokens": round(self.tokens, 3),
+                "lanes": [
+                    {
+                        "priority": index,
+                        "queued": len(lane),
+                        "max_waiters": self.max_waiters[index],
+                        "max_wait_seconds": self.max_wait[index],
+                        "reserve": self.reserve[index],
+                        "granted": self.granted[index],
+                        "waited": self.waited[index],
+                        "rejected_full": self.rejected_full[index],
+                        "rejected_timeout": self.rejected_timeout[index],
+                    }
+                    for index, lane in enumerate(self._lanes)
+                ],
+            }
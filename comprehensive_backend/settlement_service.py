@@ -10,6 +10,8 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 
+from circuit_breaker import get_breaker
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -51,6 +53,8 @@ class SettlementService:
                     pass
 
                 if w3.is_connected():
+                    # Both Amoy services share one breaker so a failing RPC stops all callers
+                    w3.provider.make_request = get_breaker("polygon_amoy").wrap(w3.provider.make_request)
                     self.w3 = w3
                     self.contract = w3.eth.contract(
                         address=Web3.to_checksum_address(self.contract_address),
@@ -0,0 +1,58 @@
+"""
+Single-flight request coalescing.
+
+When a cache entry expires under load, every concurrent request would
+otherwise repeat the same upstream fan-out. SingleFlight runs the work once
+per key: the first caller starts it and everyone who arrives while it is in
+flight awaits the same result (or exception).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesce concurrent async computations that share a key."""
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Return func(*args, **kwargs), sharing one in-flight call per key."""
+        task = self._in_flight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Joining in-flight computation for %s", key)
+
+        # Shield so one caller disconnecting does not cancel the work for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every waiter went away
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": sorted(self._in_flight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+
+# Global instance
+single_flight = SingleFlight()
@@ -18,6 +18,9 @@ from eth_account import Account
 from eth_account.messages import encode_typed_data
 from web3 import Web3
 
+from circuit_breaker import get_breaker
+from http_client import http_transport
+
 logger = logging.getLogger(__name__)
 
 SODEX_MAINNET_CHAIN_ID = 286623
@@ -63,13 +66,14 @@ class SoDEXService:
         self.api_secret = os.getenv("SODEX_API_SECRET", "").strip()
         self.account_id = os.getenv("SODEX_ACCOUNT_ID", "").strip()
         self.timeout_seconds = float(os.getenv("SODEX_TIMEOUT_SECONDS", "12"))
-        self.session = requests.Session()
+        self.session = http_transport.sync_session()
         self.session.headers.update(
             {
                 "Accept": "application/json",
                 "User-Agent": "AI-Power-Trade/1.0",
             }
         )
+        self.breaker = get_breaker("sodex")
 
     def is_available(self) -> bool:
         return bool(self.base_url)
@@ -402,11 +406,27 @@ class SoDEXService:
             "execution_engine": execution_engine,
         }
 
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a gateway request through the SoDEX circuit breaker"""
+        self.breaker.check()
+        try:
+            response = self.session.request(method=method, url=url, **kwargs)
+        except requests.exceptions.RequestException as exc:
+            self.breaker.record_failure(f"{type(exc).__name__}: {exc}")
+            raise
+
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            self.breaker.record_success()
+        return response
+
     def _request(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         if not self.is_available():
             raise RuntimeError("SODEX_API_URL is not configured")
 
-        response = self.session.get(
+        response = self._send(
+            "GET",
             f"{self.base_url}{path}",
             params=params or {},
             timeout=self.timeout_seconds,
@@ -445,9 +465,9 @@ class SoDEXService:
         if resolved_api_key:
             headers["X-API-Key"] = resolved_api_key
 
-        response = self.session.request(
-            method=method.upper(),
-            url=f"{self.base_url}{path}",
+        response = self._send(
+            method.upper(),
+            f"{self.base_url}{path}",
             json=body,
             headers=headers,
             timeout=self.timeout_seconds,
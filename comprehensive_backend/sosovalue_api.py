@@ -12,6 +12,8 @@ from typing import Any, Dict, List, Optional
 import requests
 from dotenv import load_dotenv
 
+from circuit_breaker import get_breaker
+from http_client import http_transport
 from sosovalue_cache import TTLCache
 
 load_dotenv()
@@ -43,7 +45,8 @@ class SoSoValueAPI:
         }
         self.timeout_seconds = int(os.getenv("SOSO_TIMEOUT_SECONDS", "15"))
         self.cache = TTLCache()
-        self.session = requests.Session()
+        self.breaker = get_breaker("sosovalue")
+        self.session = http_transport.sync_session()
         self.session.headers.update(
             {
                 "Accept": "application/json",
@@ -121,6 +124,9 @@ class SoSoValueAPI:
 
         url = f"{self.base_url}{endpoint}"
 
+        if not self.breaker.allow_request():
+            raise SoSoValueAPIError("SoSoValue is temporarily unavailable (circuit open)", status_code=503)
+
         try:
             response = self.session.request(
                 method=method.upper(),
@@ -130,8 +136,14 @@ class SoSoValueAPI:
                 timeout=self.timeout_seconds,
             )
         except requests.exceptions.RequestException as exc:
+            self.breaker.record_failure(f"{type(exc).__name__}: {exc}")
             raise SoSoValueAPIError(f"SoSoValue request failed: {exc}") from exc
 
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            self.breaker.record_success()
+
         if response.status_code == 401:
             raise SoSoValueAPIError("SoSoValue authentication failed", status_code=401)
         if response.status_code == 403:
@@ -0,0 +1,241 @@
+"""
+Streaming technical indicators updated in O(1) per tick.
+
+`StreamingIndicators` folds each new price into running state instead of
+recomputing from the full history:
+
+* Wilder RSI: seeded with the simple average of the first `rsi_period`
+  gains/losses, then smoothed as avg = (avg * (n - 1) + x) / n.
+* EMA-12/26: the running mean until `period` prices have arrived (so the
+  seed is their SMA), then the usual recursive update. MACD is their
+  difference, with a 9-period EMA signal line over it.
+* Rolling mean/variance over the 5- and 20-price windows with Welford's
+  update, removing the value that slides out of the window. Each window is
+  re-derived exactly once per window length so rounding cannot accumulate.
+* Rolling min/max over the same windows with monotonic deques.
+
+The indicator vector is built lazily on the first read after a tick and
+cached, so reading it repeatedly costs nothing however long the series gets.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+# Keys of StreamingIndicators.snapshot(), in order; the column order of indicator matrices
+INDICATOR_COLUMNS = (
+    "rsi", "ma_5", "ma_20", "ema_12", "ema_26", "macd", "macd_signal", "macd_histogram",
+    "bb_upper", "bb_middle", "bb_lower", "std_20", "volatility", "high_20", "low_20", "current_price",
+)
+
+
+class RollingWindow:
+    """Mean, variance, min and max of the last `size` values."""
+
+    def __init__(self, size: int) -> None:
+        self.size = int(size)
+        self.values: Deque[float] = deque()
+        self.mean = 0.0
+        self._m2 = 0.0
+        # (index, value) pairs; values increasing for _lows, decreasing for _highs
+        self._lows: Deque[Tuple[int, float]] = deque()
+        self._highs: Deque[Tuple[int, float]] = deque()
+        self._index = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) >= self.size
+
+    def push(self, value: float) -> None:
+        if self.full:
+            old = self.values.popleft()
+            old_mean = self.mean
+            self.mean += (value - old) / self.size
+            self._m2 += (value - old) * (value - self.mean + old - old_mean)
+        else:
+            delta = value - self.mean
+            self.mean += delta / (len(self.values) + 1)
+            self._m2 += delta * (value - self.mean)
+        self.values.append(value)
+        # Guard against tiny negative values from floating-point cancellation
+        self._m2 = max(self._m2, 0.0)
+
+        if self._index % self.size == self.size - 1:
+            # Re-derive from the window once per `size` pushes (amortized O(1))
+            # so add/remove rounding cannot accumulate over a long stream
+            self.mean = math.fsum(self.values) / len(self.values)
+            self._m2 = math.fsum((item - self.mean) ** 2 for item in self.values)
+
+        index = self._index
+        self._index += 1
+        while self._lows and self._lows[-1][1] >= value:
+            self._lows.pop()
+        self._lows.append((index, value))
+        while self._highs and self._highs[-1][1] <= value:
+            self._highs.pop()
+        self._highs.append((index, value))
+
+        oldest = index - self.size
+        if self._lows[0][0] <= oldest:
+            self._lows.popleft()
+        if self._highs[0][0] <= oldest:
+            self._highs.popleft()
+
+    @property
+    def variance(self) -> float:
+        """Population variance, matching np.var."""
+        if not self.values or self.high == self.low:
+            # A flat window is exactly 0; the running update leaves rounding noise there
+            return 0.0
+        return self._m2 / len(self.values)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def low(self) -> Optional[float]:
+        return self._lows[0][1] if self._lows else None
+
+    @property
+    def high(self) -> Optional[float]:
+        return self._highs[0][1] if self._highs else None
+
+
+class StreamingEMA:
+    """EMA seeded with the SMA of its first `period` values."""
+
+    def __init__(self, period: int) -> None:
+        self.period = int(period)
+        self.alpha = 2 / (self.period + 1)
+        self.count = 0
+        self.value = 0.0
+
+    def push(self, value: float) -> float:
+        self.count += 1
+        if self.count <= self.period:
+            # Running mean until the seed window is complete
+            self.value += (value - self.value) / self.count
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class StreamingIndicators:
+    """Incrementally maintained RSI, EMA/MACD, moving averages and Bollinger Bands."""
+
+    def __init__(
+        self,
+        rsi_period: int = 14,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        short_window: int = 5,
+        long_window: int = 20,
+        band_width: float = 2.0,
+    ) -> None:
+        self.rsi_period = int(rsi_period)
+        self.fast_period = int(fast_period)
+        self.slow_period = int(slow_period)
+        self.signal_period = int(signal_period)
+        self.short_window = int(short_window)
+        self.long_window = int(long_window)
+        self.band_width = float(band_width)
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.last_price: Optional[float] = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self._deltas = 0
+        self.ema_fast = StreamingEMA(self.fast_period)
+        self.ema_slow = StreamingEMA(self.slow_period)
+        self.macd_signal = StreamingEMA(self.signal_period)
+        self.short = RollingWindow(self.short_window)
+        self.long = RollingWindow(self.long_window)
+        self._snapshot: Optional[Dict[str, float]] = None
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[float], **kwargs: Any) -> "StreamingIndicators":
+        """Engine fed with a whole series, for callers that only have an array."""
+        engine = cls(**kwargs)
+        engine.extend(prices)
+        return engine
+
+    def extend(self, prices: Iterable[float]) -> "StreamingIndicators":
+        for price in prices:
+            self.update(price)
+        return self
+
+    def update(self, price: float) -> None:
+        price = float(price)
+        if self.last_price is not None:
+            change = price - self.last_price
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            self._deltas += 1
+            if self._deltas <= self.rsi_period:
+                # Simple average over the first period, then Wilder smoothing
+                self.avg_gain += (gain - self.avg_gain) / self._deltas
+                self.avg_loss += (loss - self.avg_loss) / self._deltas
+            else:
+                self.avg_gain += (gain - self.avg_gain) / self.rsi_period
+                self.avg_loss += (loss - self.avg_loss) / self.rsi_period
+
+        self.count += 1
+        self.last_price = price
+        self.ema_fast.push(price)
+        self.ema_slow.push(price)
+        self.macd_signal.push(self.ema_fast.value - self.ema_slow.value)
+        self.short.push(price)
+        self.long.push(price)
+        self._snapshot = None
+
+    @property
+    def ready(self) -> bool:
+        return self.long.full and self._deltas >= self.rsi_period
+
+    @property
+    def rsi(self) -> float:
+        """Wilder RSI; 50 until a full period of changes (or on a flat series)."""
+        if self._deltas < self.rsi_period or (self.avg_gain == 0 and self.avg_loss == 0):
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+    @property
+    def macd(self) -> float:
+        return self.ema_fast.value - self.ema_slow.value
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current indicator vector, or {} until the long window has filled."""
+        if not self.ready:
+            return {}
+        if self._snapshot is None:
+            mean, std = self.long.mean, self.long.std
+            macd = self.macd
+            self._snapshot = {
+                "rsi": self.rsi,
+                "ma_5": self.short.mean,
+                "ma_20": mean,
+                "ema_12": self.ema_fast.value,
+                "ema_26": self.ema_slow.value,
+                "macd": macd,
+                "macd_signal": self.macd_signal.value,
+                "macd_histogram": macd - self.macd_signal.value,
+                "bb_upper": mean + self.band_width * std,
+                "bb_middle": mean,
+                "bb_lower": mean - self.band_width * std,
+                "std_20": std,
+                "volatility": std / mean if mean != 0 else 0.0,
+                "high_20": self.long.high,
+                "low_20": self.long.low,
+                "current_price": self.last_price,
+            }
+        return dict(self._snapshot)
@@ -0,0 +1,122 @@
+"""
+Stale-while-revalidate cache for hot API responses.
+
+An entry is fresh for `ttl` seconds. After that, and for up to `max_stale`
+more seconds, it is still served immediately while one background task
+recomputes it; only entries past the hard staleness limit (or missing) make
+the caller wait for a rebuild. Rebuilds go through single_flight, so a
+background refresh and a blocking miss for the same key never run twice.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class SWRCache:
+    """Keyed response cache with a freshness TTL and a hard max-staleness."""
+
+    def __init__(self, name: str, ttl: float, max_stale: float) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_stale = max_stale
+        # key -> (value, stored_at)
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._refreshing: Set[str] = set()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def lookup(self, key: str) -> Tuple[Any, str]:
+        """Return (value, FRESH | STALE | MISS); MISS entries are past max-staleness."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, MISS
+
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age < self.ttl:
+            self.fresh_hits += 1
+            return value, FRESH
+        if age < self.ttl + self.max_stale:
+            self.stale_hits += 1
+            return value, STALE
+
+        self.misses += 1
+        return None, MISS
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Return the stored value regardless of age, e.g. as a last-known fallback."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else default
+
+    def age(self, key: str) -> Optional[float]:
+        entry = self._entries.get(key)
+        return time.time() - entry[1] if entry is not None else None
+
+    def needs_refresh(self, key: str, within: float = 0.0) -> bool:
+        """True if the entry is missing or stops being fresh in the next `within` seconds."""
+        age = self.age(key)
+        return age is None or age >= self.ttl - within
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> Any:
+        self._entries[key] = (value, time.time() if stored_at is None else stored_at)
+        return value
+
+    def _flight_key(self, key: str) -> str:
+        return f"swr:{self.name}:{key}"
+
+    async def compute(self, key: str, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Rebuild an entry in the foreground, sharing any refresh already in flight."""
+        return await single_flight.do(self._flight_key(key), func, *args)
+
+    def refresh_in_background(self, key: str, func: Callable[..., Awaitable[Any]], *args: Any) -> bool:
+        """Schedule a rebuild without waiting for it; False if no event loop is running."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+        if key in self._refreshing:
+            return True
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                await self.compute(key, func, *args)
+                self.refreshes += 1
+            except Exception as e:
+                self.refresh_failures += 1
+                logger.warning("Background refresh of %s[%s] failed: %s", self.name, key, e)
+            finally:
+                self._refreshing.discard(key)
+
+        loop.create_task(refresh())
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "max_stale_seconds": self.max_stale,
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "background_refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
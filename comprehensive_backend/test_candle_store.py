@@ -0,0 +1,89 @@
+"""Tests for the SQLite candle store (run with pytest; no network needed)."""
+
+import os
+import tempfile
+import time
+
+import candle_store
+from candle_store import BASE_INTERVAL, INTERVAL_MS, CandleStore
+
+
+def fake_fetcher(calls=None):
+    """Kline fetcher that serves a flat synthetic series for any requested range."""
+
+    def fetch(symbol, interval, start_time, end_time, limit):
+        if calls is not None:
+            calls.append((symbol, interval, start_time, end_time))
+        step_ms = INTERVAL_MS[interval]
+        first = (start_time + step_ms - 1) // step_ms * step_ms
+        return [
+            {"timestamp": open_time, "open": 100.0, "high": 101.0, "low": 99.0, "close": 100.0, "volume": 1.0}
+            for open_time in range(first, end_time + 1, step_ms)
+        ][:limit]
+
+    return fetch
+
+
+def make_store(tmp_path, calls=None):
+    store = CandleStore(path=str(tmp_path / "candles.db"), fetch_klines=fake_fetcher(calls))
+    store.refresh_seconds = 60
+    return store
+
+
+def test_sync_throttle_does_not_truncate_a_longer_window(tmp_path):
+    store = make_store(tmp_path)
+
+    assert len(store.get_recent("SOL", "1h", 24)) == 24
+    assert len(store.get_recent("SOL", "1h", 48)) == 48
+    assert len(store.get_recent("SOL", BASE_INTERVAL, 30)) == 30
+    assert len(store.get_recent("SOL", BASE_INTERVAL, 90)) == 90
+
+
+def test_sync_throttle_skips_a_window_already_covered(tmp_path):
+    calls = []
+    store = make_store(tmp_path, calls)
+
+    store.sync("SOL", BASE_INTERVAL, 90)
+    fetched = len(calls)
+    store.sync("SOL", BASE_INTERVAL, 30)
+    assert len(calls) == fetched
+
+
+def test_stale_live_bar_is_ignored(tmp_path):
+    store = make_store(tmp_path)
+    expected = store.get_recent("BTC", "1h", 5)
+
+    base_step_ms = INTERVAL_MS[BASE_INTERVAL]
+    stale_open = (int(time.time() * 1000) // base_step_ms - 180) * base_step_ms
+    store.record_live_kline(
+        "BTC",
+        {"timestamp": stale_open, "open": 90.0, "high": 500.0, "low": 1.0, "close": 90.0, "volume": 1000.0},
+        is_closed=False,
+    )
+
+    assert store.get_recent("BTC", "1h", 5) == expected
+    assert store.get_recent("BTC", BASE_INTERVAL, 5)[-1]["volume"] == 1.0
+    assert "BTC" not in store._live_bars
+
+
+def test_current_live_bar_is_folded_in_until_disconnect(tmp_path):
+    store = make_store(tmp_path)
+    base_step_ms = INTERVAL_MS[BASE_INTERVAL]
+    current_open = int(time.time() * 1000) // base_step_ms * base_step_ms
+    store.record_live_kline(
+        "BTC",
+        {"timestamp": current_open, "open": 100.0, "high": 150.0, "low": 99.0, "close": 120.0, "volume": 3.0},
+        is_closed=False,
+    )
+
+    assert store.get_recent("BTC", "1h", 5)[-1]["high"] == 150.0
+
+    store.clear_live_bars()
+    assert store.get_recent("BTC", "1h", 5)[-1]["high"] == 101.0
+
+
+def test_default_path_moves_to_temp_dir_when_package_is_read_only(monkeypatch):
+    monkeypatch.delenv("CANDLE_STORE_PATH", raising=False)
+    monkeypatch.setattr(candle_store.os, "access", lambda path, mode: False)
+
+    assert CandleStore().path == os.path.join(tempfile.gettempdir(), "candles.db")
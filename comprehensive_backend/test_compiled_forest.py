@@ -0,0 +1,66 @@
+"""CompiledForest must route and score rows as the sklearn forest it was built from."""
+
+import numpy as np
+import pytest
+
+sklearn = pytest.importorskip("sklearn")
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from compiled_forest import CompiledForest
+
+# Summation order differs from sklearn's by a few ulps at most
+TOLERANCE = 1e-12
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(7)
+    # Features on very different scales and offsets, so the folded scaler matters
+    X = rng.normal(size=(600, 7)) * [1, 50, 0.01, 3, 1e4, 0.5, 200] + [50, 0, 1, -20, 3e4, 0, 1e3]
+    score = X[:, 0] + X[:, 1] / 50 - X[:, 3] / 3 + rng.normal(scale=0.5, size=len(X))
+    y = (score > np.median(score)).astype(int)
+
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=30, max_depth=8, min_samples_split=5, random_state=0)
+    model.fit(scaler.transform(X), y)
+    return model, scaler, X, rng
+
+
+def test_predict_proba_matches_sklearn(fitted):
+    model, scaler, X, rng = fitted
+    compiled = CompiledForest.from_sklearn(model, scaler)
+
+    rows = np.vstack([X, X.mean(axis=0) + rng.normal(size=(400, X.shape[1])) * X.std(axis=0) * 2])
+    expected = model.predict_proba(scaler.transform(rows))
+    np.testing.assert_allclose(compiled.predict_proba(rows), expected, rtol=0, atol=TOLERANCE)
+
+
+def test_rows_on_split_thresholds_route_like_sklearn(fitted):
+    model, scaler, X, _ = fitted
+    compiled = CompiledForest.from_sklearn(model, scaler)
+
+    # Raw values that scale exactly onto (or within a rounding step of) each split threshold
+    rows = []
+    for estimator in model.estimators_[:5]:
+        tree = estimator.tree_
+        for node in np.flatnonzero(tree.children_left >= 0):
+            feature = tree.feature[node]
+            raw = tree.threshold[node] * scaler.scale_[feature] + scaler.mean_[feature]
+            for value in (np.nextafter(raw, -np.inf), raw, np.nextafter(raw, np.inf)):
+                row = X.mean(axis=0).copy()
+                row[feature] = value
+                rows.append(row)
+    rows = np.asarray(rows)
+
+    expected = model.predict_proba(scaler.transform(rows))
+    np.testing.assert_allclose(compiled.predict_proba(rows), expected, rtol=0, atol=TOLERANCE)
+
+
+def test_predict_matches_sklearn_away_from_ties(fitted):
+    model, scaler, X, _ = fitted
+    compiled = CompiledForest.from_sklearn(model, scaler)
+
+    proba = model.predict_proba(scaler.transform(X))
+    clear = np.abs(proba[:, 1] - proba[:, 0]) > TOLERANCE
+    np.testing.assert_array_equal(compiled.predict(X)[clear], model.predict(scaler.transform(X))[clear])
@@ -0,0 +1,68 @@
+"""Streaming and vectorized indicators must agree with each other and with direct formulas."""
+
+import numpy as np
+import pytest
+
+import indicator_series
+from indicator_series import indicator_series as compute_series
+from streaming_indicators import INDICATOR_COLUMNS, StreamingIndicators
+
+# Rolling high/low and the price itself are not series columns
+COLUMNS = [column for column in INDICATOR_COLUMNS if column not in ("high_20", "low_20", "current_price")]
+
+
+def random_walk(length, seed=3, start=30_000.0):
+    rng = np.random.default_rng(seed)
+    prices = start * np.exp(np.cumsum(rng.normal(scale=0.002, size=length)))
+    # A flat stretch exercises the RSI special cases and tiny variances
+    prices[length // 2:length // 2 + 40] = prices[length // 2]
+    return prices
+
+
+def assert_series_match_streaming(prices):
+    series = compute_series(prices)
+    engine = StreamingIndicators()
+    checked = 0
+    for index, price in enumerate(prices):
+        engine.update(price)
+        snapshot = engine.snapshot()
+        if not snapshot:
+            continue
+        for column in COLUMNS:
+            assert series[column][index] == pytest.approx(snapshot[column], rel=1e-9, abs=1e-9), (column, index)
+        checked += 1
+    assert checked == len(prices) - 19
+
+
+def test_indicator_series_matches_streaming():
+    assert_series_match_streaming(random_walk(1500))
+
+
+def test_indicator_series_numpy_fallback_matches_streaming(monkeypatch):
+    monkeypatch.setattr(indicator_series, "lfilter", None)
+    assert_series_match_streaming(random_walk(1500, seed=5))
+
+
+def test_streaming_matches_direct_formulas():
+    prices = random_walk(5000, seed=11)
+    snapshot = StreamingIndicators.from_prices(prices).snapshot()
+
+    window = prices[-20:]
+    assert snapshot["ma_5"] == pytest.approx(prices[-5:].mean(), rel=1e-12)
+    assert snapshot["ma_20"] == pytest.approx(window.mean(), rel=1e-12)
+    assert snapshot["std_20"] == pytest.approx(window.std(), rel=1e-9)
+    assert snapshot["high_20"] == window.max()
+    assert snapshot["low_20"] == window.min()
+
+    changes = np.diff(prices)
+    gains, losses = np.maximum(changes, 0), np.maximum(-changes, 0)
+    avg_gain, avg_loss = gains[:14].mean(), losses[:14].mean()
+    for gain, loss in zip(gains[14:], losses[14:]):
+        avg_gain = (avg_gain * 13 + gain) / 14
+        avg_loss = (avg_loss * 13 + loss) / 14
+    assert snapshot["rsi"] == pytest.approx(100 - 100 / (1 + avg_gain / avg_loss), rel=1e-9)
+
+    ema = prices[:12].mean()
+    for price in prices[12:]:
+        ema += 2 / 13 * (price - ema)
+    assert snapshot["ema_12"] == pytest.approx(ema, rel=1e-12)
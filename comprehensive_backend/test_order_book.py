@@ -0,0 +1,140 @@
+"""Tests for local order book sequencing against synthetic depth events (no network needed)."""
+
+import asyncio
+
+import pytest
+
+import order_book
+from order_book import OrderBook, OrderBookManager
+
+
+def depth_event(first_update_id, final_update_id, bids=(), asks=()):
+    return {"U": first_update_id, "u": final_update_id, "b": [list(level) for level in bids], "a": [list(level) for level in asks]}
+
+
+def depth_snapshot(last_update_id, bids, asks):
+    return {"lastUpdateId": last_update_id, "bids": [list(level) for level in bids], "asks": [list(level) for level in asks]}
+
+
+@pytest.fixture
+def fake_snapshots(monkeypatch):
+    """Queue of depth snapshots served, in order, to the manager's resyncs."""
+    snapshots = []
+
+    async def get_depth_async(pair, limit=100):
+        return snapshots.pop(0) if snapshots else None
+
+    monkeypatch.setattr(order_book.binance_api, "get_depth_async", get_depth_async)
+    return snapshots
+
+
+def make_manager():
+    manager = OrderBookManager()
+    manager.resync_backoff_seconds = 0
+    return manager
+
+
+async def feed(manager, symbol, events):
+    for event in events:
+        manager.handle_depth_event(symbol, event)
+        # Let a scheduled resync run before the next event, as the event loop would
+        await asyncio.gather(*manager._resyncing.values())
+
+
+def test_buffered_events_apply_on_top_of_snapshot(fake_snapshots):
+    manager = make_manager()
+    fake_snapshots.append(depth_snapshot(10, bids=[("100", "1"), ("99", "2")], asks=[("101", "1"), ("102", "3")]))
+
+    async def run():
+        manager.handle_depth_event("BTC", depth_event(1, 5, bids=[("98", "7")]))
+        manager.handle_depth_event("BTC", depth_event(6, 12, bids=[("100", "5")]))
+        manager.handle_depth_event("BTC", depth_event(13, 14, asks=[("101", "0")]))
+        await asyncio.gather(*manager._resyncing.values())
+
+    asyncio.run(run())
+    book = manager.books["BTC"]
+
+    assert book.synced
+    assert book.last_update_id == 14
+    # The diff older than the snapshot was dropped, the straddling one applied
+    assert 98.0 not in book.bids
+    assert book.best_bid() == (100.0, 5.0)
+    assert book.best_ask() == (102.0, 3.0)
+    assert book.top_bids(5) == [(100.0, 5.0), (99.0, 2.0)]
+
+
+def test_diffs_already_covered_by_the_book_are_ignored(fake_snapshots):
+    manager = make_manager()
+    fake_snapshots.append(depth_snapshot(10, bids=[("100", "1")], asks=[("101", "1")]))
+
+    asyncio.run(feed(manager, "BTC", [
+        depth_event(9, 11, bids=[("100", "2")]),
+        depth_event(10, 11, bids=[("100", "9")]),
+    ]))
+    book = manager.books["BTC"]
+
+    assert book.best_bid() == (100.0, 2.0)
+    assert manager.sequence_gaps == 0
+
+
+def test_sequence_gap_triggers_resync(fake_snapshots):
+    manager = make_manager()
+    fake_snapshots.append(depth_snapshot(10, bids=[("100", "1")], asks=[("101", "1")]))
+    fake_snapshots.append(depth_snapshot(20, bids=[("200", "1")], asks=[("201", "1")]))
+
+    asyncio.run(feed(manager, "BTC", [
+        depth_event(11, 12, bids=[("100", "2")]),
+        depth_event(13, 13, bids=[("100", "3")]),
+        # 14..17 never arrive
+        depth_event(18, 21, asks=[("201", "4")]),
+    ]))
+    book = manager.books["BTC"]
+
+    assert manager.sequence_gaps == 1
+    assert manager.resyncs == 2
+    assert book.synced
+    assert book.last_update_id == 21
+    assert 100.0 not in book.bids
+    assert book.best_bid() == (200.0, 1.0)
+    assert book.best_ask() == (201.0, 4.0)
+
+
+def test_snapshot_older_than_buffered_events_keeps_the_book_unsynced(fake_snapshots):
+    manager = make_manager()
+    fake_snapshots.append(depth_snapshot(10, bids=[("100", "1")], asks=[("101", "1")]))
+
+    asyncio.run(feed(manager, "BTC", [depth_event(50, 55, bids=[("100", "2")])]))
+
+    assert not manager.books["BTC"].synced
+    assert manager.get_book("BTC") is None
+    assert "older than buffered" in manager.last_error
+    assert [event["u"] for event in manager._buffers["BTC"]] == [55]
+
+    # A later snapshot that reaches the buffered events completes the sync
+    fake_snapshots.append(depth_snapshot(52, bids=[("100", "1")], asks=[("101", "1")]))
+    asyncio.run(feed(manager, "BTC", [depth_event(56, 56, asks=[("101", "2")])]))
+    book = manager.books["BTC"]
+
+    assert book.synced
+    assert book.last_update_id == 56
+    assert book.best_bid() == (100.0, 2.0)
+    assert book.best_ask() == (101.0, 2.0)
+
+
+def test_book_is_trimmed_to_max_levels_from_the_worst_side():
+    book = OrderBook("BTC", max_levels=3)
+    book.load_snapshot(
+        bids=[(str(price), "1") for price in (95, 96, 97, 98, 99)],
+        asks=[(str(price), "1") for price in (101, 102, 103, 104, 105)],
+        last_update_id=1,
+    )
+
+    assert sorted(book.bids) == [97.0, 98.0, 99.0]
+    assert sorted(book.asks) == [101.0, 102.0, 103.0]
+
+    book.apply_diff(bids=[("99.5", "2"), ("90", "1")], asks=[("100.5", "2"), ("110", "1")], final_update_id=2)
+
+    assert book.top_bids(5) == [(99.5, 2.0), (99.0, 1.0), (98.0, 1.0)]
+    assert book.top_asks(5) == [(100.5, 2.0), (101.0, 1.0), (102.0, 1.0)]
+    assert len(book._bid_keys) == len(book.bids) == 3
+    assert len(book._ask_keys) == len(book.asks) == 3
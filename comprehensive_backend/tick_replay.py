@@ -0,0 +1,406 @@
+"""
+Deterministic replay of recorded ticks or klines for offline load and latency testing.
+
+Recorded events are turned into the same miniTicker and 1m kline events the
+Binance combined stream delivers and fed through `binance_stream.ingest`, so
+price snapshots, stream listeners (candle store, price history, /ws channels)
+and every cache built on them run exactly as they do live. Event times are
+paced by the recorded timestamps divided by a speed multiplier (1x-1000x);
+when the pipeline cannot keep up, events run back to back and the lag is
+reported. Tick files are aggregated into 1m bars the way Binance does, so
+closed-bar consumers see the same cadence as with kline files.
+
+Simulated fallbacks draw from `simulation_rng`, seeded from SIMULATION_SEED,
+so runs without live data are reproducible too.
+
+Input files: CSV with a header (timestamp/open_time, price or open/high/low/
+close, optional volume and symbol columns), headerless Binance kline CSV
+exports, or JSON lines with the same keys.
+
+Usage:
+    python tick_replay.py --file btc_1m.csv --symbol BTC --speed 100
+    python tick_replay.py --generate 20000 --seed 42 --speed 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from binance_stream import BinanceMarketStream, binance_stream
+
+logger = logging.getLogger(__name__)
+
+MIN_SPEED = 1.0
+MAX_SPEED = 1000.0
+MINUTE_MS = 60_000
+
+
+def make_simulation_rng(seed: Optional[str] = None) -> random.Random:
+    """Random source for simulated prices; seeded when SIMULATION_SEED is set."""
+    seed = os.getenv("SIMULATION_SEED") if seed is None else seed
+    return random.Random(int(seed)) if seed not in (None, "") else random.Random()
+
+
+# Shared by every simulated fallback so a seeded run draws the same sequence
+simulation_rng = make_simulation_rng()
+
+
+def seed_simulation(seed: int) -> None:
+    simulation_rng.seed(seed)
+
+
+@dataclass
+class ReplayEvent:
+    timestamp: int  # ms
+    symbol: str
+    close: float
+    # Set for kline rows; tick rows only carry a price
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    volume: float = 0.0
+
+    @property
+    def is_kline(self) -> bool:
+        return self.open is not None
+
+
+def _to_ms(value: Any) -> int:
+    timestamp = float(value)
+    # Binance exports switched to microseconds; seconds show up in hand-made files
+    if timestamp > 1e14:
+        return int(timestamp / 1000)
+    if timestamp < 1e11:
+        return int(timestamp * 1000)
+    return int(timestamp)
+
+
+def _event_from_row(row: Dict[str, Any], symbol: Optional[str]) -> ReplayEvent:
+    row_symbol = str(row.get("symbol") or symbol or "").upper()
+    if row_symbol.endswith("USDT"):
+        row_symbol = row_symbol[: -len("USDT")]
+    if not row_symbol:
+        raise ValueError("Replay rows need a symbol column or an explicit symbol")
+
+    timestamp = _to_ms(row.get("timestamp") or row.get("open_time") or row.get("time"))
+    volume = float(row.get("volume") or row.get("quantity") or 0.0)
+    if row.get("open") not in (None, ""):
+        return ReplayEvent(
+            timestamp, row_symbol, float(row["close"]),
+            float(row["open"]), float(row["high"]), float(row["low"]), volume,
+        )
+    return ReplayEvent(timestamp, row_symbol, float(row.get("price") or row["close"]), volume=volume)
+
+
+def load_events(path: str, symbol: Optional[str] = None) -> List[ReplayEvent]:
+    """Read a tick or kline file into timestamp-ordered replay events."""
+    events: List[ReplayEvent] = []
+    with open(path, newline="") as handle:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in handle:
+                if line.strip():
+                    events.append(_event_from_row(json.loads(line), symbol))
+        else:
+            first_line = handle.readline()
+            handle.seek(0)
+            if first_line[:1].isdigit():
+                # Headerless Binance kline export: open_time, open, high, low, close, volume, ...
+                for fields in csv.reader(handle):
+                    if fields:
+                        events.append(_event_from_row({
+                            "open_time": fields[0], "open": fields[1], "high": fields[2],
+                            "low": fields[3], "close": fields[4], "volume": fields[5],
+                        }, symbol))
+            else:
+                for row in csv.DictReader(handle):
+                    events.append(_event_from_row({key.strip().lower(): value for key, value in row.items()}, symbol))
+
+    # Stable sort keeps the recorded order of same-timestamp events
+    events.sort(key=lambda event: event.timestamp)
+    return events
+
+
+def generate_events(
+    symbols: List[str], count: int, seed: int, interval_ms: int = 1000, start_time: Optional[int] = None
+) -> List[ReplayEvent]:
+    """Seeded random-walk ticks, round-robin across symbols, for benchmarks without recordings."""
+    rng = random.Random(seed)
+    base_prices = {"BTC": 50000.0, "ETH": 3000.0, "BNB": 300.0, "SOL": 100.0}
+    prices = {symbol: base_prices.get(symbol, 1000.0) for symbol in symbols}
+    start_time = start_time if start_time is not None else 1_700_000_000_000
+
+    events = []
+    for index in range(count):
+        symbol = symbols[index % len(symbols)]
+        prices[symbol] *= 1 + rng.gauss(0, 0.0008)
+        events.append(ReplayEvent(
+            start_time + (index // len(symbols)) * interval_ms, symbol, round(prices[symbol], 8),
+            volume=round(rng.uniform(0.01, 2.0), 6),
+        ))
+    return events
+
+
+def write_events(path: str, events: List[ReplayEvent]) -> None:
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["timestamp", "symbol", "price", "volume"])
+        for event in events:
+            writer.writerow([event.timestamp, event.symbol, event.close, event.volume])
+
+
+class TickReplay:
+    """Paces recorded events into the market stream handlers and measures the pipeline."""
+
+    def __init__(self, stream: BinanceMarketStream = binance_stream) -> None:
+        self.stream = stream
+        self.yield_every = int(os.getenv("REPLAY_YIELD_EVERY", "200"))
+        self.status: Dict[str, Any] = {"state": "idle"}
+        self._task: Optional[asyncio.Task] = None
+        # Per-symbol open 1m bar and rolling ticker stats built from tick rows
+        self._bars: Dict[str, Dict[str, float]] = {}
+        self._tickers: Dict[str, Dict[str, float]] = {}
+
+    def _emit_ticker(self, event: ReplayEvent) -> None:
+        ticker = self._tickers.get(event.symbol)
+        if ticker is None:
+            ticker = {"open": event.open or event.close, "high": event.close, "low": event.close, "volume": 0.0, "quote": 0.0}
+            self._tickers[event.symbol] = ticker
+        ticker["high"] = max(ticker["high"], event.high or event.close)
+        ticker["low"] = min(ticker["low"], event.low or event.close)
+        ticker["volume"] += event.volume
+        ticker["quote"] += event.volume * event.close
+
+        self.stream.ingest({
+            "e": "24hrMiniTicker", "E": event.timestamp, "s": f"{event.symbol}USDT",
+            "c": event.close, "o": ticker["open"], "h": ticker["high"], "l": ticker["low"],
+            "v": ticker["volume"], "q": ticker["quote"],
+        })
+
+    def _emit_kline(self, symbol: str, bar: Dict[str, float], is_closed: bool) -> None:
+        self.stream.ingest({
+            "e": "kline", "s": f"{symbol}USDT",
+            "k": {
+                "t": int(bar["t"]), "o": bar["o"], "h": bar["h"], "l": bar["l"],
+                "c": bar["c"], "v": bar["v"], "x": is_closed,
+            },
+        })
+
+    def _apply(self, event: ReplayEvent) -> List[str]:
+        """Feed one event; returns the symbols whose 1m bar closed."""
+        closed = []
+        if event.is_kline:
+            bar = {"t": event.timestamp // MINUTE_MS * MINUTE_MS, "o": event.open, "h": event.high,
+                   "l": event.low, "c": event.close, "v": event.volume}
+            self._emit_ticker(event)
+            self._emit_kline(event.symbol, bar, True)
+            return [event.symbol]
+
+        bucket = event.timestamp // MINUTE_MS * MINUTE_MS
+        bar = self._bars.get(event.symbol)
+        if bar is not None and bucket > bar["t"]:
+            self._emit_kline(event.symbol, bar, True)
+            closed.append(event.symbol)
+            bar = None
+        if bar is None:
+            bar = {"t": bucket, "o": event.close, "h": event.close, "l": event.close, "c": event.close, "v": 0.0}
+            self._bars[event.symbol] = bar
+        bar["h"] = max(bar["h"], event.close)
+        bar["l"] = min(bar["l"], event.close)
+        bar["c"] = event.close
+        bar["v"] += event.volume
+
+        self._emit_ticker(event)
+        self._emit_kline(event.symbol, bar, False)
+        return closed
+
+    async def run(
+        self,
+        events: List[ReplayEvent],
+        speed: float = 1.0,
+        signal_probe: Optional[Callable[[str], Any]] = None,
+    ) -> Dict[str, Any]:
+        """Replay events at `speed`x; `signal_probe(symbol)` runs after every closed bar."""
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"Replay speed must be between {MIN_SPEED:g}x and {MAX_SPEED:g}x")
+
+        self._bars.clear()
+        self._tickers.clear()
+        signal_latencies: List[float] = []
+        started_at = time.time()
+        self.status = {
+            "state": "running",
+            "speed": speed,
+            "events_total": len(events),
+            "events_done": 0,
+            "bars_closed": 0,
+            "symbols": sorted({event.symbol for event in events}),
+            "first_timestamp": events[0].timestamp if events else None,
+            "last_timestamp": events[-1].timestamp if events else None,
+            "started_at": started_at,
+            "max_lag_ms": 0.0,
+        }
+
+        self.stream.replaying = True
+        try:
+            wall_start = time.monotonic()
+            first_timestamp = events[0].timestamp if events else 0
+            for index, event in enumerate(events):
+                due = wall_start + (event.timestamp - first_timestamp) / 1000 / speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.status["max_lag_ms"] = max(self.status["max_lag_ms"], -delay * 1000)
+                    if index % self.yield_every == 0:
+                        await asyncio.sleep(0)
+
+                dispatched_at = time.perf_counter()
+                closed = self._apply(event)
+                self.status["bars_closed"] += len(closed)
+                if signal_probe is not None:
+                    for symbol in closed:
+                        signal_probe(symbol)
+                        signal_latencies.append((time.perf_counter() - dispatched_at) * 1000)
+                self.status["events_done"] = index + 1
+
+            # Close the bars still open at the end of the recording
+            for symbol, bar in self._bars.items():
+                self._emit_kline(symbol, bar, True)
+                self.status["bars_closed"] += 1
+            self._bars.clear()
+        finally:
+            self.stream.replaying = False
+
+        elapsed = time.time() - started_at
+        self.status.update(
+            state="completed",
+            elapsed_seconds=round(elapsed, 3),
+            events_per_second=round(len(events) / elapsed, 1) if elapsed > 0 else None,
+            max_lag_ms=round(self.status["max_lag_ms"], 3),
+        )
+        if signal_latencies:
+            latencies = np.asarray(signal_latencies)
+            self.status["signal_latency_ms"] = {
+                "count": len(latencies),
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p95": round(float(np.percentile(latencies, 95)), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+                "max": round(float(latencies.max()), 3),
+            }
+        logger.info(
+            "Tick replay completed: %d events in %.2fs (%.0f/s) at %gx",
+            len(events), elapsed, self.status["events_per_second"] or 0, speed,
+        )
+        return self.status
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, *args: Any, on_done: Optional[Callable[[], None]] = None, **kwargs: Any) -> bool:
+        """Run a replay as a background task; False if one is already running.
+
+        `on_done` is called once the replay ends, whether it completed, failed or was stopped.
+        """
+        if self.is_running():
+            return False
+
+        async def run_logged() -> None:
+            try:
+                await self.run(*args, **kwargs)
+            except asyncio.CancelledError:
+                self.status = {**self.status, "state": "stopped"}
+                raise
+            except Exception as e:
+                self.status = {**self.status, "state": "failed", "error": str(e)}
+                logger.error("Tick replay failed: %s", e)
+            finally:
+                if on_done is not None:
+                    on_done()
+
+        self.status = {"state": "starting"}
+        self._task = asyncio.create_task(run_logged())
+        return True
+
+    async def stop(self) -> bool:
+        if not self.is_running():
+            return False
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        return True
+
+
+# Global instance
+tick_replay = TickReplay()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded ticks or klines through the market data pipeline")
+    parser.add_argument("--file", help="CSV or JSONL file of ticks or klines")
+    parser.add_argument("--symbol", help="Symbol for files without a symbol column")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier (1-1000)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for simulated fallbacks and --generate")
+    parser.add_argument("--generate", type=int, default=0, help="Replay this many seeded random-walk ticks instead of a file")
+    parser.add_argument("--save", help="Write the generated ticks to this CSV for later runs")
+    parser.add_argument("--candle-store", help="Candle store path (defaults to a throwaway file)")
+    args = parser.parse_args()
+
+    if not args.file and not args.generate:
+        parser.error("either --file or --generate is required")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    # Set before the app is imported: keep replayed bars out of the real candle store
+    # unless asked otherwise, and seed the app's simulated fallbacks
+    os.environ["CANDLE_STORE_PATH"] = args.candle_store or os.path.join(
+        tempfile.mkdtemp(prefix="tick_replay_"), "candles.db"
+    )
+    if args.seed is not None:
+        os.environ["SIMULATION_SEED"] = str(args.seed)
+
+    # Run as a script this file is __main__; use the module instance the app shares
+    from main import PRICE_SYMBOLS, ai_predictor, register_stream_listeners, seed_price_history
+    from tick_replay import tick_replay as replay
+
+    if args.generate:
+        events = generate_events(PRICE_SYMBOLS, args.generate, args.seed or 0)
+        if args.save:
+            write_events(args.save, events)
+    else:
+        events = load_events(args.file, args.symbol)
+
+    seed_price_history()
+    register_stream_listeners()
+    status = asyncio.run(replay.run(events, args.speed, signal_probe=ai_predictor.generate_signal))
+
+    print(
+        f"{status['state']}: {status['events_done']}/{status['events_total']} events, "
+        f"{status['bars_closed']} bars in {status['elapsed_seconds']}s "
+        f"({status['events_per_second']}/s at {status['speed']:g}x, max lag {status['max_lag_ms']}ms)"
+    )
+    latency = status.get("signal_latency_ms")
+    if latency:
+        print(
+            f"  signal latency (ms): p50 {latency['p50']}  p95 {latency['p95']}  "
+            f"p99 {latency['p99']}  max {latency['max']}  over {latency['count']} bars"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Single-producer broadcast hub for WebSocket feeds.
+
+One producer task builds each frame once and fans it out to every subscriber
+through a bounded per-client queue; each wire encoding of a frame is
+serialized at most once no matter how many clients use it. A slow client
+simply has its oldest queued frames coalesced away, and clients that stay
+behind for too long are evicted instead of stalling everyone else.
+
+Protocols, chosen per client at connect time:
+
+* ``full`` (default): every frame as the complete JSON document.
+* ``delta``: a ``snapshot`` message first, then ``delta`` messages that
+  carry only the changed prices and fields, numbered by ``seq``. Ticks with
+  no changes send nothing. After coalescing drops a frame, the client gets
+  a fresh snapshot, so deltas are always relative to what it last received.
+
+Encodings for the delta protocol: ``json`` (text), ``msgpack`` (binary, when
+the msgpack package is installed) and ``packed``. With ``packed``, snapshots
+are JSON text listing the ``symbols`` and ``fields`` tables. Deltas are
+little-endian binary: ``<BIBB`` (kind=1, seq, field count, price count),
+then ``<Bd`` (table index, value) per changed field, then per changed price.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import struct
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+FrameBuilder = Callable[[], Awaitable[Dict[str, Any]]]
+WireFrame = Union[str, bytes]
+
+PROTOCOLS = ("full", "delta")
+ENCODINGS = ("json", "msgpack", "packed")
+
+_PACKED_HEADER = struct.Struct("<BIBB")
+_PACKED_ENTRY = struct.Struct("<Bd")
+
+
+class BroadcastFrame:
+    """One produced state with its delta against the previous frame, encoded lazily."""
+
+    def __init__(
+        self,
+        seq: int,
+        state: Dict[str, Any],
+        delta: Optional[Dict[str, Any]],
+        layout: Tuple[Tuple[str, ...], Tuple[str, ...]],
+        volatile_keys: Tuple[str, ...] = (),
+    ) -> None:
+        self.seq = seq
+        self.state = state
+        # None when nothing changed since the previous frame
+        self.delta = delta
+        self.layout = layout
+        self.volatile_keys = volatile_keys
+        self._encoded: Dict[Tuple[str, str], WireFrame] = {}
+
+    @property
+    def packable(self) -> bool:
+        """False when the delta touches a field the packed format has no slot for."""
+        fields = self.layout[1]
+        return all(key == "prices" or key in fields or key in self.volatile_keys for key in self.delta or {})
+
+    def message(self, kind: str) -> Dict[str, Any]:
+        if kind == "full":
+            return self.state
+        if kind == "snapshot":
+            symbols, fields = self.layout
+            return {**self.state, "type": "snapshot", "seq": self.seq, "symbols": list(symbols), "fields": list(fields)}
+        return {**self.delta, "type": "delta", "seq": self.seq}
+
+    def encode(self, kind: str, encoding: str = "json") -> WireFrame:
+        key = (kind, encoding)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            if encoding == "msgpack":
+                encoded = msgpack.packb(self.message(kind), use_bin_type=True)
+            elif encoding == "packed" and kind == "delta":
+                encoded = self._pack_delta()
+            else:
+                encoded = json.dumps(self.message(kind))
+            self._encoded[key] = encoded
+        return encoded
+
+    def _pack_delta(self) -> bytes:
+        symbols, fields = self.layout
+        changed_fields = [(fields.index(name), value) for name, value in self.delta.items() if name in fields]
+        changed_prices = [(symbols.index(symbol), price) for symbol, price in self.delta.get("prices", {}).items()]
+        parts = [_PACKED_HEADER.pack(1, self.seq & 0xFFFFFFFF, len(changed_fields), len(changed_prices))]
+        parts.extend(_PACKED_ENTRY.pack(index, float(value)) for index, value in changed_fields)
+        parts.extend(_PACKED_ENTRY.pack(index, float(price)) for index, price in changed_prices)
+        return b"".join(parts)
+
+
+class BroadcastSubscriber:
+    """Bounded mailbox for a single WebSocket client."""
+
+    def __init__(
+        self,
+        max_queue: int,
+        max_consecutive_drops: int,
+        protocol: str = "full",
+        encoding: str = "json",
+    ) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.max_consecutive_drops = max_consecutive_drops
+        self.protocol = protocol
+        self.encoding = encoding
+        self.connected_at = time.time()
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.consecutive_drops = 0
+        self.evicted = False
+        # Delta clients start from, and recover through, a full snapshot
+        self.needs_snapshot = True
+        self._layout: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
+
+    def offer(self, frame: BroadcastFrame) -> bool:
+        """Queue a frame without blocking. Returns False once the client is evicted."""
+        if self.evicted:
+            return False
+
+        if self.protocol == "delta" and frame.delta is None and not self.needs_snapshot:
+            return True
+
+        if self.queue.full():
+            # Coalesce: the oldest queued frame is superseded by the new one
+            self.queue.get_nowait()
+            self.frames_dropped += 1
+            self.consecutive_drops += 1
+            self.needs_snapshot = True
+
+            if self.consecutive_drops > self.max_consecutive_drops:
+                self.evict()
+                return False
+
+        self.queue.put_nowait(frame)
+        return True
+
+    def evict(self) -> None:
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def next_frame(self) -> Optional[WireFrame]:
+        """Wait for the next encoded frame. Returns None when the client has been evicted."""
+        while True:
+            frame = await self.queue.get()
+            if frame is None:
+                return None
+
+            self.consecutive_drops = 0
+
+            if self.protocol != "delta":
+                self.frames_delivered += 1
+                return frame.encode("full", "json" if self.encoding == "packed" else self.encoding)
+
+            if self.needs_snapshot or frame.layout != self._layout or (
+                self.encoding == "packed" and not frame.packable
+            ):
+                self.needs_snapshot = False
+                self._layout = frame.layout
+                self.frames_delivered += 1
+                return frame.encode("snapshot", "json" if self.encoding == "packed" else self.encoding)
+
+            if frame.delta is not None:
+                self.frames_delivered += 1
+                return frame.encode("delta", self.encoding)
+
+
+class MarketBroadcaster:
+    """Runs one producer loop while at least one client is subscribed."""
+
+    def __init__(
+        self,
+        build_frame: FrameBuilder,
+        interval_seconds: float = 2.0,
+        max_queue: int = 4,
+        max_consecutive_drops: int = 30,
+        volatile_keys: Tuple[str, ...] = ("timestamp",),
+    ) -> None:
+        self.build_frame = build_frame
+        # Keys that change every tick and ride along only when something else changed
+        self.volatile_keys = volatile_keys
+        self.interval_seconds = interval_seconds
+        self.max_queue = max_queue
+        self.max_consecutive_drops = max_consecutive_drops
+        self.subscribers: Set[BroadcastSubscriber] = set()
+        self.frames_built = 0
+        self.evictions = 0
+        self.last_frame_at: Optional[float] = None
+        self.last_frame: Optional[BroadcastFrame] = None
+        self.last_error: Optional[str] = None
+        self.seq = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, protocol: str = "full", encoding: str = "json") -> BroadcastSubscriber:
+        subscriber = BroadcastSubscriber(self.max_queue, self.max_consecutive_drops, protocol, encoding)
+
+        # New clients get the latest frame right away instead of waiting a full tick
+        if self.last_frame is not None and (time.time() - self.last_frame_at) < self.interval_seconds * 2:
+            subscriber.offer(self.last_frame)
+
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: BroadcastSubscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "subscribers": len(self.subscribers),
+            "interval_seconds": self.interval_seconds,
+            "max_queue": self.max_queue,
+            "frames_built": self.frames_built,
+            "seq": self.seq,
+            "protocols": self._protocol_mix(),
+            "evictions": self.evictions,
+            "last_frame_age_seconds": (
+                round(time.time() - self.last_frame_at, 3) if self.last_frame_at else None
+            ),
+            "last_error": self.last_error,
+        }
+
+    def _protocol_mix(self) -> Dict[str, int]:
+        mix: Dict[str, int] = {}
+        for subscriber in self.subscribers:
+            key = subscriber.protocol if subscriber.protocol == "full" else f"delta/{subscriber.encoding}"
+            mix[key] = mix.get(key, 0) + 1
+        return mix
+
+    def _diff(self, previous: Optional[Dict[str, Any]], state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Changed prices and fields since the previous state; None if nothing changed."""
+        if previous is None:
+            return {key: value for key, value in state.items() if key != "type"}
+
+        delta: Dict[str, Any] = {}
+        previous_prices = previous.get("prices") or {}
+        changed_prices = {
+            symbol: price for symbol, price in (state.get("prices") or {}).items()
+            if previous_prices.get(symbol) != price
+        }
+        if changed_prices:
+            delta["prices"] = changed_prices
+
+        for key, value in state.items():
+            if key in ("type", "prices") or key in self.volatile_keys:
+                continue
+            if previous.get(key) != value:
+                delta[key] = value
+
+        if not delta:
+            return None
+        for key in self.volatile_keys:
+            if key in state:
+                delta[key] = state[key]
+        return delta
+
+    @staticmethod
+    def _layout(state: Dict[str, Any]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        symbols = tuple(state.get("prices") or {})
+        fields = tuple(
+            key for key, value in state.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        )
+        return symbols, fields
+
+    def publish(self, frame: BroadcastFrame) -> None:
+        """Fan a frame out to every subscriber."""
+        for subscriber in list(self.subscribers):
+            if not subscriber.offer(frame):
+                self.subscribers.discard(subscriber)
+                self.evictions += 1
+
+    async def _run(self) -> None:
+        while self.subscribers:
+            started_at = time.monotonic()
+
+            try:
+                state = await self.build_frame()
+                previous = self.last_frame.state if self.last_frame else None
+                delta = self._diff(previous, state)
+                if delta is not None:
+                    self.seq += 1
+                frame = BroadcastFrame(self.seq, state, delta, self._layout(state), self.volatile_keys)
+                self.frames_built += 1
+                self.last_frame = frame
+                self.last_frame_at = time.time()
+                self.last_error = None
+                self.publish(frame)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.warning("WebSocket frame producer failed: %s", self.last_error)
+
+            elapsed = time.monotonic() - started_at
+            await asyncio.sleep(max(0.0, self.interval_seconds - elapsed))
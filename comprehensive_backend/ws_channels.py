@@ -0,0 +1,259 @@
+"""
+Per-symbol channel subscriptions for the /ws endpoint.
+
+Clients send JSON commands over the socket:
+
+    {"op": "subscribe", "channels": ["ticker:BTC", "candles:ETH", "signals:BTC", "trades:*"]}
+    {"op": "unsubscribe", "channels": ["ticker:BTC"]}
+    {"op": "list"}
+
+A channel is `<kind>:<SYMBOL>`, where `*` subscribes to every symbol of a kind.
+The special `market` channel is the shared market_update feed from
+MarketBroadcaster; connections that do not ask for specific channels start
+subscribed to it only, so existing clients behave as before.
+
+Producers call `channel_hub.publish(kind, symbol, payload)` from anywhere. The
+message is serialized once and offered to each interested connection's bounded
+queue. Connections that stay too far behind are evicted, as with the broadcaster.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_KINDS = ("ticker", "candles", "signals", "trades")
+MARKET_CHANNEL = "market"
+ALL_SYMBOLS = "*"
+
+
+def parse_channel(channel: str) -> Optional[str]:
+    """Normalize `kind:SYMBOL` (or `market`); None when the name is not valid."""
+    name = str(channel or "").strip()
+    if name.lower() == MARKET_CHANNEL:
+        return MARKET_CHANNEL
+
+    kind, _, symbol = name.partition(":")
+    kind, symbol = kind.strip().lower(), symbol.strip().upper()
+    if kind not in CHANNEL_KINDS or not symbol:
+        return None
+    if symbol != ALL_SYMBOLS and not symbol.isalnum():
+        return None
+    return f"{kind}:{symbol}"
+
+
+class ChannelSubscriber:
+    """Bounded outbox and channel set for one WebSocket connection."""
+
+    def __init__(self, max_queue: int, max_consecutive_drops: int, channels: Iterable[str]) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.max_consecutive_drops = max_consecutive_drops
+        self.channels: Set[str] = set(channels)
+        self.connected_at = time.time()
+        self.messages_delivered = 0
+        self.messages_dropped = 0
+        self.consecutive_drops = 0
+        self.evicted = False
+
+    @property
+    def wants_market(self) -> bool:
+        return MARKET_CHANNEL in self.channels
+
+    def offer(self, message: str) -> bool:
+        """Queue a message without blocking. Returns False once the client is evicted."""
+        if self.evicted:
+            return False
+
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.messages_dropped += 1
+            self.consecutive_drops += 1
+
+            if self.consecutive_drops > self.max_consecutive_drops:
+                self.evict()
+                return False
+
+        self.queue.put_nowait(message)
+        return True
+
+    def evict(self) -> None:
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        # Wake the sender so it can close the connection
+        self.queue.put_nowait(None)
+
+    async def next_message(self) -> Optional[str]:
+        """Wait for the next message. Returns None when the client has been evicted."""
+        message = await self.queue.get()
+        if message is not None:
+            self.messages_delivered += 1
+            self.consecutive_drops = 0
+        return message
+
+
+class ChannelHub:
+    """Routes published channel messages to the connections subscribed to them."""
+
+    def __init__(self, max_queue: int = 256, max_consecutive_drops: int = 512) -> None:
+        self.max_queue = max_queue
+        self.max_consecutive_drops = max_consecutive_drops
+        self.subscribers: Set[ChannelSubscriber] = set()
+        # channel -> subscribers, kept in step with each subscriber's channel set
+        self._routes: Dict[str, Set[ChannelSubscriber]] = {}
+        # channel -> signature of the last published value, for publish_change
+        self._last_signatures: Dict[str, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.skipped_unchanged = 0
+        self.evictions = 0
+
+    def connect(self, channels: Optional[Iterable[str]] = None) -> ChannelSubscriber:
+        """Register a connection, subscribed to `channels` or to the market feed by default."""
+        self._loop = asyncio.get_running_loop()
+        subscriber = ChannelSubscriber(self.max_queue, self.max_consecutive_drops, ())
+        self.subscribers.add(subscriber)
+        self.subscribe(subscriber, [MARKET_CHANNEL] if channels is None else channels)
+        return subscriber
+
+    def disconnect(self, subscriber: ChannelSubscriber) -> None:
+        self.subscribers.discard(subscriber)
+        for channel in subscriber.channels:
+            self._drop_route(channel, subscriber)
+        subscriber.channels.clear()
+
+    def _drop_route(self, channel: str, subscriber: ChannelSubscriber) -> None:
+        route = self._routes.get(channel)
+        if route is None:
+            return
+        route.discard(subscriber)
+        if not route:
+            del self._routes[channel]
+            # Nobody hears these channels now, so the next subscriber must get the next value
+            for name in [name for name in self._last_signatures if not self.has_subscribers(*name.split(":", 1))]:
+                del self._last_signatures[name]
+
+    def subscribe(self, subscriber: ChannelSubscriber, channels: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Add channels; returns (accepted, rejected) names."""
+        accepted, rejected = [], []
+        for raw in channels:
+            channel = parse_channel(raw)
+            if channel is None:
+                rejected.append(str(raw))
+                continue
+            subscriber.channels.add(channel)
+            self._routes.setdefault(channel, set()).add(subscriber)
+            accepted.append(channel)
+        return accepted, rejected
+
+    def unsubscribe(self, subscriber: ChannelSubscriber, channels: Iterable[str]) -> List[str]:
+        removed = []
+        for raw in channels:
+            channel = parse_channel(raw)
+            if channel is not None and channel in subscriber.channels:
+                subscriber.channels.discard(channel)
+                self._drop_route(channel, subscriber)
+                removed.append(channel)
+        return removed
+
+    def handle_command(self, subscriber: ChannelSubscriber, raw_message: str) -> Dict[str, Any]:
+        """Apply one client command and return the reply to send back."""
+        try:
+            command = json.loads(raw_message)
+        except (TypeError, ValueError):
+            return {"type": "error", "error": "Commands must be JSON objects"}
+        if not isinstance(command, dict):
+            return {"type": "error", "error": "Commands must be JSON objects"}
+
+        op = str(command.get("op") or command.get("action") or "").lower()
+        channels = command.get("channels") or []
+        if isinstance(channels, str):
+            channels = [channels]
+
+        if op == "subscribe":
+            accepted, rejected = self.subscribe(subscriber, channels)
+            reply: Dict[str, Any] = {"type": "subscribed", "channels": accepted}
+            if rejected:
+                reply["rejected"] = rejected
+        elif op == "unsubscribe":
+            reply = {"type": "unsubscribed", "channels": self.unsubscribe(subscriber, channels)}
+        elif op == "list":
+            reply = {"type": "subscriptions"}
+        elif op == "ping":
+            return {"type": "pong", "timestamp": time.time()}
+        else:
+            return {"type": "error", "error": f"Unknown op: {op or '<missing>'}"}
+
+        reply["subscriptions"] = sorted(subscriber.channels)
+        return reply
+
+    def has_subscribers(self, kind: str, symbol: str) -> bool:
+        return f"{kind}:{symbol.upper()}" in self._routes or f"{kind}:{ALL_SYMBOLS}" in self._routes
+
+    def publish(self, kind: str, symbol: str, data: Any) -> bool:
+        """Push `data` to every connection on `kind:symbol` or `kind:*`. Safe from any thread."""
+        if not self.has_subscribers(kind, symbol):
+            return False
+
+        symbol = symbol.upper()
+        message = self.format_message(kind, symbol, data)
+
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+
+        if in_loop:
+            self._deliver(kind, symbol, message)
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, kind, symbol, message)
+        else:
+            return False
+        return True
+
+    @staticmethod
+    def format_message(kind: str, symbol: str, data: Any) -> str:
+        """Serialize one channel message, as published to subscribers."""
+        symbol = symbol.upper()
+        return json.dumps(
+            {"type": kind, "channel": f"{kind}:{symbol}", "symbol": symbol, "data": data, "timestamp": time.time()},
+            default=str,
+        )
+
+    def publish_change(self, kind: str, symbol: str, signature: Any, data: Any) -> bool:
+        """Publish only when `signature` differs from the last one sent on this channel."""
+        if not self.has_subscribers(kind, symbol):
+            return False
+
+        channel = f"{kind}:{symbol.upper()}"
+        if self._last_signatures.get(channel) == signature:
+            self.skipped_unchanged += 1
+            return False
+        self._last_signatures[channel] = signature
+        return self.publish(kind, symbol, data)
+
+    def _deliver(self, kind: str, symbol: str, message: str) -> None:
+        recipients = self._routes.get(f"{kind}:{symbol}", set()) | self._routes.get(f"{kind}:{ALL_SYMBOLS}", set())
+        self.published += 1
+        for subscriber in recipients:
+            if not subscriber.offer(message):
+                self.evictions += 1
+                self.disconnect(subscriber)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.subscribers),
+            "channels": {channel: len(route) for channel, route in sorted(self._routes.items())},
+            "published": self.published,
+            "skipped_unchanged": self.skipped_unchanged,
+            "evictions": self.evictions,
+        }
+
+
+# Global instance
+channel_hub = ChannelHub()